@@ -0,0 +1,200 @@
+"""
+Script de benchmark para la escritura de la importación en la base de datos.
+Compara tres formas de cargar la misma hoja:
+
+- Legado: borrar poa_obra e insertar con bulk_create (índices vivos, autocommit)
+- Tabla espejo: la carga de importar_excel antes de la ruta rápida
+  (bulk_create por lote en autocommit, índices al final, intercambio)
+- Ruta rápida: carga_masiva() + insertar_masivo(), índices al final,
+  intercambio y ANALYZE
+
+Los tres métodos llenan también las tablas hijas (TABLAS_DERIVADAS) y se
+comparan sobre poa_obra y sus hijas.
+
+Usa una base SQLite temporal: no toca db.sqlite3.
+
+Uso:
+    python benchmark_carga.py [filas]
+"""
+
+import sys
+import os
+import django
+import tempfile
+import time
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+from poa.models import Obra, TABLAS_DERIVADAS
+from poa.importacion import localizar_archivo, leer_completo
+from poa.importacion.paralelo import limpiar_con_huella
+from poa.importacion.intercambio import (
+    activar_lectura_concurrente, crear_tablas_nuevas, construir_indices, intercambiar_tablas,
+    carga_masiva, insertar_masivo, tamano_lote, optimizar_estadisticas,
+)
+
+
+def construir_registros(filas):
+    """
+    Replica las filas reales de data/ hasta alcanzar `filas` registros limpios.
+    """
+    ruta, tipo = localizar_archivo('data')
+    if ruta is None:
+        print("❌ No se encontró 'datos.xlsx' ni 'datos.csv' en la carpeta data.")
+        sys.exit(1)
+
+    df = leer_completo(ruta, tipo).iloc[1:]
+    hoja = df.sample(n=filas, replace=True, random_state=42)
+    hoja.index = range(1, filas + 1)
+    registros, _ = limpiar_con_huella(hoja)
+    return registros
+
+
+def carga_legado(registros):
+    # Las tablas hijas se borran en cascada
+    Obra.objects.all().delete()
+    obras = Obra.objects.bulk_create([Obra(**datos) for datos in registros], batch_size=500)
+    for derivada in TABLAS_DERIVADAS:
+        derivada.reemplazar({obra.pk: derivada.origenes(obra) for obra in obras})
+
+
+def cargar_derivadas(modelo, hijas, insertar):
+    """
+    Llena las tablas espejo hijas desde la tabla espejo de Obra, como
+    importar_excel._cargar_derivadas(), con la función de inserción dada.
+    """
+    espejos = {hija._meta.model_name: hija for hija, _ in hijas}
+    tablas = [(derivada, espejos[derivada._meta.model_name]) for derivada in TABLAS_DERIVADAS]
+    columnas = list(dict.fromkeys(campo for derivada, _ in tablas for campo in derivada.ORIGENES))
+    pendientes = {espejo: [] for _, espejo in tablas}
+    for fila in modelo.objects.values('pk', *columnas).iterator(chunk_size=2000):
+        for derivada, espejo in tablas:
+            pendientes[espejo].extend(
+                espejo(obra_id=fila['pk'], **datos) for datos in derivada.filas(*derivada.origenes(fila))
+            )
+    for espejo, filas in pendientes.items():
+        insertar(espejo, filas)
+
+
+def carga_espejo(registros):
+    espejos = crear_tablas_nuevas()
+    modelo = espejos[0][0]
+    modelo.objects.bulk_create([modelo(**datos) for datos in registros], batch_size=500)
+    cargar_derivadas(modelo, espejos[1:], lambda espejo, filas: espejo.objects.bulk_create(filas, batch_size=500))
+    construir_indices(espejos)
+    intercambiar_tablas(espejos)
+
+
+def carga_rapida(registros):
+    espejos = crear_tablas_nuevas()
+    modelo = espejos[0][0]
+    with carga_masiva():
+        insertar_masivo(modelo, [modelo(**datos) for datos in registros], tamano_lote(modelo))
+        cargar_derivadas(modelo, espejos[1:], lambda espejo, filas: insertar_masivo(espejo, filas, tamano_lote(espejo)))
+    construir_indices(espejos)
+    intercambiar_tablas(espejos)
+    optimizar_estadisticas()
+
+
+def contenido_tabla():
+    """
+    Filas de poa_obra y de sus tablas hijas sin los id, en orden de inserción
+    (para comparar métodos). Las hijas apuntan a la posición de su obra: los
+    pks de poa_obra cambian de un método a otro.
+    """
+    posiciones = {pk: posicion for posicion, pk in enumerate(Obra.objects.order_by('id').values_list('id', flat=True))}
+    contenido = {'obra': list(Obra.objects.order_by('id').values_list(
+        *[campo.attname for campo in Obra._meta.concrete_fields if not campo.primary_key]
+    ))}
+    for derivada in TABLAS_DERIVADAS:
+        campos = [campo.attname for campo in derivada._meta.concrete_fields if not campo.primary_key]
+        contenido[derivada._meta.model_name] = sorted(
+            (posiciones[fila[0]], *fila[1:])
+            for fila in derivada.objects.values_list('obra_id', *[c for c in campos if c != 'obra_id'])
+        )
+    return contenido
+
+
+def medir(nombre, func, registros, iterations=3):
+    """
+    Ejecuta una carga varias veces y devuelve el mejor tiempo.
+    """
+    mejor = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func(registros)
+        elapsed = time.perf_counter() - start
+        mejor = elapsed if mejor is None else min(mejor, elapsed)
+    return {
+        'name': nombre,
+        'segundos': mejor,
+        'filas_por_seg': len(registros) / mejor if mejor > 0 else 0,
+        'contenido': contenido_tabla(),
+    }
+
+
+def print_results(results, title="Resultados de Benchmark"):
+    """
+    Imprime resultados de benchmark en formato tabla.
+    """
+    base = results[0]['segundos']
+    print()
+    print("=" * 80)
+    print(f"  {title}")
+    print("=" * 80)
+    print()
+    print(f"{'Método':<30} {'Tiempo (s)':<12} {'Filas/s':<12} {'Speedup':<10} {'Idéntico':<8}")
+    print("-" * 80)
+
+    for r in results:
+        identico = 'sí' if r['contenido'] == results[0]['contenido'] else 'NO'
+        print(f"{r['name']:<30} {r['segundos']:>10.2f}  {r['filas_por_seg']:>10,.0f}  "
+              f"{base / r['segundos']:>7.1f}x  {identico:>8}")
+
+    print("-" * 80)
+    print()
+
+
+def run_benchmarks(filas=50000):
+    print()
+    print("🚀 BENCHMARK DE CARGA EN BASE DE DATOS")
+    print()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # Antes de la primera consulta: la conexión se abre sobre la base temporal
+        connection.settings_dict['NAME'] = os.path.join(directorio, 'benchmark.sqlite3')
+        call_command('migrate', verbosity=0)
+        activar_lectura_concurrente()
+
+        registros = construir_registros(filas)
+        print(f"Dataset: {len(registros)} registros limpios")
+        print()
+
+        results = []
+        for nombre, func in [
+            ("Legado (bulk_create directo)", carga_legado),
+            ("Tabla espejo (por lote)", carga_espejo),
+            ("Ruta rápida", carga_rapida),
+        ]:
+            print(f"⏳ {nombre}...")
+            results.append(medir(nombre, func, registros))
+
+        connection.close()
+
+    print_results(results, f"CARGA EN BASE DE DATOS ({filas:,} filas, {connection.vendor})")
+
+    if not all(r['contenido'] == results[0]['contenido'] for r in results):
+        print("❌ Los métodos NO dejan el mismo contenido en poa_obra y sus tablas hijas")
+        sys.exit(1)
+    print("✅ Los tres métodos dejan el mismo contenido en poa_obra y sus tablas hijas")
+
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmarks(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,160 @@
+"""
+Script de benchmark para /api/v2/dashboard/critical-projects/.
+Compara la selección anterior (todas las obras en Python,
+calcular_viabilidad_global por obra, orden y paginación en una lista)
+contra la vista actual (predicado indexado, ORDER BY y LIMIT/OFFSET en
+SQL) para distintos tamaños del portafolio.
+
+La vista actual debe devolver las mismas obras en el mismo orden y su
+número de consultas no debe crecer con el portafolio.
+
+Usa una base SQLite temporal: no toca db.sqlite3.
+
+Uso:
+    python benchmark_criticos.py [filas ...]
+"""
+
+import sys
+import os
+import django
+import tempfile
+import time
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from poa.models import Obra
+from poa.utils import calcular_viabilidad_global
+from poa.views import FILTRO_ATENCION_PRIORITARIA
+from poa.importacion import localizar_archivo, leer_completo
+from poa.importacion.intercambio import optimizar_estadisticas
+from poa.importacion.paralelo import limpiar_con_huella
+
+
+def leer_hoja():
+    ruta, tipo = localizar_archivo('data')
+    if ruta is None:
+        print("❌ No se encontró 'datos.xlsx' ni 'datos.csv' en la carpeta data.")
+        sys.exit(1)
+    return leer_completo(ruta, tipo).iloc[1:]
+
+
+def cargar_obras(df, filas):
+    """
+    Replica las filas reales de data/ hasta alcanzar `filas` obras en la base.
+    """
+    hoja = df.sample(n=filas, replace=True, random_state=42)
+    hoja.index = range(1, filas + 1)
+    registros, _ = limpiar_con_huella(hoja)
+    Obra.objects.all().delete()
+    Obra.objects.bulk_create([Obra(**datos) for datos in registros], batch_size=500)
+    optimizar_estadisticas()
+
+
+def criticos_anterior(page_size=10):
+    """Copia de la selección de CriticalProjectsListView antes del predicado en SQL."""
+    criticos = []
+    for obra in Obra.objects.all():
+        puntuacion = float(obra.puntuacion_final_ponderada or 0)
+        viabilidad = calcular_viabilidad_global(obra)
+        if puntuacion > 3.0 and viabilidad in ['baja', 'media']:
+            criticos.append(obra)
+    # sort estable: empates en orden de id
+    criticos.sort(key=lambda x: x.puntuacion_final_ponderada or 0, reverse=True)
+    return [obra.id for obra in criticos[:page_size]]
+
+
+def criticos_actual(cliente, page_size=10):
+    respuesta = cliente.get('/api/v2/dashboard/critical-projects/', {'page_size': page_size, 'fields': 'id'})
+    return [obra['id'] for obra in respuesta.json()['results']]
+
+
+def medir(func, iterations=3):
+    """
+    Ejecuta la función varias veces; devuelve (mejor tiempo en ms, consultas, resultado).
+    """
+    mejor = None
+    for _ in range(iterations):
+        caches['obras_json'].clear()
+        with CaptureQueriesContext(connection) as consultas:
+            start = time.perf_counter()
+            resultado = func()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        mejor = elapsed_ms if mejor is None else min(mejor, elapsed_ms)
+    return mejor, len(consultas.captured_queries), resultado
+
+
+def print_results(results, title="Resultados de Benchmark"):
+    """
+    Imprime resultados de benchmark en formato tabla.
+    """
+    print()
+    print("=" * 80)
+    print(f"  {title}")
+    print("=" * 80)
+    print()
+    print(f"{'Obras':<10} {'Críticas':<10} {'Anterior (ms)':<15} {'Actual (ms)':<13} {'Consultas':<11} {'Speedup':<9} {'Iguales':<7}")
+    print("-" * 80)
+
+    for r in results:
+        iguales = 'sí' if r['ids_anterior'] == r['ids_actual'] else 'NO'
+        print(f"{r['obras']:>8,}  {r['criticas']:>8,}  {r['anterior']:>13.1f}  {r['actual']:>11.1f}  "
+              f"{r['consultas']:>9}  {r['anterior'] / r['actual']:>6.1f}x  {iguales:>7}")
+
+    print("-" * 80)
+    print()
+
+
+def run_benchmarks(tamanos=(2000, 10000, 50000)):
+    print()
+    print("🚀 BENCHMARK DE PROYECTOS CRÍTICOS")
+    print()
+
+    settings.ALLOWED_HOSTS = ['*']
+    df = leer_hoja()
+    results = []
+    with tempfile.TemporaryDirectory() as directorio:
+        # Antes de la primera consulta: la conexión se abre sobre la base temporal
+        connection.settings_dict['NAME'] = os.path.join(directorio, 'benchmark.sqlite3')
+        call_command('migrate', verbosity=0)
+        cliente = Client()
+
+        for filas in tamanos:
+            print(f"⏳ {filas:,} obras...")
+            cargar_obras(df, filas)
+            anterior, _, ids_anterior = medir(criticos_anterior)
+            actual, consultas, ids_actual = medir(lambda: criticos_actual(cliente))
+            results.append({
+                'obras': filas,
+                'criticas': Obra.objects.filter(FILTRO_ATENCION_PRIORITARIA).count(),
+                'anterior': anterior, 'actual': actual, 'consultas': consultas,
+                'ids_anterior': ids_anterior, 'ids_actual': ids_actual,
+            })
+
+        plan = Obra.objects.filter(FILTRO_ATENCION_PRIORITARIA).order_by(
+            '-puntuacion_final_ponderada', 'id'
+        ).values_list('id', 'huella')[:10].explain()
+        connection.close()
+
+    print_results(results, "PRIMERA PÁGINA DE PROYECTOS CRÍTICOS (page_size=10)")
+    print(f"Plan de la página: {plan}")
+    print()
+
+    if not all(r['ids_anterior'] == r['ids_actual'] for r in results):
+        print("❌ La vista actual NO devuelve las mismas obras que la selección anterior")
+        sys.exit(1)
+    print("✅ La vista actual devuelve las mismas obras en el mismo orden")
+
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmarks(tuple(int(filas) for filas in sys.argv[1:]) or (2000, 10000, 50000))
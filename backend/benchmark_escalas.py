@@ -0,0 +1,168 @@
+"""
+Script de benchmark para interpretar_escala_flexible().
+Compara la versión anterior (regex + recorrido del catálogo en orden para
+cada celda) contra el motor actual (coincidencia exacta, subcadena más
+larga y memoización) sobre las celdas reales de las columnas de escala.
+
+- Celdas reales (data/): deben dar exactamente lo mismo.
+- Variantes del catálogo: se listan las diferencias, que corresponden a
+  la coincidencia más larga ("muy alto" ya no se lee como "alto").
+
+Uso:
+    python benchmark_escalas.py [filas]
+"""
+
+import sys
+import os
+import re
+import django
+import time
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+import numpy as np
+import pandas as pd
+from poa.importacion import localizar_archivo, leer_completo
+from poa.utils import CATALOGO_ESCALAS, interpretar_escala_flexible
+
+# Columnas con escala 1-5: complejidad (19) y los 7 criterios de priorización (21-27)
+COLUMNAS_ESCALA = [19, 21, 22, 23, 24, 25, 26, 27]
+
+
+def interpretar_escala_anterior(valor):
+    """Copia de interpretar_escala_flexible() antes del motor con tabla de consulta."""
+    if pd.isna(valor) or valor == '':
+        return 1
+    if isinstance(valor, (int, np.integer)) and 1 <= valor <= 5:
+        return int(valor)
+    if isinstance(valor, (float, np.floating)):
+        valor_int = int(round(valor))
+        if 1 <= valor_int <= 5:
+            return valor_int
+    val_str = str(valor).strip().lower()
+    val_str = val_str.replace('–', '-').replace('—', '-').replace('_', ' ')
+    match = re.search(r'^([1-5])\b', val_str)
+    if match:
+        return int(match.group(1))
+    for clave, numero in CATALOGO_ESCALAS.items():
+        if clave in val_str:
+            return numero
+    match = re.search(r'\b([1-5])\b', val_str)
+    if match:
+        return int(match.group(1))
+    return 1
+
+
+def celdas_reales():
+    """Celdas de las columnas de escala del archivo de data/."""
+    ruta, tipo = localizar_archivo('data')
+    if ruta is None:
+        print("❌ No se encontró 'datos.xlsx' ni 'datos.csv' en la carpeta data.")
+        sys.exit(1)
+
+    df = leer_completo(ruta, tipo).iloc[1:]
+    return [valor for num in COLUMNAS_ESCALA for valor in df[num].tolist()]
+
+
+def variantes_catalogo():
+    """Cada clave del catálogo con mayúsculas, guiones, prefijos y sufijos."""
+    variantes = []
+    for clave in CATALOGO_ESCALAS:
+        variantes += [
+            clave, clave.upper(), clave.title(), f'  {clave}  ', clave.replace(' ', '_'),
+            f'nivel {clave}', f'{clave} (estimado)', clave.replace('-', '–'),
+        ]
+    return variantes
+
+
+def medir(func, valores, iterations=3):
+    """
+    Ejecuta la función sobre todos los valores y devuelve el mejor tiempo en ms.
+    """
+    mejor = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        for valor in valores:
+            func(valor)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        mejor = elapsed_ms if mejor is None else min(mejor, elapsed_ms)
+    return mejor
+
+
+def diferencias(valores):
+    vistos = {}
+    for valor in valores:
+        anterior = interpretar_escala_anterior(valor)
+        actual = interpretar_escala_flexible(valor)
+        if anterior != actual:
+            vistos[repr(valor)] = (anterior, actual)
+    return vistos
+
+
+def print_results(results, title="Resultados de Benchmark"):
+    """
+    Imprime resultados de benchmark en formato tabla.
+    """
+    print()
+    print("=" * 80)
+    print(f"  {title}")
+    print("=" * 80)
+    print()
+    print(f"{'Corpus':<28} {'Celdas':<9} {'Anterior (ms)':<15} {'Actual (ms)':<13} {'Speedup':<9} {'Difs':<5}")
+    print("-" * 80)
+
+    for r in results:
+        print(f"{r['name']:<28} {r['celdas']:>7,}  {r['anterior']:>13.1f}  {r['actual']:>11.1f}  "
+              f"{r['anterior'] / r['actual']:>6.1f}x  {len(r['diferencias']):>4}")
+
+    print("-" * 80)
+    print()
+
+
+def run_benchmarks(filas=50000):
+    print()
+    print("🚀 BENCHMARK DE INTERPRETACIÓN DE ESCALAS")
+    print()
+
+    reales = celdas_reales()
+    variantes = variantes_catalogo()
+    rng = np.random.default_rng(42)
+    muestra = [reales[i] for i in rng.integers(0, len(reales), filas)]
+    textos = [variantes[i] for i in rng.integers(0, len(variantes), filas)]
+
+    results = []
+    for nombre, valores in [
+        ("Celdas reales (data/)", reales),
+        (f"Celdas reales x{filas:,}", muestra),
+        ("Variantes del catálogo", variantes),
+        (f"Variantes x{filas:,}", textos),
+    ]:
+        print(f"⏳ {nombre}...")
+        results.append({
+            'name': nombre,
+            'celdas': len(valores),
+            'anterior': medir(interpretar_escala_anterior, valores),
+            'actual': medir(interpretar_escala_flexible, valores),
+            'diferencias': diferencias(valores),
+        })
+
+    print_results(results, "INTERPRETACIÓN DE ESCALAS 1-5: ANTERIOR VS ACTUAL")
+
+    print("Diferencias en variantes del catálogo (anterior -> actual):")
+    for valor, (anterior, actual) in sorted(results[2]['diferencias'].items()):
+        print(f"  {valor:<32} {anterior} -> {actual}")
+    print()
+
+    if results[0]['diferencias'] or results[1]['diferencias']:
+        print("❌ El motor actual NO coincide con el anterior en las celdas reales")
+        sys.exit(1)
+    print("✅ El motor actual coincide con el anterior en todas las celdas reales")
+
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmarks(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -151,11 +151,11 @@ def run_benchmarks():
         ).order_by('fecha_termino_prog')[:25]
     ))
     
-    # Test 9: Búsqueda en alcaldías
-    print("⏳ Test 9: Búsqueda en alcaldías...")
+    # Test 9: Filtro por alcaldía (join con el catálogo, poa_obraalc_alc_idx)
+    print("⏳ Test 9: Filtro por alcaldía...")
     results.append(benchmark_query(
-        "Buscar en alcaldías",
-        lambda: Obra.objects.filter(alcaldias__icontains='Iztapalapa')
+        "Filtrar por alcaldía (join)",
+        lambda: Obra.objects.filter(alcaldias_canonicas__nombre='Iztapalapa')
     ))
     
     # Test 10: Agregación con GROUP BY (área)
@@ -0,0 +1,142 @@
+"""
+Script de benchmark para la limpieza de datos de importación.
+Compara los limpiadores escalares (celda por celda) contra las versiones
+vectorizadas (una llamada por columna) sobre una hoja de 50,000 filas.
+
+Uso:
+    python benchmark_limpieza.py [filas]
+"""
+
+import sys
+import os
+import django
+import time
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from poa.importacion import localizar_archivo, leer_completo, limpiar_fila, limpiar_bloque
+from poa.utils import (
+    clean_money, clean_money_series,
+    clean_percentage, clean_percentage_series,
+    interpretar_escala_flexible, interpretar_escala_series,
+    clean_beneficiarios_advanced, clean_beneficiarios_series,
+)
+
+
+def construir_hoja(filas):
+    """
+    Replica las filas reales de data/ hasta alcanzar `filas` registros.
+    """
+    ruta, tipo = localizar_archivo('data')
+    if ruta is None:
+        print("❌ No se encontró 'datos.xlsx' ni 'datos.csv' en la carpeta data.")
+        sys.exit(1)
+
+    df = leer_completo(ruta, tipo).iloc[1:]
+    hoja = df.sample(n=filas, replace=True, random_state=42)
+    hoja.index = range(1, filas + 1)
+    return hoja
+
+
+def medir(func, iterations=3):
+    """
+    Ejecuta una función varias veces y devuelve (mejor tiempo en ms, resultado).
+    """
+    mejor = None
+    resultado = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        resultado = func()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        mejor = elapsed_ms if mejor is None else min(mejor, elapsed_ms)
+    return mejor, resultado
+
+
+def comparar(nombre, escalar, vectorizada, iterations=3):
+    """
+    Mide ambas versiones y verifica que produzcan exactamente los mismos valores.
+    """
+    t_escalar, esperado = medir(escalar, iterations)
+    t_vector, obtenido = medir(vectorizada, iterations)
+    return {
+        'name': nombre,
+        'escalar': t_escalar,
+        'vectorizada': t_vector,
+        'speedup': t_escalar / t_vector if t_vector > 0 else float('inf'),
+        'identico': repr(esperado) == repr(obtenido),
+    }
+
+
+def print_results(results, title="Resultados de Benchmark"):
+    """
+    Imprime resultados de benchmark en formato tabla.
+    """
+    print()
+    print("=" * 80)
+    print(f"  {title}")
+    print("=" * 80)
+    print()
+    print(f"{'Limpiador':<32} {'Escalar (ms)':<14} {'Vector (ms)':<13} {'Speedup':<10} {'Idéntico':<8}")
+    print("-" * 80)
+
+    for r in results:
+        identico = 'sí' if r['identico'] else 'NO'
+        print(f"{r['name']:<32} {r['escalar']:>12.1f}  {r['vectorizada']:>11.1f}  {r['speedup']:>7.1f}x  {identico:>8}")
+
+    print("-" * 80)
+    print()
+
+
+def run_benchmarks(filas=50000):
+    print()
+    print("🚀 BENCHMARK DE LIMPIEZA VECTORIZADA")
+    print()
+
+    hoja = construir_hoja(filas)
+    print(f"Dataset: {len(hoja)} filas x {len(hoja.columns)} columnas")
+    print()
+
+    results = []
+
+    columnas = [
+        ("Dinero MDP (col 7)", 7,
+         lambda v: clean_money(v, es_mdp=True), lambda s: clean_money_series(s, es_mdp=True)),
+        ("Dinero unitario (col 12)", 12,
+         lambda v: clean_money(v, es_mdp=False), lambda s: clean_money_series(s, es_mdp=False)),
+        ("Porcentaje (col 43)", 43, clean_percentage, clean_percentage_series),
+        ("Escala 1-5 (col 22)", 22, interpretar_escala_flexible, interpretar_escala_series),
+        ("Beneficiarios (col 36)", 36, clean_beneficiarios_advanced, clean_beneficiarios_series),
+    ]
+
+    for nombre, num, escalar, vectorizada in columnas:
+        print(f"⏳ {nombre}...")
+        serie = hoja[num]
+        results.append(comparar(
+            nombre,
+            lambda: [escalar(v) for v in serie],
+            lambda: vectorizada(serie).tolist(),
+        ))
+
+    print("⏳ Bloque completo (67 columnas)...")
+    results.append(comparar(
+        "Bloque completo",
+        lambda: [limpiar_fila(row) for _, row in hoja.iterrows()],
+        lambda: limpiar_bloque(hoja)[0],
+        iterations=1,
+    ))
+
+    print_results(results, f"LIMPIEZA ESCALAR VS VECTORIZADA ({filas:,} filas)")
+
+    if not all(r['identico'] for r in results):
+        print("❌ Las versiones vectorizadas NO coinciden con las escalares")
+        sys.exit(1)
+    print("✅ Todas las versiones vectorizadas coinciden con las escalares")
+
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmarks(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,184 @@
+"""
+Script de benchmark para las respuestas sin paginación (page_size=todos).
+Compara:
+
+- Renderizado: JSONRenderer de DRF contra ORJSONRenderer sobre las mismas
+  obras ya serializadas (ObraSerializerRapido).
+- Respuesta: la página completa armada en memoria contra la respuesta en
+  partes (CacheFragmentos.en_partes), con la caché fría y caliente.
+  Se mide el tiempo total, el tiempo hasta que salen las primeras obras y
+  el pico de memoria (tracemalloc, que también hace más lentas las cifras).
+
+Usa una base SQLite temporal: no toca db.sqlite3.
+
+Uso:
+    python benchmark_respuestas.py [filas]
+"""
+
+import sys
+import os
+import django
+import json
+import tempfile
+import time
+import tracemalloc
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from poa.models import Obra
+from poa.fragmentos import CacheFragmentos
+from poa.renderers import ORJSONRenderer, JSONFragmentosRenderer, orjson
+from poa.serializers import ObraSerializerRapido
+from poa.importacion import localizar_archivo, leer_completo
+from poa.importacion.paralelo import limpiar_con_huella
+
+META = {'_meta': {'total_count': 0, 'filters_applied': {}, 'timestamp': 'X'}}
+
+
+def cargar_obras(filas):
+    """
+    Replica las filas reales de data/ hasta alcanzar `filas` obras en la base.
+    """
+    ruta, tipo = localizar_archivo('data')
+    if ruta is None:
+        print("❌ No se encontró 'datos.xlsx' ni 'datos.csv' en la carpeta data.")
+        sys.exit(1)
+
+    df = leer_completo(ruta, tipo).iloc[1:]
+    hoja = df.sample(n=filas, replace=True, random_state=42)
+    hoja.index = range(1, filas + 1)
+    registros, _ = limpiar_con_huella(hoja)
+    Obra.objects.bulk_create([Obra(**datos) for datos in registros], batch_size=500)
+
+
+def en_memoria():
+    fragmentos = CacheFragmentos()
+    llaves = fragmentos.llaves(Obra.objects.order_by('id'))
+    yield JSONFragmentosRenderer().render({'results': fragmentos.renderizar(llaves), **META})
+
+
+def en_partes():
+    fragmentos = CacheFragmentos()
+    yield from fragmentos.en_partes(fragmentos.llaves(Obra.objects.order_by('id')), META)
+
+
+def medir_respuesta(nombre, generador, fria, iterations=3):
+    """
+    Consume la respuesta varias veces; devuelve el mejor tiempo total, el
+    mejor tiempo hasta las primeras obras y el pico de memoria (ms, ms, MB).
+    """
+    total = primera = pico = None
+    for _ in range(iterations):
+        if fria:
+            caches['obras_json'].clear()
+        tracemalloc.start()
+        start = time.perf_counter()
+        partes = []
+        inicio_partes = None
+        tamano = 0
+        for parte in generador():
+            tamano += len(parte)
+            # Primera parte con obras (no solo el '{"results":[' inicial)
+            if inicio_partes is None and tamano > 1024:
+                inicio_partes = time.perf_counter() - start
+            partes.append(parte if len(partes) < 2 else b'')  # no retener el cuerpo
+        elapsed = time.perf_counter() - start
+        _, pico_actual = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        total = elapsed if total is None else min(total, elapsed)
+        primera = inicio_partes if primera is None else min(primera, inicio_partes)
+        pico = pico_actual if pico is None else min(pico, pico_actual)
+    return {
+        'name': nombre, 'total': total * 1000, 'primera': primera * 1000,
+        'pico': pico / 1024 / 1024, 'bytes': tamano,
+    }
+
+
+def medir_renderer(renderer, datos, iterations=3):
+    mejor = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        contenido = renderer.render(datos)
+        elapsed = (time.perf_counter() - start) * 1000
+        mejor = elapsed if mejor is None else min(mejor, elapsed)
+    return mejor, contenido
+
+
+def print_results(renderers, respuestas, title="Resultados de Benchmark"):
+    """
+    Imprime resultados de benchmark en formato tabla.
+    """
+    print()
+    print("=" * 80)
+    print(f"  {title}")
+    print("=" * 80)
+    print()
+    print(f"{'Renderer':<30} {'Tiempo (ms)':<13} {'KB':<10}")
+    print("-" * 80)
+    for nombre, ms, contenido in renderers:
+        print(f"{nombre:<30} {ms:>11.0f}  {len(contenido) / 1024:>8,.0f}")
+    print()
+    print(f"{'Respuesta':<30} {'Total (ms)':<12} {'1as obras (ms)':<15} {'Pico (MB)':<10}")
+    print("-" * 80)
+    for r in respuestas:
+        print(f"{r['name']:<30} {r['total']:>10.0f}  {r['primera']:>13.1f}  {r['pico']:>9.1f}")
+    print("-" * 80)
+    print()
+
+
+def run_benchmarks(filas=20000):
+    print()
+    print("🚀 BENCHMARK DE RESPUESTAS SIN PAGINACIÓN")
+    print()
+    if orjson is None:
+        print("⚠️  orjson no está instalado: ORJSONRenderer usa JSONRenderer")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # Antes de la primera consulta: la conexión se abre sobre la base temporal
+        connection.settings_dict['NAME'] = os.path.join(directorio, 'benchmark.sqlite3')
+        call_command('migrate', verbosity=0)
+        cargar_obras(filas)
+        print(f"Dataset: {Obra.objects.count()} obras")
+        print()
+
+        print("⏳ Renderers...")
+        rapido = ObraSerializerRapido()
+        datos = {'results': rapido.representar(rapido.filas(Obra.objects.order_by('id'))), **META}
+        renderers = [
+            (nombre, *medir_renderer(renderer, datos))
+            for nombre, renderer in [("JSONRenderer (DRF)", JSONRenderer()), ("ORJSONRenderer", ORJSONRenderer())]
+        ]
+
+        respuestas = []
+        for nombre, generador, fria in [
+            ("En memoria, caché fría", en_memoria, True),
+            ("En partes, caché fría", en_partes, True),
+            ("En memoria, caché caliente", en_memoria, False),
+            ("En partes, caché caliente", en_partes, False),
+        ]:
+            print(f"⏳ {nombre}...")
+            respuestas.append(medir_respuesta(nombre, generador, fria))
+
+        completo = b''.join(en_partes())
+        connection.close()
+
+    print_results(renderers, respuestas, f"PAGE_SIZE=TODOS ({filas:,} obras)")
+
+    iguales = json.loads(renderers[0][2]) == json.loads(renderers[1][2]) == json.loads(completo)
+    if not iguales:
+        print("❌ Los renderers o la respuesta en partes NO producen el mismo JSON")
+        sys.exit(1)
+    print("✅ Los renderers y la respuesta en partes producen el mismo JSON")
+
+    return renderers, respuestas
+
+
+if __name__ == '__main__':
+    run_benchmarks(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
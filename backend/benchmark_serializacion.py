@@ -0,0 +1,151 @@
+"""
+Script de benchmark para la serialización de listados de obras.
+Compara ObraSerializer (instancias del modelo y DRF campo por campo)
+contra ObraSerializerRapido (filas de values() en una sola pasada) y
+contra los fragmentos JSON en caché (CacheFragmentos, caché caliente),
+con la representación completa y con ?fields=lista.
+
+Los tres caminos deben producir exactamente los mismos bytes de JSON.
+
+Usa una base SQLite temporal: no toca db.sqlite3.
+
+Uso:
+    python benchmark_serializacion.py [filas]
+"""
+
+import sys
+import os
+import django
+import tempfile
+import time
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from poa.models import Obra
+from poa.fragmentos import CacheFragmentos
+from poa.renderers import JSONFragmentosRenderer
+from poa.serializers import ObraSerializer, ObraSerializerRapido
+from poa.importacion import localizar_archivo, leer_completo
+from poa.importacion.paralelo import limpiar_con_huella
+
+
+def cargar_obras(filas):
+    """
+    Replica las filas reales de data/ hasta alcanzar `filas` obras en la base.
+    """
+    ruta, tipo = localizar_archivo('data')
+    if ruta is None:
+        print("❌ No se encontró 'datos.xlsx' ni 'datos.csv' en la carpeta data.")
+        sys.exit(1)
+
+    df = leer_completo(ruta, tipo).iloc[1:]
+    hoja = df.sample(n=filas, replace=True, random_state=42)
+    hoja.index = range(1, filas + 1)
+    registros, _ = limpiar_con_huella(hoja)
+    Obra.objects.bulk_create([Obra(**datos) for datos in registros], batch_size=500)
+
+
+def serializar_drf(campos):
+    queryset = Obra.objects.order_by('id')
+    if campos is not None:
+        queryset = queryset.only(*ObraSerializer.columnas_necesarias(campos))
+    return JSONRenderer().render(ObraSerializer(queryset, many=True, fields=campos).data)
+
+
+def serializar_rapido(campos):
+    rapido = ObraSerializerRapido(campos)
+    return JSONRenderer().render(rapido.representar(rapido.filas(Obra.objects.order_by('id'))))
+
+
+def serializar_fragmentos(campos):
+    fragmentos = CacheFragmentos(campos)
+    llaves = fragmentos.llaves(Obra.objects.order_by('id'))
+    return JSONFragmentosRenderer().render(fragmentos.renderizar(llaves))
+
+
+def medir(func, campos, iterations=3):
+    """
+    Ejecuta la serialización varias veces y devuelve (mejor tiempo en ms, bytes).
+    """
+    mejor = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        contenido = func(campos)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        mejor = elapsed_ms if mejor is None else min(mejor, elapsed_ms)
+    return mejor, contenido
+
+
+def identicos(r):
+    return r['drf_bytes'] == r['rapido_bytes'] == r['cache_bytes']
+
+
+def print_results(results, title="Resultados de Benchmark"):
+    """
+    Imprime resultados de benchmark en formato tabla.
+    """
+    print()
+    print("=" * 80)
+    print(f"  {title}")
+    print("=" * 80)
+    print()
+    print(f"{'Representación':<16} {'KB':<8} {'DRF (ms)':<10} {'Rápido (ms)':<12} {'Caché (ms)':<11} "
+          f"{'Speedup':<9} {'Idéntico':<8}")
+    print("-" * 80)
+
+    for r in results:
+        identico = 'sí' if identicos(r) else 'NO'
+        print(f"{r['name']:<16} {len(r['drf_bytes']) / 1024:>6,.0f}  {r['drf']:>8.0f}  {r['rapido']:>10.0f}  "
+              f"{r['cache']:>10.0f}  {r['drf'] / r['cache']:>6.1f}x  {identico:>8}")
+
+    print("-" * 80)
+    print()
+
+
+def run_benchmarks(filas=10000):
+    print()
+    print("🚀 BENCHMARK DE SERIALIZACIÓN DE LISTADOS")
+    print()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # Antes de la primera consulta: la conexión se abre sobre la base temporal
+        connection.settings_dict['NAME'] = os.path.join(directorio, 'benchmark.sqlite3')
+        call_command('migrate', verbosity=0)
+        cargar_obras(filas)
+        print(f"Dataset: {Obra.objects.count()} obras")
+        print()
+
+        results = []
+        for nombre, campos in [
+            ("Completa", None),
+            ("?fields=lista", list(ObraSerializer.CAMPOS_LISTA)),
+        ]:
+            print(f"⏳ {nombre}...")
+            drf, drf_bytes = medir(serializar_drf, campos)
+            rapido, rapido_bytes = medir(serializar_rapido, campos)
+            cache, cache_bytes = medir(serializar_fragmentos, campos)
+            results.append({
+                'name': nombre, 'drf': drf, 'rapido': rapido, 'cache': cache,
+                'drf_bytes': drf_bytes, 'rapido_bytes': rapido_bytes, 'cache_bytes': cache_bytes,
+            })
+
+        connection.close()
+
+    print_results(results, f"SERIALIZACIÓN DE {filas:,} OBRAS: DRF VS RÁPIDO VS CACHÉ")
+
+    if not all(identicos(r) for r in results):
+        print("❌ ObraSerializerRapido o la caché NO producen el mismo JSON que ObraSerializer")
+        sys.exit(1)
+    print("✅ ObraSerializerRapido y la caché producen exactamente el mismo JSON que ObraSerializer")
+
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmarks(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
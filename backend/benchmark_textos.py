@@ -0,0 +1,220 @@
+"""
+Script de benchmark para los textos del serializer y de la importación.
+Compara las versiones anteriores de capitalizar_texto(),
+obtener_valor_por_defecto() y normalizar_texto() (tablas reconstruidas en
+cada llamada, NFD carácter por carácter) contra las actuales (tablas a
+nivel de módulo, ruta ASCII, str.translate y memoización), y el costo de
+serializar páginas de 100 obras con ObraSerializer usando unas u otras.
+
+No usa la base de datos: las obras se construyen en memoria a partir de
+las filas reales de data/.
+
+Uso:
+    python benchmark_textos.py [filas]
+"""
+
+import sys
+import os
+import django
+import time
+import unicodedata
+from unittest import mock
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from poa import serializers as serializers_poa
+from poa.models import Obra
+from poa.serializers import ObraSerializer
+from poa.importacion import localizar_archivo, leer_completo
+from poa.importacion.paralelo import limpiar_con_huella
+from poa.utils import capitalizar_texto, obtener_valor_por_defecto, normalizar_texto
+
+
+def capitalizar_texto_anterior(texto, siglas=None):
+    """Copia de capitalizar_texto() antes de las tablas a nivel de módulo."""
+    if not texto or texto == '':
+        return None
+    text = str(texto).strip()
+    if not text:
+        return None
+    if siglas is None:
+        siglas = {
+            'CDMX', 'MX', 'USA', 'EU', 'CFE', 'IMSS', 'ISSSTE',
+            'UNAM', 'IPN', 'UAM', 'SEP', 'INEGI', 'SAT',
+            'CDMX', 'BRT', 'POA', 'ODS', 'ONU'
+        }
+    minusculas = {
+        'de', 'del', 'la', 'las', 'el', 'los', 'un', 'una',
+        'unos', 'unas', 'y', 'e', 'o', 'u', 'en', 'a', 'con',
+        'por', 'para', 'sin', 'sobre', 'bajo', 'entre', 'hacia'
+    }
+    words = text.split()
+    capitalized_words = []
+    for i, word in enumerate(words):
+        clean_word = word.strip('.,;:()[]{}')
+        if clean_word.upper() in siglas:
+            capitalized_words.append(word.upper())
+        elif i == 0:
+            capitalized_words.append(word.capitalize())
+        elif clean_word.lower() in minusculas:
+            capitalized_words.append(word.lower())
+        else:
+            capitalized_words.append(word.capitalize())
+    return ' '.join(capitalized_words)
+
+
+def obtener_valor_por_defecto_anterior(campo_nombre, valor_actual):
+    """Copia de obtener_valor_por_defecto() antes de VALORES_POR_DEFECTO."""
+    if valor_actual and str(valor_actual).strip():
+        return valor_actual
+    defaults = {
+        'programa': 'Por Definir', 'area_responsable': 'Por Asignar',
+        'eje_institucional': 'Por Clasificar', 'tipo_obra': 'Por Clasificar',
+        'tipo_recurso': 'Por Definir', 'fuente_financiamiento': 'Por Definir',
+        'alcance_territorial': 'Por Determinar', 'etapa_desarrollo': 'Por Determinar',
+        'estatus_general': 'Por Revisar', 'responsable_operativo': 'Por Asignar',
+        'contratista': 'Por Contratar', 'alcaldias': 'Por Determinar',
+        'ubicacion_especifica': 'Por Definir', 'impacto_social_desc': 'Sin Descripción',
+        'observaciones': 'Sin Observaciones', 'problema_resuelve': 'Por Documentar',
+        'solucion_ofrece': 'Por Documentar', 'beneficiarios_directos': 'Por Identificar',
+        'problemas_identificados': 'Sin Problemas Identificados',
+        'acciones_correctivas': 'Sin Acciones Definidas', 'riesgos': 'Sin Riesgos Identificados',
+        'permisos_requeridos': 'Por Revisar', 'estatus_permisos': 'Por Revisar',
+        'fecha_inicio_prog': None, 'fecha_termino_prog': None,
+        'fecha_inicio_real': None, 'fecha_termino_real': None,
+        'duracion_meses': None, 'multianualidad': 'Por Definir',
+        'hitos_comunicacionales': 'Sin Hitos Definidos',
+    }
+    return defaults.get(campo_nombre, 'Por Definir')
+
+
+def normalizar_texto_anterior(texto):
+    """Copia de normalizar_texto() antes de la ruta ASCII y str.translate."""
+    if not texto:
+        return ''
+    texto = str(texto).lower()
+    texto_nfd = unicodedata.normalize('NFD', texto)
+    return ''.join(char for char in texto_nfd if unicodedata.category(char) != 'Mn')
+
+
+def construir_obras(filas):
+    """
+    Replica las filas reales de data/ hasta alcanzar `filas` obras (sin guardar).
+    """
+    ruta, tipo = localizar_archivo('data')
+    if ruta is None:
+        print("❌ No se encontró 'datos.xlsx' ni 'datos.csv' en la carpeta data.")
+        sys.exit(1)
+
+    df = leer_completo(ruta, tipo).iloc[1:]
+    hoja = df.sample(n=filas, replace=True, random_state=42)
+    hoja.index = range(1, filas + 1)
+    registros, _ = limpiar_con_huella(hoja)
+    return [Obra(id=num, **datos) for num, datos in enumerate(registros, start=1)]
+
+
+def textos_de(obras):
+    """Todos los valores de los campos que capitaliza el serializer."""
+    return [getattr(obra, campo, None) for obra in obras for campo in ObraSerializer.CAMPOS_A_CAPITALIZAR]
+
+
+def medir(func, iterations=5):
+    """
+    Ejecuta la función varias veces y devuelve el mejor tiempo en ms.
+    """
+    mejor = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        mejor = elapsed_ms if mejor is None else min(mejor, elapsed_ms)
+    return mejor
+
+
+def serializar_paginas(obras, anterior):
+    """Serializa las obras en páginas de 100 con los kernels anteriores o actuales."""
+    def paginas():
+        return [ObraSerializer(obras[i:i + 100], many=True).data for i in range(0, len(obras), 100)]
+
+    if not anterior:
+        return paginas
+    def con_kernels_anteriores():
+        with mock.patch.object(serializers_poa, 'capitalizar_texto', capitalizar_texto_anterior), \
+             mock.patch.object(serializers_poa, 'obtener_valor_por_defecto', obtener_valor_por_defecto_anterior):
+            return paginas()
+    return con_kernels_anteriores
+
+
+def print_results(results, title="Resultados de Benchmark"):
+    """
+    Imprime resultados de benchmark en formato tabla.
+    """
+    print()
+    print("=" * 80)
+    print(f"  {title}")
+    print("=" * 80)
+    print()
+    print(f"{'Operación':<36} {'Anterior (ms)':<15} {'Actual (ms)':<13} {'Speedup':<9} {'Idéntico':<8}")
+    print("-" * 80)
+
+    for r in results:
+        print(f"{r['name']:<36} {r['anterior']:>13.1f}  {r['actual']:>11.1f}  "
+              f"{r['anterior'] / r['actual']:>6.1f}x  {'sí' if r['identico'] else 'NO':>8}")
+
+    print("-" * 80)
+    print()
+
+
+def run_benchmarks(filas=1000):
+    print()
+    print("🚀 BENCHMARK DE TEXTOS (SERIALIZER E IMPORTACIÓN)")
+    print()
+
+    obras = construir_obras(filas)
+    textos = textos_de(obras)
+    campos = [campo for _ in obras for campo in ObraSerializer.CAMPOS_A_CAPITALIZAR]
+    print(f"Dataset: {len(obras)} obras, {len(textos)} textos")
+    print()
+
+    casos = [
+        ("capitalizar_texto", lambda f: lambda: [f(t) for t in textos],
+         capitalizar_texto_anterior, capitalizar_texto),
+        ("obtener_valor_por_defecto", lambda f: lambda: [f(c, t) for c, t in zip(campos, textos)],
+         obtener_valor_por_defecto_anterior, obtener_valor_por_defecto),
+        ("normalizar_texto", lambda f: lambda: [f(t) for t in textos],
+         normalizar_texto_anterior, normalizar_texto),
+    ]
+
+    results = []
+    for nombre, ejecutar, anterior, actual in casos:
+        print(f"⏳ {nombre}...")
+        results.append({
+            'name': nombre,
+            'anterior': medir(ejecutar(anterior)),
+            'actual': medir(ejecutar(actual)),
+            'identico': ejecutar(anterior)() == ejecutar(actual)(),
+        })
+
+    print(f"⏳ ObraSerializer (páginas de 100)...")
+    results.append({
+        'name': f"ObraSerializer {len(obras) // 100} páginas de 100",
+        'anterior': medir(serializar_paginas(obras, anterior=True)),
+        'actual': medir(serializar_paginas(obras, anterior=False)),
+        'identico': serializar_paginas(obras, anterior=True)() == serializar_paginas(obras, anterior=False)(),
+    })
+
+    print_results(results, "TEXTOS: ANTERIOR VS ACTUAL")
+
+    if not all(r['identico'] for r in results):
+        print("❌ Las versiones actuales NO producen el mismo resultado")
+        sys.exit(1)
+    print("✅ Las versiones actuales producen exactamente el mismo resultado")
+
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmarks(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
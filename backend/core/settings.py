@@ -93,6 +93,23 @@ DATABASES = {
 }
 
 
+# Cache
+# Fragmentos JSON de cada obra para los listados (poa/fragmentos.py).
+# LocMem es por proceso; con varios workers conviene un backend compartido.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'obras_json': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'obras-json',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -130,3 +147,11 @@ USE_TZ = True
 STATIC_URL = 'static/'
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+REST_FRAMEWORK = {
+    # orjson si está instalado (poa/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'poa.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
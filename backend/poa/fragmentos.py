@@ -0,0 +1,115 @@
+"""
+Caché de la representación JSON de cada obra para los listados.
+
+Cada obra se renderiza una vez (ObraSerializerRapido + ORJSONRenderer) y el
+fragmento se guarda en la caché 'obras_json' con la llave:
+
+    versión del formato : campos pedidos : fecha : id : huella
+
+- huella: SHA-256 de la fila limpia que escribió la importación. Una
+  importación que cambia la fila le da otra huella (llave nueva) y las
+  filas sin cambios conservan su fragmento.
+- Una edición fuera de la importación (ObraViewSet, admin) pasa por
+  Obra.save(), que deja la huella en None: esas filas no se guardan en
+  caché hasta que la importación vuelva a escribirlas.
+- fecha: estatus_general depende del día (la misma regla que
+  recalcular_estatus()), así que los fragmentos de ayer no se reutilizan.
+
+Los listados paginan solo (id, huella), piden los fragmentos a la caché y
+leen de la base únicamente las obras que faltan. Sin paginación
+(page_size=todos) la respuesta se arma en partes de TAMANO_LOTE obras
+mientras se recorren las llaves con un iterador (memoria acotada).
+"""
+
+import hashlib
+from datetime import date
+
+from django.core.cache import caches
+
+from .models import Obra
+from .renderers import FragmentosJSON, ORJSONRenderer
+from .serializers import ObraSerializerRapido
+
+# Subir cuando cambie el formato de la representación (serializer o renderer)
+VERSION_FORMATO = 2
+
+# Obras leídas por consulta al completar fragmentos faltantes y por parte
+# de una respuesta en partes
+TAMANO_LOTE = 2000
+
+
+class CacheFragmentos:
+    """Fragmentos JSON por obra para una representación (campos de ?fields=)."""
+
+    def __init__(self, campos=None):
+        self.rapido = ObraSerializerRapido(campos)
+        self.cache = caches['obras_json']
+        self.renderer = ORJSONRenderer()
+        if campos is None:
+            self.representacion = 'completa'
+        else:
+            self.representacion = hashlib.sha1(','.join(campos).encode('utf-8')).hexdigest()[:12]
+
+    def llaves(self, queryset):
+        """Pares (id, huella) del queryset, lo único que hace falta paginar."""
+        return queryset.values_list('id', 'huella')
+
+    def renderizar(self, llaves):
+        """
+        Fragmentos de las obras `llaves` [(id, huella), ...] en ese orden.
+
+        Returns:
+            FragmentosJSON
+        """
+        hoy = date.today()
+        llaves = list(llaves)
+        claves = {
+            obra_id: self._clave(obra_id, huella, hoy)
+            for obra_id, huella in llaves if huella
+        }
+        en_cache = self.cache.get_many(claves.values())
+        fragmentos = {obra_id: en_cache[clave] for obra_id, clave in claves.items() if clave in en_cache}
+
+        faltantes = [obra_id for obra_id, _ in llaves if obra_id not in fragmentos]
+        nuevos = {}
+        for inicio in range(0, len(faltantes), TAMANO_LOTE):
+            lote = Obra.objects.filter(pk__in=faltantes[inicio:inicio + TAMANO_LOTE])
+            for fila in lote.values(*self.rapido.columnas, 'huella'):
+                fragmento = self.renderer.render(self.rapido.representar_fila(fila, hoy))
+                fragmentos[fila['id']] = fragmento
+                # Llave con la huella recién leída: la fila pudo cambiar después de paginar
+                if fila['huella']:
+                    nuevos[self._clave(fila['id'], fila['huella'], hoy)] = fragmento
+        if nuevos:
+            self.cache.set_many(nuevos)
+
+        # Una obra borrada entre la paginación y la lectura ya no aparece
+        return FragmentosJSON([fragmentos[obra_id] for obra_id, _ in llaves if obra_id in fragmentos])
+
+    def en_partes(self, llaves, resto=None):
+        """
+        Bytes del arreglo JSON de `llaves` por partes de TAMANO_LOTE obras.
+        Con `resto` (dict) arma {"results": [...], **resto}.
+        """
+        if resto is not None:
+            yield b'{"results":'
+
+        yield b'['
+        separador = b''
+        lote = []
+        for llave in llaves.iterator(chunk_size=TAMANO_LOTE):
+            lote.append(llave)
+            if len(lote) == TAMANO_LOTE:
+                parte = self.renderizar(lote).fragmentos
+                if parte:
+                    yield separador + b','.join(parte)
+                    separador = b','
+                lote = []
+        parte = self.renderizar(lote).fragmentos if lote else None
+        yield (separador + b','.join(parte) if parte else b'') + b']'
+
+        if resto is not None:
+            yield (b',' + self.renderer.render(resto)[1:]) if resto else b'}'
+
+    def _clave(self, obra_id, huella, hoy):
+        return f'obra:{VERSION_FORMATO}:{self.representacion}:{hoy.isoformat()}:{obra_id}:{huella}'
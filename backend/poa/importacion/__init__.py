@@ -0,0 +1,18 @@
+"""
+Pipeline de importación de datos del POA.
+
+Separa la lectura de archivos (Excel/CSV) de la limpieza de filas para que
+el comando `importar_excel` pueda procesar los datos completos, por bloques
+o de forma incremental (solo las filas que cambiaron).
+"""
+
+from .lectores import localizar_archivo, leer_completo, leer_por_bloques
+from .limpieza import limpiar_fila, limpiar_bloque
+from .incremental import (
+	huella_registro, planificar_cambios, agrupar_guardadas, planificar_bloque, filas_sobrantes
+)
+
+__all__ = [
+	'localizar_archivo', 'leer_completo', 'leer_por_bloques', 'limpiar_fila', 'limpiar_bloque',
+	'huella_registro', 'planificar_cambios', 'agrupar_guardadas', 'planificar_bloque', 'filas_sobrantes',
+]
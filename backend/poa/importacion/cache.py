@@ -0,0 +1,200 @@
+"""
+Caché columnar de la hoja ya leída (importar_excel).
+
+Leer un .xlsx grande es la parte más lenta de la importación. La primera
+lectura guarda las celdas crudas en `data/.cache/<sha256>.parquet` (o `.npz`
+si pyarrow no está instalado); mientras el archivo no cambie, las siguientes
+importaciones cargan la caché en lugar de volver a interpretar el Excel.
+
+La caché no usa pickle: cada columna object se guarda como arreglos tipados
+(tipo de celda, números, enteros, textos) y se reconstruye con los mismos
+tipos de Python que entrega pandas, así la limpieza produce lo mismo.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .lectores import leer_completo
+
+try:
+	import pyarrow as pa
+	import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depende del entorno
+	pa = None
+
+# Cambiar si cambia el formato, para ignorar cachés viejas
+VERSION_CACHE = 1
+
+# Tipos de celda en columnas object
+_NULO, _FLOAT, _ENTERO, _TEXTO, _DATETIME, _TIMESTAMP, _BOOL = range(7)
+
+
+def hash_archivo(ruta, tamano_lectura=1 << 20):
+	"""SHA-256 del contenido del archivo."""
+	sha = hashlib.sha256()
+	with open(ruta, 'rb') as archivo:
+		for parte in iter(lambda: archivo.read(tamano_lectura), b''):
+			sha.update(parte)
+	return sha.hexdigest()
+
+
+def leer_con_cache(ruta, tipo, directorio=None, refrescar=False):
+	"""
+	Igual que leer_completo(), pero reutiliza la hoja ya leída si el archivo no cambió.
+
+	Args:
+		ruta: archivo de datos (.xlsx o .csv)
+		tipo: 'xlsx' o 'csv'
+		directorio: carpeta de la caché (default: <carpeta del archivo>/.cache)
+		refrescar: ignora la caché existente y la vuelve a generar
+
+	Returns:
+		tuple: (DataFrame, desde_cache)
+	"""
+	directorio = directorio or os.path.join(os.path.dirname(ruta), '.cache')
+	base = os.path.join(directorio, f'{hash_archivo(ruta)}-v{VERSION_CACHE}')
+	ruta_cache = base + ('.parquet' if pa is not None else '.npz')
+
+	if not refrescar and os.path.exists(ruta_cache):
+		try:
+			return _cargar(ruta_cache), True
+		except Exception:
+			pass  # Caché dañada: se regenera
+
+	df = leer_completo(ruta, tipo)
+	codificado = _codificar(df)
+	if codificado is not None:
+		os.makedirs(directorio, exist_ok=True)
+		_guardar(ruta_cache, codificado)
+		_limpiar_obsoletas(directorio, ruta_cache)
+	return df, False
+
+
+def _codificar(df):
+	"""
+	Convierte el DataFrame en arreglos planos.
+	Devuelve None si alguna celda tiene un tipo no soportado (no se guarda caché).
+	"""
+	n = len(df)
+	arreglos = {}
+	columnas = []
+
+	for j, nombre in enumerate(df.columns):
+		serie = df[nombre]
+		if serie.dtype != object:
+			arreglos[f'c{j}_datos'] = serie.to_numpy()
+			columnas.append(str(serie.dtype))
+			continue
+
+		tipos = np.zeros(n, dtype=np.int8)
+		numeros = np.zeros(n, dtype=np.float64)
+		enteros = np.zeros(n, dtype=np.int64)
+		textos = [''] * n
+
+		for i, valor in enumerate(serie.tolist()):
+			if isinstance(valor, bool):
+				tipos[i] = _BOOL
+				enteros[i] = valor
+			elif isinstance(valor, int):
+				if not -2**63 <= valor < 2**63:
+					return None
+				tipos[i] = _ENTERO
+				enteros[i] = valor
+			elif isinstance(valor, float):
+				tipos[i] = _NULO if np.isnan(valor) else _FLOAT
+				numeros[i] = valor
+			elif isinstance(valor, str):
+				if '\x00' in valor:  # numpy recorta NUL al final de los textos
+					return None
+				tipos[i] = _TEXTO
+				textos[i] = valor
+			elif isinstance(valor, pd.Timestamp):
+				tipos[i] = _TIMESTAMP
+				textos[i] = valor.isoformat()
+			elif isinstance(valor, datetime):
+				tipos[i] = _DATETIME
+				textos[i] = valor.isoformat()
+			elif valor is None:
+				tipos[i] = _NULO
+				numeros[i] = np.nan
+			else:
+				return None
+
+		arreglos[f'c{j}_tipo'] = tipos
+		arreglos[f'c{j}_num'] = numeros
+		arreglos[f'c{j}_ent'] = enteros
+		arreglos[f'c{j}_txt'] = np.array(textos, dtype=str) if n else np.array([], dtype=str)
+		columnas.append('object')
+
+	meta = {'columnas': [int(c) if isinstance(c, (int, np.integer)) else str(c) for c in df.columns],
+	        'dtypes': columnas, 'filas': n}
+	return meta, arreglos
+
+
+def _decodificar(meta, leer_arreglo):
+	datos = {}
+	for j, (nombre, dtype) in enumerate(zip(meta['columnas'], meta['dtypes'])):
+		if dtype != 'object':
+			datos[nombre] = pd.Series(leer_arreglo(f'c{j}_datos'), dtype=dtype)
+			continue
+
+		tipos = leer_arreglo(f'c{j}_tipo').tolist()
+		numeros = leer_arreglo(f'c{j}_num').tolist()
+		enteros = leer_arreglo(f'c{j}_ent').tolist()
+		textos = leer_arreglo(f'c{j}_txt').tolist()
+
+		valores = []
+		for tipo, numero, entero, texto in zip(tipos, numeros, enteros, textos):
+			if tipo == _TEXTO:
+				valores.append(texto)
+			elif tipo == _FLOAT or tipo == _NULO:
+				valores.append(numero)
+			elif tipo == _ENTERO:
+				valores.append(entero)
+			elif tipo == _BOOL:
+				valores.append(bool(entero))
+			elif tipo == _TIMESTAMP:
+				valores.append(pd.Timestamp(texto))
+			else:
+				valores.append(datetime.fromisoformat(texto))
+		datos[nombre] = pd.Series(valores, dtype=object)
+
+	return pd.DataFrame(datos, index=pd.RangeIndex(meta['filas']))
+
+
+def _guardar(ruta_cache, codificado):
+	meta, arreglos = codificado
+	temporal = ruta_cache + '.tmp'
+	if ruta_cache.endswith('.parquet'):
+		tabla = pa.table({nombre: pa.array(valores) for nombre, valores in arreglos.items()})
+		tabla = tabla.replace_schema_metadata({'poa_meta': json.dumps(meta)})
+		pq.write_table(tabla, temporal)
+	else:
+		with open(temporal, 'wb') as archivo:
+			np.savez_compressed(archivo, _meta=np.array(json.dumps(meta)), **arreglos)
+	# Reemplazo atómico: una importación concurrente nunca lee una caché a medias
+	os.replace(temporal, ruta_cache)
+
+
+def _cargar(ruta_cache):
+	if ruta_cache.endswith('.parquet'):
+		tabla = pq.read_table(ruta_cache)
+		meta = json.loads(tabla.schema.metadata[b'poa_meta'])
+		return _decodificar(meta, lambda nombre: tabla.column(nombre).to_numpy())
+
+	with np.load(ruta_cache, allow_pickle=False) as archivo:
+		meta = json.loads(str(archivo['_meta']))
+		return _decodificar(meta, lambda nombre: archivo[nombre])
+
+
+def _limpiar_obsoletas(directorio, vigente):
+	"""Conserva solo la caché del archivo actual."""
+	for nombre in os.listdir(directorio):
+		ruta = os.path.join(directorio, nombre)
+		if ruta != vigente and nombre.endswith(('.parquet', '.npz')):
+			os.remove(ruta)
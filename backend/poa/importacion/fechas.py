@@ -0,0 +1,280 @@
+"""
+Motor de parsing de fechas para la importación del POA.
+
+Misma lógica que el parse_date original, pero:
+- Los patrones se compilan una sola vez al cargar el módulo.
+- Una sola regex con todos los nombres de mes (español/inglés) detecta qué
+  meses aparecen; solo esos se prueban con sus patrones específicos.
+- Los textos se memorizan en una caché LRU (los valores se repiten mucho
+  entre filas: "Enero 2026", "Por definir", ...).
+
+parsear_fechas() procesa una columna completa y lleva estadísticas de
+rendimiento (valores/s y tasa de aciertos de la caché).
+"""
+
+import re
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import pandas as pd
+
+# Tamaño de la caché de textos ya interpretados
+TAMANO_CACHE = 8192
+
+# Diccionario de meses (español e inglés). El orden importa: ante varios
+# meses en un mismo texto gana el primero de esta lista.
+MESES = {
+	'enero': 1, 'ene': 1, 'january': 1, 'jan': 1,
+	'febrero': 2, 'feb': 2, 'february': 2,
+	'marzo': 3, 'mar': 3, 'march': 3,
+	'abril': 4, 'abr': 4, 'april': 4, 'apr': 4,
+	'mayo': 5, 'may': 5,
+	'junio': 6, 'jun': 6, 'june': 6,
+	'julio': 7, 'jul': 7, 'july': 7,
+	'agosto': 8, 'ago': 8, 'august': 8, 'aug': 8,
+	'septiembre': 9, 'sep': 9, 'september': 9, 'sept': 9,
+	'octubre': 10, 'oct': 10, 'october': 10,
+	'noviembre': 11, 'nov': 11, 'november': 11,
+	'diciembre': 12, 'dic': 12, 'december': 12, 'dec': 12
+}
+
+# Todos los nombres como palabra completa (los más largos primero)
+_PATRON_MESES = re.compile(
+	r'\b(?:' + '|'.join(sorted(MESES, key=len, reverse=True)) + r')\b'
+)
+
+# Por mes: "mes año" (ej: "abril 2026") y "día mes año" (ej: "28 de noviembre de 2025")
+_PATRONES_MES_ANIO = [
+	(nombre, numero, re.compile(rf'\b{nombre}\b\s+(\d{{2,4}})'))
+	for nombre, numero in MESES.items()
+]
+_PATRONES_DIA_MES_ANIO = [
+	(nombre, numero, re.compile(rf'(\d{{1,2}})\s+(?:de\s+)?{nombre}\b\s+(?:de\s+)?(\d{{2,4}})'))
+	for nombre, numero in MESES.items()
+]
+
+_PATRON_NUMEROS = re.compile(r'\d+')
+_PATRON_ISO = re.compile(r'^\d{4}[-/]\d{1,2}[-/]\d{1,2}$')
+_PATRON_DMY = re.compile(r'^\d{1,2}[-/]\d{1,2}[-/]\d{4}$')
+
+_EPOCA_EXCEL = datetime(1899, 12, 30)
+
+_estadisticas = {
+	'valores': 0, 'segundos': 0.0,
+	'base_aciertos': 0, 'base_fallos': 0,
+	'aciertos_externos': 0, 'fallos_externos': 0,
+}
+
+
+def parse_date(val):
+	"""
+	Normaliza fechas al formato ISO 8601 (YYYY-MM-DD) con lógica inteligente.
+
+	Estrategia de parsing:
+	1. Detecta seriales de Excel
+	2. Busca año (4 dígitos o 2 dígitos)
+	3. Busca mes (1-12 o nombres en español/inglés)
+	4. Busca día (1-31, o usa 01 si no encuentra)
+	5. Intenta formatos comunes: DD/MM/YYYY, YYYY-MM-DD, etc.
+	6. Si falla, prueba orden inverso: YYYY/MM/DD
+
+	Returns:
+		date object o None si no se puede parsear
+	"""
+	try:
+		if pd.isna(val) or val == '':
+			return None
+
+		# 1. Manejo de fecha serial de Excel (enteros/floats)
+		if isinstance(val, (int, float)) and not isinstance(val, bool):
+			return (_EPOCA_EXCEL + timedelta(days=val)).date()
+
+		# 2. Si ya es un objeto date o datetime, extraer date
+		if isinstance(val, datetime):
+			return val.date()
+		if hasattr(val, 'date'):  # pandas Timestamp
+			return val.date()
+	except Exception:
+		return None
+
+	# 3. Texto: se memoriza por valor crudo
+	try:
+		return _parse_texto(val)
+	except TypeError:
+		# Valor no hasheable: se interpreta sin caché
+		return _parse_texto.__wrapped__(val)
+
+
+@lru_cache(maxsize=TAMANO_CACHE, typed=True)
+def _parse_texto(val):
+	try:
+		val_str = str(val).strip().lower()
+
+		# Meses mencionados como palabra completa (normalmente ninguno o uno)
+		presentes = set(_PATRON_MESES.findall(val_str))
+
+		if presentes:
+			# ESTRATEGIA 1: Buscar patrón "mes año" (ej: "abril 2026", "mayo 2026")
+			for mes_nombre, mes_num, patron in _PATRONES_MES_ANIO:
+				if mes_nombre not in presentes:
+					continue
+				match = patron.search(val_str)
+				if match:
+					anio = int(match.group(1))
+					# Convertir año de 2 dígitos a 4 dígitos
+					if anio < 100:
+						anio = 2000 + anio if anio < 50 else 1900 + anio
+					return datetime(anio, mes_num, 1).date()
+
+			# ESTRATEGIA 2: Buscar patrón "día mes año" (ej: "28 de noviembre de 2025")
+			for mes_nombre, mes_num, patron in _PATRONES_DIA_MES_ANIO:
+				if mes_nombre not in presentes:
+					continue
+				match = patron.search(val_str)
+				if match:
+					dia = int(match.group(1))
+					anio = int(match.group(2))
+					if anio < 100:
+						anio = 2000 + anio if anio < 50 else 1900 + anio
+					# Validar día
+					if 1 <= dia <= 31:
+						try:
+							return datetime(anio, mes_num, dia).date()
+						except ValueError:
+							# Día inválido para ese mes, usar día 1
+							return datetime(anio, mes_num, 1).date()
+
+		# ESTRATEGIA 3: Detectar números y separadores (/, -, .)
+		numeros = _PATRON_NUMEROS.findall(val_str)
+
+		if len(numeros) >= 2:
+			nums = [int(n) for n in numeros]
+			dia, mes, anio = None, None, None
+
+			# Buscar año (4 dígitos o 2 dígitos > 31)
+			for i, n in enumerate(nums):
+				if n > 31:  # Probablemente es un año
+					anio = n
+					if anio < 100:
+						anio = 2000 + anio if anio < 50 else 1900 + anio
+					nums[i] = None  # Marcar como usado
+					break
+
+			nums_restantes = [n for n in nums if n is not None]
+
+			if len(nums_restantes) >= 1:
+				# Buscar mes (1-12)
+				for i, n in enumerate(nums_restantes):
+					if 1 <= n <= 12:
+						mes = n
+						nums_restantes[i] = None
+						break
+
+				nums_restantes = [n for n in nums_restantes if n is not None]
+
+				# El número restante es el día (o None)
+				if len(nums_restantes) > 0:
+					dia = nums_restantes[0] if 1 <= nums_restantes[0] <= 31 else 1
+				else:
+					dia = 1  # Día por defecto
+
+			# Si tenemos mes y año, construir fecha
+			if mes and anio:
+				dia = dia or 1
+				try:
+					return datetime(anio, mes, dia).date()
+				except ValueError:
+					# Si el día es inválido, usar día 1
+					return datetime(anio, mes, 1).date()
+
+		# ESTRATEGIA 4: Formatos estándar con separadores
+		# ISO: YYYY-MM-DD o YYYY/MM/DD
+		if _PATRON_ISO.match(val_str):
+			for fmt in ["%Y-%m-%d", "%Y/%m/%d"]:
+				try:
+					return datetime.strptime(val_str, fmt).date()
+				except ValueError:
+					continue
+
+		# Europeo/Latino: DD/MM/YYYY o DD-MM-YYYY, luego Americano: MM/DD/YYYY
+		if _PATRON_DMY.match(val_str):
+			for fmt in ["%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%m/%d/%Y"]:
+				try:
+					return datetime.strptime(val_str, fmt).date()
+				except ValueError:
+					continue
+
+		# ESTRATEGIA 5: Fallback con pandas
+		parsed = pd.to_datetime(val, errors='coerce')
+		if pd.notna(parsed):
+			return parsed.date()
+
+		return None
+
+	except Exception:
+		return None
+
+
+def parsear_fechas(valores):
+	"""
+	Interpreta una columna completa de fechas.
+
+	Args:
+		valores: iterable de celdas crudas
+
+	Returns:
+		list: date o None por cada celda, en el mismo orden
+	"""
+	inicio = time.perf_counter()
+	resultado = [parse_date(v) for v in valores]
+	_estadisticas['valores'] += len(resultado)
+	_estadisticas['segundos'] += time.perf_counter() - inicio
+	return resultado
+
+
+def estadisticas():
+	"""
+	Rendimiento acumulado desde el último reinicio.
+
+	Returns:
+		dict: valores, segundos, valores_por_segundo, aciertos_cache,
+		      fallos_cache y tasa_aciertos (0-1, sobre los textos consultados)
+	"""
+	info = _parse_texto.cache_info()
+	aciertos = info.hits - _estadisticas['base_aciertos'] + _estadisticas['aciertos_externos']
+	fallos = info.misses - _estadisticas['base_fallos'] + _estadisticas['fallos_externos']
+	segundos = _estadisticas['segundos']
+	return {
+		'valores': _estadisticas['valores'],
+		'segundos': segundos,
+		'valores_por_segundo': _estadisticas['valores'] / segundos if segundos > 0 else 0.0,
+		'aciertos_cache': aciertos,
+		'fallos_cache': fallos,
+		'tasa_aciertos': aciertos / (aciertos + fallos) if aciertos + fallos else 0.0,
+	}
+
+
+def reiniciar_estadisticas(vaciar_cache=False):
+	"""Pone en cero los contadores (y opcionalmente vacía la caché)."""
+	_estadisticas['valores'] = 0
+	_estadisticas['segundos'] = 0.0
+	_estadisticas['aciertos_externos'] = 0
+	_estadisticas['fallos_externos'] = 0
+	if vaciar_cache:
+		_parse_texto.cache_clear()
+	# cache_info no se reinicia sin vaciar la caché: se descuenta lo acumulado
+	info = _parse_texto.cache_info()
+	_estadisticas['base_aciertos'] = info.hits
+	_estadisticas['base_fallos'] = info.misses
+
+
+def sumar_estadisticas(otras):
+	"""
+	Acumula las estadísticas de otro proceso (ver paralelo.py).
+	Los segundos se suman: el rendimiento queda expresado por proceso.
+	"""
+	_estadisticas['valores'] += otras['valores']
+	_estadisticas['segundos'] += otras['segundos']
+	_estadisticas['aciertos_externos'] += otras['aciertos_cache']
+	_estadisticas['fallos_externos'] += otras['fallos_cache']
@@ -0,0 +1,140 @@
+"""
+Importación incremental: huellas por fila y plan de cambios.
+
+Cada fila limpia se resume en una huella (SHA-256). Al reimportar, las filas
+se cruzan con la tabla por `id_excel` y solo se insertan, actualizan o
+eliminan las que realmente cambiaron. No depende de la base de datos.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+
+from poa.utils import CAMPOS_DERIVADOS, CAMPOS_NORMALIZADOS
+
+# Columnas que no entran en la huella: la huella misma y las que se calculan
+# desde las columnas del archivo. estatus_calculado además depende de la fecha
+# de hoy: con él, la misma fila tendría otra huella al día siguiente.
+CAMPOS_SIN_HUELLA = frozenset({
+	'huella', *CAMPOS_NORMALIZADOS, *CAMPOS_DERIVADOS, 'estatus_calculado', 'riesgos_lista',
+})
+
+
+def huella_registro(datos):
+	"""
+	Calcula la huella de una fila limpia, solo sobre las columnas del archivo
+	(sin CAMPOS_SIN_HUELLA): es la misma cualquier día mientras la fila no cambie.
+
+	Args:
+		datos: dict de campos de Obra (salida de limpiar_fila/limpiar_bloque)
+
+	Returns:
+		str: SHA-256 hexadecimal (64 caracteres)
+	"""
+	origen = {campo: valor for campo, valor in datos.items() if campo not in CAMPOS_SIN_HUELLA}
+	contenido = json.dumps(origen, sort_keys=True, default=str, ensure_ascii=False)
+	return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def planificar_cambios(registros, existentes):
+	"""
+	Compara las filas del archivo contra las filas guardadas.
+
+	`id_excel` no es único en el POA, así que dentro de cada id primero se
+	emparejan las filas con huella idéntica (sin cambios) y las restantes se
+	emparejan en orden (archivo vs pk ascendente).
+
+	Args:
+		registros: lista de dicts limpios, cada uno con su 'huella'
+		existentes: iterable de (pk, id_excel, huella) de la tabla actual
+
+	Returns:
+		dict con:
+			insertar: lista de dicts nuevos
+			actualizar: lista de (pk, dict) con cambios
+			eliminar: lista de pks que ya no están en el archivo
+			sin_cambios: número de filas idénticas
+	"""
+	guardadas = agrupar_guardadas(existentes)
+	plan = planificar_bloque(registros, guardadas)
+	plan['eliminar'] = filas_sobrantes(guardadas)
+	return plan
+
+
+def agrupar_guardadas(existentes):
+	"""
+	Filas guardadas por id_excel, en orden de pk: el único estado que
+	planificar_bloque() necesita conservar entre bloques.
+
+	Args:
+		existentes: iterable de (pk, id_excel, huella) de la tabla actual
+
+	Returns:
+		dict: {id_excel: [(pk, huella), ...]}
+	"""
+	guardadas = defaultdict(list)
+	for pk, id_excel, huella in sorted(existentes):
+		guardadas[_llave(id_excel)].append((pk, huella))
+	return guardadas
+
+
+def planificar_bloque(registros, guardadas):
+	"""
+	Plan de un bloque del archivo (o del archivo completo) contra las filas
+	guardadas que ningún bloque anterior emparejó.
+
+	Las filas guardadas que el bloque empareja se quitan de `guardadas`; las
+	que quedan pueden emparejarse en un bloque posterior y, al terminar el
+	archivo, son las que se eliminan (filas_sobrantes).
+
+	Returns:
+		dict con insertar, actualizar y sin_cambios (ver planificar_cambios)
+	"""
+	nuevas = defaultdict(list)
+	for posicion, datos in enumerate(registros):
+		nuevas[_llave(datos['id_excel'])].append((posicion, datos))
+
+	plan = {'insertar': [], 'actualizar': [], 'sin_cambios': 0}
+
+	for id_excel, filas in nuevas.items():
+		disponibles = guardadas.pop(id_excel, [])
+
+		# 1) Filas idénticas: se conservan tal cual
+		por_huella = defaultdict(list)
+		for pk, huella in disponibles:
+			por_huella[huella].append(pk)
+		pendientes = []
+		usadas = set()
+		for posicion, datos in filas:
+			pks = por_huella.get(datos['huella'])
+			if pks:
+				usadas.add(pks.pop(0))
+				plan['sin_cambios'] += 1
+			else:
+				pendientes.append((posicion, datos))
+
+		# 2) Filas modificadas: se emparejan en orden con las guardadas libres
+		libres = [(pk, huella) for pk, huella in disponibles if pk not in usadas]
+		for (pk, _), (_, datos) in zip(libres, pendientes):
+			plan['actualizar'].append((pk, datos))
+
+		# 3) Sobrantes: altas, o guardadas que siguen libres para otro bloque
+		plan['insertar'].extend(pendientes[len(libres):])
+		if len(libres) > len(pendientes):
+			guardadas[id_excel] = libres[len(pendientes):]
+
+	# Las altas conservan el orden del archivo
+	plan['insertar'] = [datos for _, datos in sorted(plan['insertar'], key=lambda p: p[0])]
+	return plan
+
+
+def filas_sobrantes(guardadas):
+	"""pks de las filas guardadas que ningún bloque emparejó: ya no están en el archivo."""
+	return sorted(pk for filas in guardadas.values() for pk, _ in filas)
+
+
+def _llave(id_excel):
+	"""NaN (celda vacía en el archivo) y NULL (tabla) son la misma llave."""
+	if id_excel is None or id_excel != id_excel:
+		return None
+	return id_excel
@@ -0,0 +1,260 @@
+"""
+Importación sin tiempo muerto: carga en una tabla espejo y la intercambia.
+
+La importación completa escribe en `poa_obra_nueva` mientras la API sigue
+leyendo `poa_obra`. Al terminar, ambas tablas se intercambian dentro de una
+sola transacción, de modo que los lectores ven el conjunto anterior completo
+o el nuevo completo, nunca uno a medias.
+
+Las tablas hijas de Obra (RiesgoIdentificado, ObraZona, ObraAlcaldia) también
+se cargan en espejo: sus tablas espejo apuntan a `poa_obra_nueva` y se
+intercambian en la misma transacción, así sus llaves foráneas siempre coinciden
+con la tabla activa. Los catálogos (Alcaldia) no se copian: las tablas espejo
+apuntan a la tabla activa.
+
+La estructura de las tablas espejo se toma del estado de las migraciones (no
+del modelo), para que sea idéntica a la tabla que reemplaza.
+
+La carga en la tabla espejo usa una ruta rápida (carga_masiva/insertar_masivo):
+una sola transacción, índices construidos al final y, en SQLite, pragmas de
+carga y executemany en lugar de INSERTs de 14 filas (límite de 999
+parámetros que Django aplica a bulk_create).
+
+A diferencia del resto del paquete, este módulo sí usa la base de datos.
+"""
+
+import hashlib
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.state import ProjectState
+
+# Modelos que se cargan en espejo y se activan juntos, padres primero
+MODELOS_ESPEJO = ('obra', 'riesgoidentificado', 'obrazona', 'obraalcaldia')
+TABLAS_ESPEJO = tuple(f'poa_{nombre}' for nombre in MODELOS_ESPEJO)
+
+# Catálogos a los que apuntan las tablas espejo: se referencian tal cual, sin copia
+MODELOS_CATALOGO = ('alcaldia',)
+
+SUFIJO_NUEVA = '_nueva'
+SUFIJO_ANTERIOR = '_anterior'
+
+TABLA_ACTIVA = 'poa_obra'
+TABLA_NUEVA = TABLA_ACTIVA + SUFIJO_NUEVA
+TABLA_ANTERIOR = TABLA_ACTIVA + SUFIJO_ANTERIOR
+
+# Prefijo de los índices mientras viven en la tabla espejo
+# (los nombres de índice son únicos por esquema, no por tabla)
+PREFIJO_INDICE = 'nv_'
+
+# Caracteres del SHA-1 del nombre original en el nombre temporal: prefijo más
+# hash caben en los 30 caracteres de Index.name sin truncar el nombre original
+LARGO_HASH_INDICE = 20
+
+# Filas por llamada a executemany en SQLite (no hay límite de parámetros por fila)
+LOTE_SQLITE = 5000
+
+# Pragmas de SQLite durante la carga. Son seguros: con WAL, synchronous=NORMAL
+# no arriesga la integridad del archivo ante un corte (solo la última transacción).
+PRAGMAS_CARGA = {
+	'synchronous': 'NORMAL',
+	'temp_store': 'MEMORY',
+	'cache_size': '-131072',  # 128 MB
+}
+
+
+def crear_tablas_nuevas():
+	"""
+	Crea las tablas espejo vacías (descartando restos de una carga fallida).
+
+	Returns:
+		list: (modelo, indices) por cada modelo de MODELOS_ESPEJO, Obra primero
+			modelo: modelo Django apuntando a la tabla espejo, para bulk_create
+			indices: índices definitivos que debe tener la tabla al activarse
+	"""
+	estado = MigrationLoader(connection).project_state()
+	estado_nuevo = ProjectState()
+	indices = {}
+	for nombre in MODELOS_ESPEJO:
+		modelo = estado.models['poa', nombre].clone()
+		indices[nombre] = modelo.options.get('indexes', [])
+		modelo.options['db_table'] = f'poa_{nombre}{SUFIJO_NUEVA}'
+		modelo.options['indexes'] = []
+		estado_nuevo.add_model(modelo)
+	for nombre in MODELOS_CATALOGO:
+		estado_nuevo.add_model(estado.models['poa', nombre].clone())
+	# Las llaves foráneas de las hijas se resuelven contra la tabla espejo de Obra
+	espejos = [(estado_nuevo.apps.get_model('poa', nombre), indices[nombre]) for nombre in MODELOS_ESPEJO]
+
+	descartar_tablas_nuevas()
+	with connection.schema_editor() as editor:
+		for modelo, _ in espejos:
+			editor.create_model(modelo)
+	return espejos
+
+
+def tamano_lote(modelo):
+	"""
+	Registros por sentencia de inserción para la tabla espejo.
+	En otros motores se usa el máximo que permite su límite de parámetros.
+	"""
+	if connection.vendor == 'sqlite':
+		return LOTE_SQLITE
+	limite = connection.features.max_query_params or 65535
+	return max(1, limite // len(_campos(modelo)))
+
+
+@contextmanager
+def carga_masiva():
+	"""
+	Envuelve la carga de la tabla espejo: una sola transacción y, en SQLite,
+	pragmas de carga que se restauran al terminar.
+	"""
+	anteriores = {}
+	if connection.vendor == 'sqlite':
+		with connection.cursor() as cursor:
+			for pragma, valor in PRAGMAS_CARGA.items():
+				cursor.execute(f'PRAGMA {pragma}')
+				anteriores[pragma] = cursor.fetchone()[0]
+				cursor.execute(f'PRAGMA {pragma} = {valor}')
+	try:
+		with transaction.atomic():
+			yield
+	finally:
+		if anteriores:
+			with connection.cursor() as cursor:
+				for pragma, valor in anteriores.items():
+					cursor.execute(f'PRAGMA {pragma} = {valor}')
+
+
+def insertar_masivo(modelo, obras, lote):
+	"""
+	Inserta instancias en la tabla espejo.
+	SQLite: executemany con una sentencia preparada; otros motores: bulk_create.
+	"""
+	if connection.vendor != 'sqlite':
+		modelo.objects.bulk_create(obras, batch_size=lote)
+		return
+
+	campos = _campos(modelo)
+	sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+		connection.ops.quote_name(modelo._meta.db_table),
+		', '.join(connection.ops.quote_name(campo.column) for campo in campos),
+		', '.join(['%s'] * len(campos)),
+	)
+	with connection.cursor() as cursor:
+		for inicio in range(0, len(obras), lote):
+			filas = [
+				[campo.get_db_prep_save(getattr(obra, campo.attname), connection) for campo in campos]
+				for obra in obras[inicio:inicio + lote]
+			]
+			cursor.executemany(sql, filas)
+
+
+def optimizar_estadisticas():
+	"""Actualiza las estadísticas del planificador tras activar las tablas."""
+	with connection.cursor() as cursor:
+		for tabla in TABLAS_ESPEJO:
+			cursor.execute(f'ANALYZE {connection.ops.quote_name(tabla)}')
+		if connection.vendor == 'sqlite':
+			cursor.execute('PRAGMA optimize')
+
+
+def construir_indices(espejos):
+	"""
+	Construye los índices sobre las tablas espejo, antes del intercambio.
+
+	Solo aplica en motores que pueden renombrar índices (PostgreSQL); en
+	SQLite se crean durante el intercambio, sin bloquear a los lectores (WAL).
+	"""
+	if not connection.features.can_rename_index:
+		return
+	with connection.schema_editor() as editor:
+		for modelo, indices in espejos:
+			for indice in indices:
+				editor.add_index(modelo, _indice_temporal(indice))
+
+
+def intercambiar_tablas(espejos):
+	"""
+	Activa las tablas espejo en una sola transacción. Por cada tabla:
+	poa_x -> poa_x_anterior, poa_x_nueva -> poa_x, y elimina la anterior.
+	"""
+	with connection.schema_editor(atomic=True) as editor:
+		tablas = _tablas()
+		# Hijas primero: apuntan a la tabla anterior de Obra
+		for modelo, _ in reversed(espejos):
+			anterior = _tabla_activa(modelo) + SUFIJO_ANTERIOR
+			if anterior in tablas:
+				editor.execute(editor.sql_delete_table % {'table': editor.quote_name(anterior)})
+
+		# Al renombrar una tabla, las llaves foráneas que la referencian la siguen:
+		# las hijas anteriores quedan en poa_obra_anterior y las nuevas en poa_obra
+		for modelo, _ in espejos:
+			activa = _tabla_activa(modelo)
+			editor.alter_db_table(modelo, activa, activa + SUFIJO_ANTERIOR)
+			editor.alter_db_table(modelo, modelo._meta.db_table, activa)
+			modelo._meta.db_table = activa
+
+		# Eliminar las tablas anteriores libera los nombres de sus índices
+		for modelo, _ in reversed(espejos):
+			anterior = modelo._meta.db_table + SUFIJO_ANTERIOR
+			editor.execute(editor.sql_delete_table % {'table': editor.quote_name(anterior)})
+
+		for modelo, indices in espejos:
+			for indice in indices:
+				if connection.features.can_rename_index:
+					editor.rename_index(modelo, _indice_temporal(indice), indice)
+				else:
+					editor.add_index(modelo, indice)
+
+
+def descartar_tablas_nuevas():
+	"""Elimina las tablas espejo que existan, hijas primero (las activas no se tocan)."""
+	tablas = _tablas()
+	nuevas = [tabla + SUFIJO_NUEVA for tabla in reversed(TABLAS_ESPEJO)]
+	if tablas.isdisjoint(nuevas):
+		return
+	with connection.schema_editor() as editor:
+		for tabla in nuevas:
+			if tabla in tablas:
+				editor.execute(editor.sql_delete_table % {'table': editor.quote_name(tabla)})
+
+
+def _tabla_activa(modelo):
+	"""Nombre de la tabla activa que reemplaza la tabla espejo del modelo."""
+	return modelo._meta.db_table.removesuffix(SUFIJO_NUEVA)
+
+
+def _campos(modelo):
+	"""Columnas que se insertan (todas menos la llave primaria autoincremental)."""
+	return [campo for campo in modelo._meta.concrete_fields if not campo.primary_key]
+
+
+def _indice_temporal(indice):
+	"""
+	Copia del índice con un nombre temporal derivado de un hash del nombre
+	original: recortar el nombre haría chocar dos índices que comparten sus
+	primeros caracteres.
+	"""
+	temporal = indice.clone()
+	huella = hashlib.sha1(indice.name.encode('utf-8')).hexdigest()[:LARGO_HASH_INDICE]
+	temporal.name = PREFIJO_INDICE + huella
+	return temporal
+
+
+def _tablas():
+	with connection.cursor() as cursor:
+		return set(connection.introspection.table_names(cursor))
+
+
+def activar_lectura_concurrente():
+	"""
+	SQLite: el modo WAL permite que la API siga leyendo mientras se escribe
+	la tabla espejo (en modo rollback-journal el commit bloquea a los lectores).
+	El modo queda guardado en el archivo de la base de datos.
+	"""
+	if connection.vendor == 'sqlite':
+		with connection.cursor() as cursor:
+			cursor.execute('PRAGMA journal_mode=WAL')
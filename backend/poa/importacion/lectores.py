@@ -0,0 +1,147 @@
+"""
+Lectores de archivos de datos (Excel/CSV) para la importación del POA.
+
+- leer_completo: carga toda la hoja con pandas (comportamiento original).
+- leer_por_bloques: entrega DataFrames de tamaño fijo sin cargar el archivo
+  completo en memoria (openpyxl read-only o CSV con chunksize).
+
+Ambos lectores devuelven las celdas con los mismos tipos, de modo que la
+limpieza produce resultados idénticos en cualquiera de los dos modos.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+# Número de columnas que espera la limpieza (cols 0-66 del layout del POA)
+NUM_COLUMNAS = 67
+
+# Valores que pandas interpreta como NaN por defecto (na_values de read_excel/read_csv)
+VALORES_NA = {
+	'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+	'1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+	'n/a', 'nan', 'null',
+}
+
+
+def localizar_archivo(base_dir='data'):
+	"""
+	Localiza el archivo de datos priorizando Excel sobre CSV.
+
+	Returns:
+		tuple: (ruta, tipo) donde tipo es 'xlsx' o 'csv', o (None, None)
+	"""
+	xlsx_path = os.path.join(base_dir, 'datos.xlsx')
+	csv_path = os.path.join(base_dir, 'datos.csv')
+
+	if os.path.exists(xlsx_path):
+		return xlsx_path, 'xlsx'
+	if os.path.exists(csv_path):
+		return csv_path, 'csv'
+
+	# Fallback para nombres generados como "datos.xlsx - Sheet1.csv"
+	if os.path.isdir(base_dir):
+		files = sorted(f for f in os.listdir(base_dir) if f.endswith('.csv'))
+		if files:
+			return os.path.join(base_dir, files[0]), 'csv'
+
+	return None, None
+
+
+def leer_completo(ruta, tipo):
+	"""Carga la hoja completa con pandas (header=None, como el layout original)."""
+	if tipo == 'xlsx':
+		return pd.read_excel(ruta, header=None)
+	return pd.read_csv(ruta, header=None)
+
+
+def leer_por_bloques(ruta, tipo, tamano_bloque=1000, omitir_encabezado=True):
+	"""
+	Genera DataFrames de hasta `tamano_bloque` filas.
+
+	El índice de cada bloque continúa la numeración de filas del archivo,
+	igual que `df.iloc[1:]` en la lectura completa.
+	"""
+	if tipo == 'xlsx':
+		yield from _bloques_excel(ruta, tamano_bloque, omitir_encabezado)
+	else:
+		yield from _bloques_csv(ruta, tamano_bloque, omitir_encabezado)
+
+
+def _bloques_csv(ruta, tamano_bloque, omitir_encabezado):
+	# dtype=object evita que la inferencia de tipos cambie de un bloque a otro
+	# (en lectura completa la fila de encabezados ya fuerza columnas object)
+	lector = pd.read_csv(ruta, header=None, chunksize=tamano_bloque, dtype=object)
+	for bloque in lector:
+		if omitir_encabezado and bloque.index[0] == 0:
+			bloque = bloque.iloc[1:]
+		if len(bloque):
+			yield bloque
+
+
+def _bloques_excel(ruta, tamano_bloque, omitir_encabezado):
+	libro = load_workbook(ruta, read_only=True, data_only=True)
+	try:
+		hoja = libro.worksheets[0]
+		hoja.reset_dimensions()
+
+		filas = []
+		indices = []
+		vacias_pendientes = []  # Filas vacías que solo se emiten si hay datos después
+
+		for numero, fila in enumerate(hoja.rows):
+			if omitir_encabezado and numero == 0:
+				continue
+
+			valores = [_convertir_celda(celda) for celda in fila]
+			if all(_es_nulo(v) for v in valores):
+				vacias_pendientes.append(numero)
+				continue
+
+			# Una fila vacía intermedia sí forma parte de la hoja (pandas la conserva)
+			for vacia in vacias_pendientes:
+				indices.append(vacia)
+				filas.append([])
+			vacias_pendientes = []
+
+			indices.append(numero)
+			filas.append(valores)
+
+			if len(filas) >= tamano_bloque:
+				yield _armar_bloque(filas, indices)
+				filas, indices = [], []
+
+		# Las filas vacías finales se descartan, igual que en pd.read_excel
+		if filas:
+			yield _armar_bloque(filas, indices)
+	finally:
+		libro.close()
+
+
+def _convertir_celda(celda):
+	"""Replica la conversión de celdas que hace pandas al leer con openpyxl."""
+	valor = celda.value
+	if valor is None:
+		return np.nan
+	if celda.data_type == TYPE_ERROR:
+		return np.nan
+	if celda.data_type == TYPE_NUMERIC:
+		entero = int(valor)
+		if entero == valor:
+			return entero
+		return float(valor)
+	if isinstance(valor, str) and valor in VALORES_NA:
+		return np.nan
+	return valor
+
+
+def _es_nulo(valor):
+	return valor is None or (isinstance(valor, float) and np.isnan(valor))
+
+
+def _armar_bloque(filas, indices):
+	ancho = max(NUM_COLUMNAS, max(len(f) for f in filas))
+	datos = [f + [np.nan] * (ancho - len(f)) for f in filas]
+	return pd.DataFrame(datos, index=indices, dtype=object)
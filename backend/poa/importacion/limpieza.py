@@ -0,0 +1,440 @@
+"""
+Limpieza de los datos crudos del POA.
+
+- limpiar_fila: versión de referencia, celda por celda.
+- limpiar_bloque: misma salida, pero aplica los limpiadores numéricos una vez
+  por columna (versiones vectorizadas de poa.utils).
+
+Ambas convierten filas crudas (indexadas por número de columna) en los valores
+listos para construir una `Obra`. No dependen de la base de datos.
+"""
+
+import time
+from datetime import date
+import pandas as pd
+from .fechas import parse_date, parsear_fechas
+from poa.utils import (
+	clean_money, 
+	clean_percentage, 
+	interpretar_escala_flexible, 
+	clean_beneficiarios_advanced,
+	clean_money_series,
+	clean_percentage_series,
+	interpretar_escala_series,
+	clean_beneficiarios_series,
+	calcular_puntuacion_ponderada,
+	capitalizar_texto,
+	obtener_valor_por_defecto,
+	normalizar_texto,
+	textos_normalizados,
+	campos_derivados,
+	estatus_proyecto,
+	parsear_riesgos,
+	CAMPOS_NORMALIZADOS,
+	CAMPOS_DERIVADOS,
+	ORIGENES_DERIVADOS,
+)
+
+
+def safe_str(val):
+	"""Retorna el string limpio o None si está vacío"""
+	if pd.isna(val) or val == '':
+		return None
+	return str(val).strip()
+
+
+def safe_str_with_default(val, campo_nombre):
+	"""Retorna string limpio, capitalizado y con valor por defecto si está vacío"""
+	texto = safe_str(val)
+	# Obtener valor por defecto si está vacío
+	texto_con_default = obtener_valor_por_defecto(campo_nombre, texto)
+	# Capitalizar si hay texto
+	if texto_con_default and isinstance(texto_con_default, str):
+		return capitalizar_texto(texto_con_default)
+	return texto_con_default
+
+
+def safe_str_uppercase(val, campo_nombre):
+	"""Retorna string limpio, en MAYÚSCULAS y con valor por defecto si está vacío"""
+	texto = safe_str(val)
+	# Obtener valor por defecto si está vacío
+	texto_con_default = obtener_valor_por_defecto(campo_nombre, texto)
+	# Convertir a mayúsculas si hay texto
+	if texto_con_default and isinstance(texto_con_default, str):
+		return texto_con_default.upper()
+	return texto_con_default
+
+
+def clean_semaphore(val):
+	"""
+	Normaliza valores de semáforos a: ROJO, AMARILLO, VERDE.
+	Acepta variaciones comunes y retorna el valor estandarizado.
+	"""
+	if pd.isna(val) or val == '':
+		return None
+	
+	# Convertir a string y limpiar
+	v = str(val).strip().upper()
+	
+	# Mapeo de variaciones comunes
+	if v in ['ROJO', 'R', 'RED']:
+		return 'ROJO'
+	elif v in ['AMARILLO', 'A', 'YELLOW', 'ÁMBAR', 'AMBAR']:
+		return 'AMARILLO'
+	elif v in ['VERDE', 'V', 'GREEN']:
+		return 'VERDE'
+	
+	# Si no coincide, retornar None para que se trate como GRIS
+	return None
+
+
+def limpiar_fila(row):
+	"""
+	Aplica las reglas de negocio a una fila cruda.
+
+	Args:
+		row: Serie/secuencia indexable por número de columna (0-66)
+
+	Returns:
+		dict: Argumentos para construir `Obra(**datos)`
+	"""
+	# Priorización (interpretamos escalas flexiblemente)
+	alineacion = interpretar_escala_flexible(row[21])
+	impacto = interpretar_escala_flexible(row[22])
+	urgencia = interpretar_escala_flexible(row[23])
+	viabilidad = interpretar_escala_flexible(row[24])
+	recursos = interpretar_escala_flexible(row[25])
+	riesgo = interpretar_escala_flexible(row[26])
+	dependencias = interpretar_escala_flexible(row[27])
+	
+	# Calcular puntuación ponderada automáticamente
+	# (ignoramos el valor del Excel en columna 28 si existe)
+	puntuacion = calcular_puntuacion_ponderada(
+		alineacion, impacto, urgencia, viabilidad, recursos, riesgo, dependencias
+	)
+	
+	datos = dict(
+		# Identificación
+		id_excel=row[0],
+		programa=safe_str_with_default(row[1], 'programa'),
+		area_responsable=safe_str_uppercase(row[2], 'area_responsable'),
+		eje_institucional=safe_str_with_default(row[3], 'eje_institucional'),
+		
+		# Presupuesto (VALORES EN MDP - Millones De Pesos)
+		tipo_recurso=safe_str_with_default(row[4], 'tipo_recurso'),
+		concentrado_programas=safe_str_with_default(row[5], 'concentrado_programas'),
+		capitulo_gasto=safe_str_with_default(row[6], 'capitulo_gasto'),
+		presupuesto_modificado=clean_money(row[7], es_mdp=True),  # En MDP
+		anteproyecto_total=clean_money(row[8], es_mdp=True),      # En MDP
+		meta_2025=clean_money(row[9], es_mdp=False),              # Cantidad de metas (no dinero)
+		meta_2026=clean_money(row[10], es_mdp=False),             # Cantidad de metas (no dinero)
+		unidad_medida=safe_str_with_default(row[11], 'unidad_medida'),
+		costo_unitario=clean_money(row[12], es_mdp=False),        # Costo unitario (no MDP)
+		proyecto_presupuesto=clean_money(row[13], es_mdp=False),  # Verificar si este debe ser MDP
+		multianualidad=safe_str_with_default(row[14], 'multianualidad'),
+
+		# Categorización
+		tipo_obra=safe_str_with_default(row[15], 'tipo_obra'),
+		alcance_territorial=safe_str_with_default(row[16], 'alcance_territorial'),
+		fuente_financiamiento=safe_str_with_default(row[17], 'fuente_financiamiento'),
+		etapa_desarrollo=safe_str_with_default(row[18], 'etapa_desarrollo'),
+		complejidad_tecnica=interpretar_escala_flexible(row[19]),
+		impacto_social_desc=safe_str_with_default(row[20], 'impacto_social_desc'),
+
+		# Priorización (usando valores ya interpretados)
+		alineacion_estrategica=alineacion,
+		impacto_social_nivel=impacto,
+		urgencia=urgencia,
+		viabilidad_ejecucion=viabilidad,
+		recursos_disponibles=recursos,
+		riesgo_nivel=riesgo,
+		dependencias_nivel=dependencias,
+		puntuacion_final_ponderada=puntuacion,  # Calculado automáticamente
+
+		# Semáforos
+		viabilidad_tecnica_semaforo=clean_semaphore(row[29]),
+		viabilidad_presupuestal_semaforo=clean_semaphore(row[30]),
+		viabilidad_juridica_semaforo=clean_semaphore(row[31]),
+		viabilidad_temporal_semaforo=clean_semaphore(row[32]),
+		viabilidad_administrativa_semaforo=clean_semaphore(row[33]),
+
+		# Ubicación y Beneficiarios
+		alcaldias=safe_str_with_default(row[34], 'alcaldias'),
+		ubicacion_especifica=safe_str_with_default(row[35], 'ubicacion_especifica'),
+		beneficiarios_directos=safe_str_with_default(row[36], 'beneficiarios_directos'),
+		beneficiarios_num=clean_beneficiarios_advanced(row[36]),
+		poblacion_objetivo_num=safe_str(row[37]),
+
+		# Fechas
+		fecha_inicio_prog=parse_date(row[38]),
+		fecha_termino_prog=parse_date(row[39]),
+		duracion_meses=safe_str(row[40]),
+		fecha_inicio_real=parse_date(row[41]),
+		fecha_termino_real=parse_date(row[42]),
+
+		# Estatus y Textos
+		avance_fisico_pct=clean_percentage(row[43]),
+		avance_financiero_pct=clean_percentage(row[44]),
+		estatus_general=safe_str_with_default(row[45], 'estatus_general'),
+		permisos_requeridos=safe_str_with_default(row[46], 'permisos_requeridos'),
+		estatus_permisos=safe_str_with_default(row[47], 'estatus_permisos'),
+		requisitos_especificos=safe_str(row[48]),
+		responsable_operativo=safe_str_with_default(row[49], 'responsable_operativo'),
+		contratista=safe_str_with_default(row[50], 'contratista'),
+		observaciones=safe_str_with_default(row[51], 'observaciones'),
+		problemas_identificados=safe_str_with_default(row[52], 'problemas_identificados'),
+		acciones_correctivas=safe_str_with_default(row[53], 'acciones_correctivas'),
+		ultima_actualizacion=parse_date(row[54]),
+		
+		# Narrativa
+		problema_resuelve=safe_str_with_default(row[55], 'problema_resuelve'),
+		solucion_ofrece=safe_str_with_default(row[56], 'solucion_ofrece'),
+		beneficio_ciudadania=safe_str(row[57]),
+		dato_destacable=safe_str(row[58]),
+		alineacion_gobierno=safe_str(row[59]),
+		poblacion_perfil=safe_str(row[60]),
+		relevancia_comunicacional=safe_str(row[61]),
+		hitos_comunicacionales=safe_str_with_default(row[62], 'hitos_comunicacionales'),
+		mensajes_clave=safe_str(row[63]),
+		estrategia_comunicacion=safe_str(row[64]),
+		control_captura=safe_str(row[65]),
+		control_notas=safe_str(row[66]),
+	)
+	# Texto normalizado para búsquedas y zonas (derivado de los campos anteriores)
+	datos.update(textos_normalizados(datos))
+	# Columnas de negocio (presupuesto efectivo, viabilidad, prioridad...)
+	datos.update(campos_derivados(datos))
+	# Estatus a la fecha de hoy (services.recalcular_estatus lo mantiene al día)
+	datos['estatus_calculado'] = estatus_proyecto(
+		datos['avance_fisico_pct'], datos['riesgo_nivel'], datos['fecha_inicio_real']
+	)
+	# Catálogo de riesgos para el análisis de riesgos
+	datos['riesgos_lista'] = parsear_riesgos(datos['problemas_identificados'])
+	return datos
+
+
+# ==================== LIMPIEZA POR COLUMNA ====================
+
+# (campo, columna) de textos capitalizados con valor por defecto
+_CAMPOS_TEXTO_DEFAULT = [
+	('programa', 1), ('eje_institucional', 3), ('tipo_recurso', 4),
+	('concentrado_programas', 5), ('capitulo_gasto', 6), ('unidad_medida', 11),
+	('multianualidad', 14), ('tipo_obra', 15), ('alcance_territorial', 16),
+	('fuente_financiamiento', 17), ('etapa_desarrollo', 18), ('impacto_social_desc', 20),
+	('alcaldias', 34), ('ubicacion_especifica', 35), ('beneficiarios_directos', 36),
+	('estatus_general', 45), ('permisos_requeridos', 46), ('estatus_permisos', 47),
+	('responsable_operativo', 49), ('contratista', 50), ('observaciones', 51),
+	('problemas_identificados', 52), ('acciones_correctivas', 53),
+	('problema_resuelve', 55), ('solucion_ofrece', 56), ('hitos_comunicacionales', 62),
+]
+
+# (campo, columna) de textos sin transformación
+_CAMPOS_TEXTO = [
+	('poblacion_objetivo_num', 37), ('duracion_meses', 40), ('requisitos_especificos', 48),
+	('beneficio_ciudadania', 57), ('dato_destacable', 58), ('alineacion_gobierno', 59),
+	('poblacion_perfil', 60), ('relevancia_comunicacional', 61), ('mensajes_clave', 63),
+	('estrategia_comunicacion', 64), ('control_captura', 65), ('control_notas', 66),
+]
+
+# (campo, columna, es_mdp)
+_CAMPOS_DINERO = [
+	('presupuesto_modificado', 7, True), ('anteproyecto_total', 8, True),
+	('meta_2025', 9, False), ('meta_2026', 10, False),
+	('costo_unitario', 12, False), ('proyecto_presupuesto', 13, False),
+]
+
+# Criterios de priorización en el orden de calcular_puntuacion_ponderada
+_CAMPOS_PRIORIZACION = [
+	('alineacion_estrategica', 21), ('impacto_social_nivel', 22), ('urgencia', 23),
+	('viabilidad_ejecucion', 24), ('recursos_disponibles', 25), ('riesgo_nivel', 26),
+	('dependencias_nivel', 27),
+]
+
+_CAMPOS_SEMAFORO = [
+	('viabilidad_tecnica_semaforo', 29), ('viabilidad_presupuestal_semaforo', 30),
+	('viabilidad_juridica_semaforo', 31), ('viabilidad_temporal_semaforo', 32),
+	('viabilidad_administrativa_semaforo', 33),
+]
+
+_CAMPOS_FECHA = [
+	('fecha_inicio_prog', 38), ('fecha_termino_prog', 39), ('fecha_inicio_real', 41),
+	('fecha_termino_real', 42), ('ultima_actualizacion', 54),
+]
+
+_CAMPOS_PORCENTAJE = [('avance_fisico_pct', 43), ('avance_financiero_pct', 44)]
+
+
+def limpiar_bloque(df, perfil=None):
+	"""
+	Limpia un DataFrame crudo columna por columna.
+
+	Args:
+		df: DataFrame con columnas numeradas (0-66), una fila por obra
+		perfil: PerfilImportacion opcional; registra tiempo y valores no
+		        interpretables por columna (importar_excel --profile)
+
+	Returns:
+		tuple: (registros, errores)
+			registros: lista de dicts para `Obra(**datos)`, en el orden del bloque
+			errores: lista de (fila, valor de la columna 0, excepción) de filas descartadas
+	"""
+	errores = {}
+	col = {}
+	medir = _medidor(df, perfil)
+
+	# Priorización primero (mismo orden de evaluación que limpiar_fila)
+	for campo, num in _CAMPOS_PRIORIZACION:
+		col[campo] = medir(campo, num, 'interpretar_escala', lambda: _columna(
+			errores, df[num], interpretar_escala_series, interpretar_escala_flexible
+		))
+	criterios = [col[campo] for campo, _ in _CAMPOS_PRIORIZACION]
+	col['puntuacion_final_ponderada'] = medir(
+		'puntuacion_final_ponderada', None, 'calcular_puntuacion_ponderada',
+		lambda: [calcular_puntuacion_ponderada(*c) for c in zip(*criterios)]
+	)
+
+	col['id_excel'] = df[0].tolist()
+	col['area_responsable'] = medir('area_responsable', 2, 'safe_str_uppercase', lambda: _por_celda(
+		errores, df[2], lambda v: safe_str_uppercase(v, 'area_responsable')
+	))
+	for campo, num in _CAMPOS_TEXTO_DEFAULT:
+		col[campo] = medir(campo, num, 'safe_str_with_default', lambda: _por_celda(
+			errores, df[num], lambda v: safe_str_with_default(v, campo)
+		))
+	for campo, num in _CAMPOS_TEXTO:
+		col[campo] = medir(campo, num, 'safe_str', lambda: _por_celda(errores, df[num], safe_str))
+	for campo, num, es_mdp in _CAMPOS_DINERO:
+		col[campo] = medir(campo, num, 'clean_money', lambda: _columna(
+			errores, df[num],
+			lambda s: clean_money_series(s, es_mdp=es_mdp),
+			lambda v: clean_money(v, es_mdp=es_mdp)
+		))
+	col['complejidad_tecnica'] = medir('complejidad_tecnica', 19, 'interpretar_escala', lambda: _columna(
+		errores, df[19], interpretar_escala_series, interpretar_escala_flexible
+	))
+	for campo, num in _CAMPOS_SEMAFORO:
+		col[campo] = medir(campo, num, 'clean_semaphore', lambda: _por_celda(errores, df[num], clean_semaphore))
+	col['beneficiarios_num'] = medir('beneficiarios_num', 36, 'clean_beneficiarios', lambda: _columna(
+		errores, df[36], clean_beneficiarios_series, clean_beneficiarios_advanced
+	))
+	for campo, num in _CAMPOS_FECHA:
+		col[campo] = medir(campo, num, 'parse_date', lambda: parsear_fechas(df[num].tolist()))
+	for campo, num in _CAMPOS_PORCENTAJE:
+		col[campo] = medir(campo, num, 'clean_percentage', lambda: _columna(
+			errores, df[num], clean_percentage_series, clean_percentage
+		))
+
+	for campo, origen in CAMPOS_NORMALIZADOS.items():
+		col[campo] = medir(campo, None, 'normalizar_texto', lambda: _normalizar_columna(col[origen]))
+
+	derivados = medir('derivados', None, 'campos_derivados', lambda: [
+		campos_derivados(dict(zip(ORIGENES_DERIVADOS, valores)))
+		for valores in zip(*(col[origen] for origen in ORIGENES_DERIVADOS))
+	])
+	for campo in CAMPOS_DERIVADOS:
+		col[campo] = [fila[campo] for fila in derivados]
+
+	hoy = date.today()
+	col['estatus_calculado'] = medir('estatus_calculado', None, 'estatus_proyecto', lambda: [
+		estatus_proyecto(avance, riesgo, fecha, hoy)
+		for avance, riesgo, fecha in zip(col['avance_fisico_pct'], col['riesgo_nivel'], col['fecha_inicio_real'])
+	])
+	col['riesgos_lista'] = medir('riesgos_lista', None, 'parsear_riesgos', lambda: [
+		parsear_riesgos(texto) for texto in col['problemas_identificados']
+	])
+
+	campos = _ORDEN_CAMPOS
+	registros = []
+	descartadas = []
+	for posicion, (indice, id_excel) in enumerate(zip(df.index, col['id_excel'])):
+		if indice in errores:
+			descartadas.append((indice, id_excel, errores[indice]))
+			continue
+		registros.append({campo: col[campo][posicion] for campo in campos})
+
+	return registros, descartadas
+
+
+def _medidor(df, perfil):
+	"""
+	Devuelve medir(campo, num, limpiador, calcular): ejecuta calcular() y,
+	si hay perfil, registra su tiempo y los valores no interpretables.
+	Las lambdas se ejecutan de inmediato, dentro de la misma iteración.
+	"""
+	if perfil is None:
+		return lambda campo, num, limpiador, calcular: calcular()
+
+	def medir(campo, num, limpiador, calcular):
+		inicio = time.perf_counter()
+		valores = calcular()
+		segundos = time.perf_counter() - inicio
+		crudos = df[num].tolist() if num is not None else None
+		perfil.registrar_columna(num, campo, limpiador, segundos, crudos, valores)
+		return valores
+
+	return medir
+
+
+def _normalizar_columna(valores):
+	"""normalizar_texto() una vez por texto distinto de la columna."""
+	tabla = {}
+	resultado = []
+	for valor in valores:
+		if valor not in tabla:
+			tabla[valor] = normalizar_texto(valor)
+		resultado.append(tabla[valor])
+	return resultado
+
+
+def _columna(errores, serie, vectorizada, escalar):
+	"""Aplica el limpiador vectorizado; si falla, identifica la celda culpable."""
+	try:
+		return vectorizada(serie).tolist()
+	except Exception:
+		return _por_celda(errores, serie, escalar)
+
+
+def _por_celda(errores, serie, funcion):
+	"""Aplica una función celda por celda registrando el primer error de cada fila."""
+	valores = []
+	for indice, valor in zip(serie.index, serie.tolist()):
+		try:
+			valores.append(funcion(valor))
+		except Exception as e:
+			errores.setdefault(indice, e)
+			valores.append(None)
+	return valores
+
+
+# Mismo orden de campos que el dict de limpiar_fila
+_ORDEN_CAMPOS = [
+	'id_excel', 'programa', 'area_responsable', 'eje_institucional',
+	'tipo_recurso', 'concentrado_programas', 'capitulo_gasto',
+	'presupuesto_modificado', 'anteproyecto_total', 'meta_2025', 'meta_2026',
+	'unidad_medida', 'costo_unitario', 'proyecto_presupuesto', 'multianualidad',
+	'tipo_obra', 'alcance_territorial', 'fuente_financiamiento', 'etapa_desarrollo',
+	'complejidad_tecnica', 'impacto_social_desc',
+	'alineacion_estrategica', 'impacto_social_nivel', 'urgencia', 'viabilidad_ejecucion',
+	'recursos_disponibles', 'riesgo_nivel', 'dependencias_nivel', 'puntuacion_final_ponderada',
+	'viabilidad_tecnica_semaforo', 'viabilidad_presupuestal_semaforo',
+	'viabilidad_juridica_semaforo', 'viabilidad_temporal_semaforo',
+	'viabilidad_administrativa_semaforo',
+	'alcaldias', 'ubicacion_especifica', 'beneficiarios_directos', 'beneficiarios_num',
+	'poblacion_objetivo_num',
+	'fecha_inicio_prog', 'fecha_termino_prog', 'duracion_meses',
+	'fecha_inicio_real', 'fecha_termino_real',
+	'avance_fisico_pct', 'avance_financiero_pct', 'estatus_general',
+	'permisos_requeridos', 'estatus_permisos', 'requisitos_especificos',
+	'responsable_operativo', 'contratista', 'observaciones',
+	'problemas_identificados', 'acciones_correctivas', 'ultima_actualizacion',
+	'problema_resuelve', 'solucion_ofrece', 'beneficio_ciudadania', 'dato_destacable',
+	'alineacion_gobierno', 'poblacion_perfil', 'relevancia_comunicacional',
+	'hitos_comunicacionales', 'mensajes_clave', 'estrategia_comunicacion',
+	'control_captura', 'control_notas',
+	# Texto normalizado (textos_normalizados)
+	*CAMPOS_NORMALIZADOS,
+	# Columnas de negocio (campos_derivados)
+	*CAMPOS_DERIVADOS,
+	'estatus_calculado',
+	'riesgos_lista',
+]
@@ -0,0 +1,81 @@
+"""
+Limpieza en paralelo (importar_excel --workers N).
+
+El DataFrame se divide en particiones contiguas que se limpian en procesos
+separados. Cada proceso devuelve dicts planos; el proceso principal hace
+las escrituras en la base de datos. Como las particiones se reensamblan en
+su orden original, el resultado es idéntico sin importar cuántos procesos
+se usen.
+
+Este módulo no importa Django: los procesos hijos solo necesitan pandas.
+"""
+
+import numpy as np
+
+import time
+
+from . import fechas
+from .incremental import huella_registro
+from .limpieza import limpiar_bloque
+from .perfil import PerfilImportacion
+
+
+def limpiar_con_huella(df, perfil=None):
+	"""
+	Limpia un bloque y agrega la huella de cada registro.
+	Con `perfil` registra los tiempos por columna (ver perfil.py).
+
+	Returns:
+		tuple: (registros, errores)
+			registros: lista de dicts listos para `Obra(**datos)`
+			errores: lista de (fila, id_excel, mensaje) en el orden del archivo
+	"""
+	registros, errores = limpiar_bloque(df, perfil)
+
+	inicio = time.perf_counter()
+	for datos in registros:
+		datos['huella'] = huella_registro(datos)
+	if perfil is not None:
+		perfil.registrar_columna(None, 'huella', 'huella_registro', time.perf_counter() - inicio, None, registros)
+
+	return registros, [(fila, id_excel, str(e)) for fila, id_excel, e in errores]
+
+
+def limpiar_en_paralelo(df, executor, workers, perfil=None):
+	"""
+	Reparte el bloque entre los procesos del executor y reúne los resultados.
+
+	Args:
+		df: DataFrame crudo (columnas 0-66)
+		executor: ProcessPoolExecutor ya creado (se reutiliza entre bloques)
+		workers: número de particiones
+		perfil: PerfilImportacion opcional; recibe las métricas de cada proceso
+
+	Returns:
+		tuple: (registros, errores), igual que limpiar_con_huella(df)
+	"""
+	particiones = min(workers, len(df))
+	if particiones <= 1:
+		return limpiar_con_huella(df, perfil)
+
+	limites = np.array_split(np.arange(len(df)), particiones)
+	partes = [df.iloc[pos[0]:pos[-1] + 1] for pos in limites]
+
+	registros, errores = [], []
+	# map conserva el orden de las particiones
+	resultados = executor.map(_limpiar_particion, partes, [perfil is not None] * len(partes))
+	for parte_registros, parte_errores, stats, columnas in resultados:
+		registros.extend(parte_registros)
+		errores.extend(parte_errores)
+		fechas.sumar_estadisticas(stats)
+		if perfil is not None:
+			perfil.combinar_columnas(columnas)
+	return registros, errores
+
+
+def _limpiar_particion(df, perfilar):
+	"""Trabajo de cada proceso: limpia su partición y reporta sus estadísticas."""
+	fechas.reiniciar_estadisticas()
+	perfil = PerfilImportacion(medir_memoria=False) if perfilar else None
+	registros, errores = limpiar_con_huella(df, perfil)
+	return registros, errores, fechas.estadisticas(), perfil.columnas if perfil else None
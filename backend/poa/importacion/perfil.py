@@ -0,0 +1,134 @@
+"""
+Perfil de rendimiento de la importación (importar_excel --profile).
+
+Registra tiempo y memoria por etapa (lectura, limpieza, construcción de
+modelos, escritura en BD, índices) y, dentro de la limpieza, tiempo y
+valores no interpretables por columna. El reporte se guarda como JSON con
+llaves ordenadas para poder comparar corridas entre versiones del código.
+
+Valores "no interpretables" (celda no vacía que el limpiador no pudo leer):
+- fecha / semáforo: el resultado es None
+- dinero / porcentaje / beneficiarios: el resultado es 0 y la celda no tiene dígitos
+- escala: el resultado es el default 1 sin que la celda indique un 1
+"""
+
+import json
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from poa.utils import CATALOGO_ESCALAS
+
+try:
+	import resource
+except ImportError:  # pragma: no cover - Windows
+	resource = None
+
+VERSION_PERFIL = 1
+
+_MB = 1024 * 1024
+_DIGITO = re.compile(r'\d')
+_CLAVES_UNO = [clave for clave, numero in CATALOGO_ESCALAS.items() if numero == 1]
+
+
+class PerfilImportacion:
+	"""Acumula métricas de una corrida de importación."""
+
+	def __init__(self, medir_memoria=True):
+		self.medir_memoria = medir_memoria
+		self.etapas = {}
+		self.columnas = {}
+		self.datos = {}
+		self._inicio = time.perf_counter()
+		if medir_memoria and not tracemalloc.is_tracing():
+			tracemalloc.start()
+
+	@contextmanager
+	def etapa(self, nombre):
+		"""Mide tiempo y memoria de un bloque de código (se acumula si se repite)."""
+		if self.medir_memoria:
+			antes, _ = tracemalloc.get_traced_memory()
+			tracemalloc.reset_peak()
+		inicio = time.perf_counter()
+		try:
+			yield
+		finally:
+			segundos = time.perf_counter() - inicio
+			registro = self.etapas.setdefault(nombre, {
+				'segundos': 0.0, 'llamadas': 0, 'memoria_pico_mb': 0.0, 'memoria_neta_mb': 0.0,
+			})
+			registro['segundos'] += segundos
+			registro['llamadas'] += 1
+			if self.medir_memoria:
+				actual, pico = tracemalloc.get_traced_memory()
+				registro['memoria_pico_mb'] = max(registro['memoria_pico_mb'], (pico - antes) / _MB)
+				registro['memoria_neta_mb'] += (actual - antes) / _MB
+
+	def registrar_columna(self, num, campo, limpiador, segundos, crudos, valores):
+		"""Tiempo y valores no interpretables de una columna limpiada."""
+		registro = self.columnas.setdefault(campo, {
+			'columna': num, 'limpiador': limpiador, 'segundos': 0.0, 'valores': 0, 'no_interpretables': 0,
+		})
+		registro['segundos'] += segundos
+		registro['valores'] += len(valores)
+		if crudos is not None:
+			registro['no_interpretables'] += contar_no_interpretables(limpiador, crudos, valores)
+
+	def combinar_columnas(self, columnas):
+		"""Suma las métricas por columna de otro proceso (limpieza en paralelo)."""
+		for campo, otro in columnas.items():
+			registro = self.columnas.setdefault(campo, {**otro, 'segundos': 0.0, 'valores': 0, 'no_interpretables': 0})
+			registro['segundos'] += otro['segundos']
+			registro['valores'] += otro['valores']
+			registro['no_interpretables'] += otro['no_interpretables']
+
+	def reporte(self):
+		"""Reporte completo como dict serializable."""
+		reporte = {
+			'version': VERSION_PERFIL,
+			'fecha': datetime.now().isoformat(timespec='seconds'),
+			'total_segundos': time.perf_counter() - self._inicio,
+			'etapas': self.etapas,
+			'columnas': self.columnas,
+			**self.datos,
+		}
+		if resource is not None:
+			# ru_maxrss está en KB en Linux
+			reporte['memoria_max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+		return reporte
+
+	def guardar(self, ruta):
+		if self.medir_memoria:
+			tracemalloc.stop()
+		with open(ruta, 'w', encoding='utf-8') as archivo:
+			json.dump(self.reporte(), archivo, indent=2, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def contar_no_interpretables(limpiador, crudos, valores):
+	"""Cuenta celdas no vacías que el limpiador no pudo interpretar."""
+	total = 0
+	for crudo, valor in zip(crudos, valores):
+		if _vacio(crudo):
+			continue
+		if limpiador in ('parse_date', 'clean_semaphore'):
+			total += valor is None
+		elif limpiador in ('clean_money', 'clean_percentage', 'clean_beneficiarios'):
+			total += valor == 0 and not _DIGITO.search(str(crudo))
+		elif limpiador == 'interpretar_escala':
+			if valor == 1:
+				texto = str(crudo).lower()
+				total += '1' not in texto and not any(clave in texto for clave in _CLAVES_UNO)
+	return total
+
+
+def _vacio(valor):
+	try:
+		if pd.isna(valor):
+			return True
+	except (TypeError, ValueError):
+		return False
+	return isinstance(valor, str) and not valor.strip()
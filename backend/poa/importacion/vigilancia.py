@@ -0,0 +1,63 @@
+"""
+Vigilancia de la carpeta de datos (comando vigilar_datos).
+
+Un archivo grande se escribe en varias etapas (copia, guardado de Excel,
+sincronización de carpetas), así que cada escritura no dispara una
+importación: se espera a que la firma del archivo (ruta, fecha de
+modificación y tamaño) deje de cambiar durante `espera` segundos.
+
+Solo observa el sistema de archivos; decidir si el contenido realmente
+cambió (huella SHA-256) le toca al comando.
+"""
+
+import os
+import time
+
+from .lectores import localizar_archivo
+
+
+class Vigilante:
+	"""Detecta cuándo el archivo de datos terminó de escribirse."""
+
+	def __init__(self, directorio='data', espera=2.0, reloj=time.monotonic):
+		self.directorio = directorio
+		self.espera = espera
+		self.reloj = reloj
+		self._firma = None       # última firma observada
+		self._desde = None       # momento en que apareció esa firma
+		self._entregada = None   # última firma entregada al comando
+
+	def revisar(self):
+		"""
+		Revisa la carpeta una vez (se llama periódicamente).
+
+		Returns:
+			tuple: (ruta, tipo) si el archivo cambió y lleva `espera` segundos
+			estable desde la última entrega; None en otro caso
+		"""
+		ruta, tipo = localizar_archivo(self.directorio)
+		firma = _firma(ruta)
+		ahora = self.reloj()
+
+		if firma != self._firma:
+			self._firma = firma
+			self._desde = ahora
+
+		if firma is None or firma == self._entregada:
+			return None
+		if ahora - self._desde < self.espera:
+			return None
+
+		self._entregada = firma
+		return ruta, tipo
+
+
+def _firma(ruta):
+	if ruta is None:
+		return None
+	try:
+		info = os.stat(ruta)
+	except OSError:
+		# El archivo se está reemplazando (borrar + renombrar)
+		return None
+	return ruta, info.st_mtime_ns, info.st_size
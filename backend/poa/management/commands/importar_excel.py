@@ -1,375 +1,383 @@
-from django.core.management.base import BaseCommand
-from poa.models import Obra
-from poa.utils import (
-	clean_money, 
-	clean_percentage, 
-	interpretar_escala_flexible, 
-	clean_beneficiarios_advanced,
-	calcular_puntuacion_ponderada,
-	capitalizar_texto,
-	obtener_valor_por_defecto
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from poa.models import Alcaldia, Obra, TABLAS_DERIVADAS, VersionDatos
+from poa.importacion import (
+	localizar_archivo, leer_por_bloques, agrupar_guardadas, planificar_bloque, filas_sobrantes
+)
+from poa.importacion import fechas
+from poa.importacion.cache import leer_con_cache, hash_archivo
+from poa.importacion.paralelo import limpiar_con_huella, limpiar_en_paralelo
+from poa.importacion.perfil import PerfilImportacion
+from poa.importacion.intercambio import (
+	activar_lectura_concurrente, crear_tablas_nuevas, construir_indices,
+	intercambiar_tablas, descartar_tablas_nuevas,
+	carga_masiva, insertar_masivo, tamano_lote, optimizar_estadisticas
 )
-import pandas as pd
 import os
-from datetime import datetime, timedelta
+import time
 
 class Command(BaseCommand):
 	help = 'Importa datos aplicando reglas de negocio avanzadas para beneficiarios. Soporta .xlsx y .csv'
 
-	def handle(self, *args, **kwargs):
+	def add_arguments(self, parser):
+		parser.add_argument(
+			'--streaming',
+			action='store_true',
+			help='Lee y guarda el archivo por bloques (memoria constante sin importar el tamaño; con --incremental compara bloque por bloque)'
+		)
+		parser.add_argument(
+			'--incremental',
+			action='store_true',
+			help='Solo inserta, actualiza o elimina las filas que cambiaron (cruce por id_excel y huella)'
+		)
+		parser.add_argument(
+			'--refresh-cache',
+			action='store_true',
+			help='Vuelve a leer el archivo aunque exista una caché de la hoja (data/.cache; no aplica a --streaming)'
+		)
+		parser.add_argument(
+			'--chunk-size',
+			type=int,
+			default=1000,
+			help='Filas por bloque en modo --streaming (default: 1000)'
+		)
+		parser.add_argument(
+			'--workers',
+			type=int,
+			default=1,
+			help='Procesos para la limpieza de filas (default: 1, sin paralelismo)'
+		)
+		parser.add_argument(
+			'--batch-size',
+			type=int,
+			default=None,
+			help='Registros por INSERT (default: el máximo del motor; 500 en --incremental)'
+		)
+		parser.add_argument(
+			'--profile',
+			nargs='?',
+			const='perfil_importacion.json',
+			default=None,
+			metavar='RUTA',
+			help='Guarda tiempos y memoria por etapa y por columna en JSON (default: perfil_importacion.json)'
+		)
+
+	def handle(self, *args, **options):
 		# Intenta localizar el archivo de datos (Excel o CSV)
 		base_dir = 'data'
-		xlsx_path = os.path.join(base_dir, 'datos.xlsx')
-		csv_path = os.path.join(base_dir, 'datos.csv')
-		
-		# Verificamos qué archivo existe (priorizando Excel si ambos existen)
-		if os.path.exists(xlsx_path):
-			file_path = xlsx_path
+		file_path, tipo = localizar_archivo(base_dir)
+
+		if file_path is None:
+			self.stdout.write(self.style.ERROR("No se encontró 'datos.xlsx' ni 'datos.csv' en la carpeta data."))
+			return
+
+		if tipo == 'xlsx':
 			self.stdout.write(f"Leyendo Excel desde {file_path}...")
-			df = pd.read_excel(file_path, header=None)
-		elif os.path.exists(csv_path):
-			file_path = csv_path
+		elif os.path.basename(file_path) == 'datos.csv':
 			self.stdout.write(f"Leyendo CSV desde {file_path}...")
-			# header=None para coincidir con la lógica original de saltar la fila 0 manualmente
-			df = pd.read_csv(file_path, header=None) 
 		else:
-			# Intento de fallback para nombres generados como "datos.xlsx - Sheet1.csv"
-			# Busca cualquier archivo csv en la carpeta data
-			files = [f for f in os.listdir(base_dir) if f.endswith('.csv')]
-			if files:
-				file_path = os.path.join(base_dir, files[0])
-				self.stdout.write(f"Archivo estándar no encontrado. Usando: {file_path}...")
-				df = pd.read_csv(file_path, header=None)
+			self.stdout.write(f"Archivo estándar no encontrado. Usando: {file_path}...")
+
+		if options['workers'] < 1:
+			raise CommandError('--workers debe ser al menos 1')
+
+		activar_lectura_concurrente()
+		fechas.reiniciar_estadisticas()
+		self.errores = []
+		self.refrescar_cache = options['refresh_cache']
+		self.workers = options['workers']
+		self.executor = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+		self.perfil = PerfilImportacion() if options['profile'] else None
+		# Antes de leer: si el archivo cambia durante la carga, la siguiente
+		# vigilancia (vigilar_datos) verá una huella distinta y lo reimportará
+		huella_archivo = hash_archivo(file_path)
+		self.hubo_cambios = True
+		# ObraAlcaldia apunta al catálogo: debe estar completo antes de cargar
+		Alcaldia.sembrar()
+
+		try:
+			if options['incremental']:
+				total = self._importar_incremental(
+					file_path, tipo, options['streaming'], options['chunk_size'], options['batch_size'] or 500
+				)
 			else:
-				self.stdout.write(self.style.ERROR("No se encontró 'datos.xlsx' ni 'datos.csv' en la carpeta data."))
-				return
+				total = self._importar_con_intercambio(file_path, tipo, options)
+		finally:
+			if self.executor:
+				self.executor.shutdown()
+
+		version = VersionDatos.registrar_importacion(huella_archivo, self.hubo_cambios)
+		self._reportar_errores()
+		self._reportar_fechas()
+		self.stdout.write(f"Versión de datos: {version}")
+		if self.perfil:
+			self._guardar_perfil(options['profile'], file_path, options, total)
+		self.stdout.write(self.style.SUCCESS(f'Importación completa. {total} registros procesados.'))
+
+	def _etapa(self, nombre):
+		"""Contexto que mide una etapa cuando se pidió --profile."""
+		return self.perfil.etapa(nombre) if self.perfil else nullcontext()
+
+	def _guardar_perfil(self, ruta, file_path, options, total):
+		if options['incremental']:
+			modo = 'incremental'
+		else:
+			modo = 'streaming' if options['streaming'] else 'completo'
+		self.perfil.datos.update({
+			'archivo': file_path,
+			'modo': modo,
+			'workers': self.workers,
+			'filas': {
+				'procesadas': total,
+				'rechazadas': len(self.errores),
+				'motivos_rechazo': dict(Counter(mensaje for _, _, mensaje in self.errores)),
+			},
+			'fechas': fechas.estadisticas(),
+		})
+		self.perfil.guardar(ruta)
+		self.stdout.write(f"Perfil guardado en {ruta}")
+
+	def _reportar_errores(self):
+		"""Filas descartadas durante la limpieza, en el orden del archivo."""
+		if not self.errores:
+			return
+		self.stdout.write(self.style.WARNING(f"{len(self.errores)} filas con error:"))
+		for _, id_fila, mensaje in self.errores:
+			self.stdout.write(self.style.WARNING(f"Error fila {id_fila}: {mensaje}"))
+
+	def _reportar_fechas(self):
+		"""Rendimiento del parsing de fechas y aprovechamiento de su caché."""
+		stats = fechas.estadisticas()
+		consultas = stats['aciertos_cache'] + stats['fallos_cache']
+		self.stdout.write(
+			f"Fechas: {stats['valores']} valores en {stats['segundos']:.3f}s "
+			f"({stats['valores_por_segundo']:,.0f} valores/s) | "
+			f"caché: {stats['tasa_aciertos']:.1%} aciertos ({stats['aciertos_cache']}/{consultas} textos)"
+		)
+
+	def _importar_con_intercambio(self, file_path, tipo, options):
+		"""
+		Carga todo en las tablas espejo y las activa al final en una transacción.
+		Mientras tanto la API sigue leyendo el conjunto anterior completo.
+		"""
+		espejos = crear_tablas_nuevas()
+		modelo = espejos[0][0]
+		batch_size = options['batch_size'] or tamano_lote(modelo)
+		try:
+			# Las tablas espejo se llenan sin índices, en una sola transacción
+			with carga_masiva():
+				if options['streaming']:
+					total = self._importar_por_bloques(
+						modelo, file_path, tipo, options['chunk_size'], batch_size
+					)
+				else:
+					total = self._importar_completo(modelo, file_path, tipo, batch_size)
+				with self._etapa('tablas_derivadas'):
+					self._cargar_derivadas(modelo, espejos[1:])
+			with self._etapa('indices'):
+				construir_indices(espejos)
+		except BaseException:
+			# Las tablas activas no se tocaron: solo se descarta la carga incompleta
+			descartar_tablas_nuevas()
+			raise
+
+		inicio = time.perf_counter()
+		with self._etapa('intercambio'):
+			intercambiar_tablas(espejos)
+		with self._etapa('estadisticas'):
+			optimizar_estadisticas()
+		self.stdout.write(f"Tabla activada en {time.perf_counter() - inicio:.2f}s")
+		return total
+
+	def _importar_completo(self, modelo, file_path, tipo, batch_size):
+		"""Carga la hoja completa en memoria y la inserta en la tabla espejo."""
+		df = self._leer_completo(file_path, tipo)
 
 		# Ajuste para saltar encabezados dummy si es necesario (según código original)
 		df = df.iloc[1:]
 
-		obras_batch = []
-		
-		def safe_str(val):
-			"""Retorna el string limpio o None si está vacío"""
-			if pd.isna(val) or val == '':
-				return None
-			return str(val).strip()
-		
-		def safe_str_with_default(val, campo_nombre):
-			"""Retorna string limpio, capitalizado y con valor por defecto si está vacío"""
-			texto = safe_str(val)
-			# Obtener valor por defecto si está vacío
-			texto_con_default = obtener_valor_por_defecto(campo_nombre, texto)
-			# Capitalizar si hay texto
-			if texto_con_default and isinstance(texto_con_default, str):
-				return capitalizar_texto(texto_con_default)
-			return texto_con_default
-		
-		def safe_str_uppercase(val, campo_nombre):
-			"""Retorna string limpio, en MAYÚSCULAS y con valor por defecto si está vacío"""
-			texto = safe_str(val)
-			# Obtener valor por defecto si está vacío
-			texto_con_default = obtener_valor_por_defecto(campo_nombre, texto)
-			# Convertir a mayúsculas si hay texto
-			if texto_con_default and isinstance(texto_con_default, str):
-				return texto_con_default.upper()
-			return texto_con_default
-
-		def clean_semaphore(val):
-			"""
-			Normaliza valores de semáforos a: ROJO, AMARILLO, VERDE.
-			Acepta variaciones comunes y retorna el valor estandarizado.
-			"""
-			if pd.isna(val) or val == '':
-				return None
-			
-			# Convertir a string y limpiar
-			v = str(val).strip().upper()
-			
-			# Mapeo de variaciones comunes
-			if v in ['ROJO', 'R', 'RED']:
-				return 'ROJO'
-			elif v in ['AMARILLO', 'A', 'YELLOW', 'ÁMBAR', 'AMBAR']:
-				return 'AMARILLO'
-			elif v in ['VERDE', 'V', 'GREEN']:
-				return 'VERDE'
-			
-			# Si no coincide, retornar None para que se trate como GRIS
-			return None
-
-		def parse_date(val):
-			"""
-			Normaliza fechas al formato ISO 8601 (YYYY-MM-DD) con lógica inteligente.
-			
-			Estrategia de parsing:
-			1. Detecta seriales de Excel
-			2. Busca año (4 dígitos o 2 dígitos)
-			3. Busca mes (1-12 o nombres en español/inglés)
-			4. Busca día (1-31, o usa 01 si no encuentra)
-			5. Intenta formatos comunes: DD/MM/YYYY, YYYY-MM-DD, etc.
-			6. Si falla, prueba orden inverso: YYYY/MM/DD
-			
-			Returns:
-				date object o None si no se puede parsear
-			"""
-			try:
-				if pd.isna(val) or val == '': 
-					return None
-				
-				# 1. Manejo de fecha serial de Excel (enteros/floats)
-				if isinstance(val, (int, float)) and not isinstance(val, bool):
-					return (datetime(1899, 12, 30) + timedelta(days=val)).date()
-				
-				# 2. Si ya es un objeto date o datetime, extraer date
-				if isinstance(val, datetime):
-					return val.date()
-				if hasattr(val, 'date'):  # pandas Timestamp
-					return val.date()
-				
-				# 3. Convertir a string para análisis de texto
-				val_str = str(val).strip().lower()
-				
-				import re
-				
-				# 4. Diccionario de meses (español e inglés)
-				meses = {
-					'enero': 1, 'ene': 1, 'january': 1, 'jan': 1,
-					'febrero': 2, 'feb': 2, 'february': 2,
-					'marzo': 3, 'mar': 3, 'march': 3,
-					'abril': 4, 'abr': 4, 'april': 4, 'apr': 4,
-					'mayo': 5, 'may': 5,
-					'junio': 6, 'jun': 6, 'june': 6,
-					'julio': 7, 'jul': 7, 'july': 7,
-					'agosto': 8, 'ago': 8, 'august': 8, 'aug': 8,
-					'septiembre': 9, 'sep': 9, 'september': 9, 'sept': 9,
-					'octubre': 10, 'oct': 10, 'october': 10,
-					'noviembre': 11, 'nov': 11, 'november': 11,
-					'diciembre': 12, 'dic': 12, 'december': 12, 'dec': 12
-				}
-				
-				# 5. ESTRATEGIA 1: Buscar patrón "mes año" (ej: "abril 2026", "mayo 2026")
-				for mes_nombre, mes_num in meses.items():
-					# Patrón: nombre_mes espacio año(4 dígitos o 2 dígitos)
-					match = re.search(rf'\b{mes_nombre}\b\s+(\d{{2,4}})', val_str)
-					if match:
-						anio_str = match.group(1)
-						anio = int(anio_str)
-						# Convertir año de 2 dígitos a 4 dígitos
-						if anio < 100:
-							anio = 2000 + anio if anio < 50 else 1900 + anio
-						return datetime(anio, mes_num, 1).date()
-				
-				# 6. ESTRATEGIA 2: Buscar patrón "día mes año" (ej: "28 de noviembre de 2025")
-				for mes_nombre, mes_num in meses.items():
-					match = re.search(rf'(\d{{1,2}})\s+(?:de\s+)?{mes_nombre}\b\s+(?:de\s+)?(\d{{2,4}})', val_str)
-					if match:
-						dia = int(match.group(1))
-						anio_str = match.group(2)
-						anio = int(anio_str)
-						if anio < 100:
-							anio = 2000 + anio if anio < 50 else 1900 + anio
-						# Validar día
-						if 1 <= dia <= 31:
-							try:
-								return datetime(anio, mes_num, dia).date()
-							except ValueError:
-								# Día inválido para ese mes, usar día 1
-								return datetime(anio, mes_num, 1).date()
-				
-				# 7. ESTRATEGIA 3: Detectar números y separadores (/, -, .)
-				# Extraer todos los números del string
-				numeros = re.findall(r'\d+', val_str)
-				
-				if len(numeros) >= 2:
-					# Convertir a enteros
-					nums = [int(n) for n in numeros]
-					
-					# Identificar qué número es qué
-					dia, mes, anio = None, None, None
-					
-					# Buscar año (4 dígitos o 2 dígitos > 31)
-					for i, n in enumerate(nums):
-						if n > 31:  # Probablemente es un año
-							anio = n
-							if anio < 100:
-								anio = 2000 + anio if anio < 50 else 1900 + anio
-							nums[i] = None  # Marcar como usado
-							break
-					
-					# Filtrar números usados
-					nums_restantes = [n for n in nums if n is not None]
-					
-					if len(nums_restantes) >= 1:
-						# Buscar mes (1-12)
-						for i, n in enumerate(nums_restantes):
-							if 1 <= n <= 12:
-								mes = n
-								nums_restantes[i] = None
-								break
-						
-						# Filtrar nuevamente
-						nums_restantes = [n for n in nums_restantes if n is not None]
-						
-						# El número restante es el día (o None)
-						if len(nums_restantes) > 0:
-							dia = nums_restantes[0] if 1 <= nums_restantes[0] <= 31 else 1
-						else:
-							dia = 1  # Día por defecto
-					
-					# Si tenemos mes y año, construir fecha
-					if mes and anio:
-						dia = dia or 1
-						try:
-							return datetime(anio, mes, dia).date()
-						except ValueError:
-							# Si el día es inválido, usar día 1
-							return datetime(anio, mes, 1).date()
-				
-				# 8. ESTRATEGIA 4: Formatos estándar con separadores
-				# ISO: YYYY-MM-DD o YYYY/MM/DD
-				if re.match(r'^\d{4}[-/]\d{1,2}[-/]\d{1,2}$', val_str):
-					for fmt in ["%Y-%m-%d", "%Y/%m/%d"]:
-						try:
-							return datetime.strptime(val_str, fmt).date()
-						except ValueError:
-							continue
-				
-				# Europeo/Latino: DD/MM/YYYY o DD-MM-YYYY
-				if re.match(r'^\d{1,2}[-/]\d{1,2}[-/]\d{4}$', val_str):
-					for fmt in ["%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y"]:
-						try:
-							return datetime.strptime(val_str, fmt).date()
-						except ValueError:
-							continue
-				
-				# Americano: MM/DD/YYYY
-				if re.match(r'^\d{1,2}[-/]\d{1,2}[-/]\d{4}$', val_str):
-					try:
-						return datetime.strptime(val_str, "%m/%d/%Y").date()
-					except ValueError:
-						pass
-				
-				# 9. ESTRATEGIA 5: Fallback con pandas
-				parsed = pd.to_datetime(val, errors='coerce')
-				if pd.notna(parsed):
-					return parsed.date()
-				
-				# Si llegamos aquí, no se pudo parsear
-				return None
-				
-			except Exception as e:
-				# Si falla, retornar None (log opcional para debug)
-				# self.stdout.write(self.style.WARNING(f"No se pudo parsear fecha '{val}': {e}"))
-				return None
-
-		for _, row in df.iterrows():
-			try:
-				# Priorización (interpretamos escalas flexiblemente)
-				alineacion = interpretar_escala_flexible(row[21])
-				impacto = interpretar_escala_flexible(row[22])
-				urgencia = interpretar_escala_flexible(row[23])
-				viabilidad = interpretar_escala_flexible(row[24])
-				recursos = interpretar_escala_flexible(row[25])
-				riesgo = interpretar_escala_flexible(row[26])
-				dependencias = interpretar_escala_flexible(row[27])
-				
-				# Calcular puntuación ponderada automáticamente
-				# (ignoramos el valor del Excel en columna 28 si existe)
-				puntuacion = calcular_puntuacion_ponderada(
-					alineacion, impacto, urgencia, viabilidad, recursos, riesgo, dependencias
-				)
-				
-				obra = Obra(
-					# Identificación
-					id_excel=row[0],
-					programa=safe_str_with_default(row[1], 'programa'),
-					area_responsable=safe_str_uppercase(row[2], 'area_responsable'),
-					eje_institucional=safe_str_with_default(row[3], 'eje_institucional'),
-					
-					# Presupuesto (VALORES EN MDP - Millones De Pesos)
-					tipo_recurso=safe_str_with_default(row[4], 'tipo_recurso'),
-					concentrado_programas=safe_str_with_default(row[5], 'concentrado_programas'),
-					capitulo_gasto=safe_str_with_default(row[6], 'capitulo_gasto'),
-					presupuesto_modificado=clean_money(row[7], es_mdp=True),  # En MDP
-					anteproyecto_total=clean_money(row[8], es_mdp=True),      # En MDP
-					meta_2025=clean_money(row[9], es_mdp=False),              # Cantidad de metas (no dinero)
-					meta_2026=clean_money(row[10], es_mdp=False),             # Cantidad de metas (no dinero)
-					unidad_medida=safe_str_with_default(row[11], 'unidad_medida'),
-					costo_unitario=clean_money(row[12], es_mdp=False),        # Costo unitario (no MDP)
-					proyecto_presupuesto=clean_money(row[13], es_mdp=False),  # Verificar si este debe ser MDP
-					multianualidad=safe_str_with_default(row[14], 'multianualidad'),
-
-					# Categorización
-					tipo_obra=safe_str_with_default(row[15], 'tipo_obra'),
-					alcance_territorial=safe_str_with_default(row[16], 'alcance_territorial'),
-					fuente_financiamiento=safe_str_with_default(row[17], 'fuente_financiamiento'),
-					etapa_desarrollo=safe_str_with_default(row[18], 'etapa_desarrollo'),
-					complejidad_tecnica=interpretar_escala_flexible(row[19]),
-					impacto_social_desc=safe_str_with_default(row[20], 'impacto_social_desc'),
-
-					# Priorización (usando valores ya interpretados)
-					alineacion_estrategica=alineacion,
-					impacto_social_nivel=impacto,
-					urgencia=urgencia,
-					viabilidad_ejecucion=viabilidad,
-					recursos_disponibles=recursos,
-					riesgo_nivel=riesgo,
-					dependencias_nivel=dependencias,
-					puntuacion_final_ponderada=puntuacion,  # Calculado automáticamente
-
-					# Semáforos
-					viabilidad_tecnica_semaforo=clean_semaphore(row[29]),
-					viabilidad_presupuestal_semaforo=clean_semaphore(row[30]),
-					viabilidad_juridica_semaforo=clean_semaphore(row[31]),
-					viabilidad_temporal_semaforo=clean_semaphore(row[32]),
-					viabilidad_administrativa_semaforo=clean_semaphore(row[33]),
-
-					# Ubicación y Beneficiarios
-					alcaldias=safe_str_with_default(row[34], 'alcaldias'),
-					ubicacion_especifica=safe_str_with_default(row[35], 'ubicacion_especifica'),
-					beneficiarios_directos=safe_str_with_default(row[36], 'beneficiarios_directos'),
-					beneficiarios_num=clean_beneficiarios_advanced(row[36]),
-					poblacion_objetivo_num=safe_str(row[37]),
-
-					# Fechas
-					fecha_inicio_prog=parse_date(row[38]),
-					fecha_termino_prog=parse_date(row[39]),
-					duracion_meses=safe_str(row[40]),
-					fecha_inicio_real=parse_date(row[41]),
-					fecha_termino_real=parse_date(row[42]),
-
-					# Estatus y Textos
-					avance_fisico_pct=clean_percentage(row[43]),
-					avance_financiero_pct=clean_percentage(row[44]),
-					estatus_general=safe_str_with_default(row[45], 'estatus_general'),
-					permisos_requeridos=safe_str_with_default(row[46], 'permisos_requeridos'),
-					estatus_permisos=safe_str_with_default(row[47], 'estatus_permisos'),
-					requisitos_especificos=safe_str(row[48]),
-					responsable_operativo=safe_str_with_default(row[49], 'responsable_operativo'),
-					contratista=safe_str_with_default(row[50], 'contratista'),
-					observaciones=safe_str_with_default(row[51], 'observaciones'),
-					problemas_identificados=safe_str_with_default(row[52], 'problemas_identificados'),
-					acciones_correctivas=safe_str_with_default(row[53], 'acciones_correctivas'),
-					ultima_actualizacion=parse_date(row[54]),
-					
-					# Narrativa
-					problema_resuelve=safe_str_with_default(row[55], 'problema_resuelve'),
-					solucion_ofrece=safe_str_with_default(row[56], 'solucion_ofrece'),
-					beneficio_ciudadania=safe_str(row[57]),
-					dato_destacable=safe_str(row[58]),
-					alineacion_gobierno=safe_str(row[59]),
-					poblacion_perfil=safe_str(row[60]),
-					relevancia_comunicacional=safe_str(row[61]),
-					hitos_comunicacionales=safe_str_with_default(row[62], 'hitos_comunicacionales'),
-					mensajes_clave=safe_str(row[63]),
-					estrategia_comunicacion=safe_str(row[64]),
-					control_captura=safe_str(row[65]),
-					control_notas=safe_str(row[66]),
-				)
-				obras_batch.append(obra)
-			except Exception as e:
-				self.stdout.write(self.style.WARNING(f"Error fila {row[0]}: {e}"))
+		obras_batch = self._construir_obras(df, modelo)
+		with self._etapa('escritura_bd'):
+			insertar_masivo(modelo, obras_batch, batch_size)
+		return len(obras_batch)
+
+	def _cargar_derivadas(self, modelo, hijas):
+		"""
+		Llena las tablas espejo hijas (TABLAS_DERIVADAS) en una sola pasada por
+		la tabla espejo de Obra: las llaves de las obras se conocen hasta insertarlas.
+		"""
+		espejos = {hija._meta.model_name: hija for hija, _ in hijas}
+		tablas = [(derivada, espejos[derivada._meta.model_name]) for derivada in TABLAS_DERIVADAS]
+		columnas = list(dict.fromkeys(campo for derivada, _ in tablas for campo in derivada.ORIGENES))
+		lote = min(tamano_lote(espejo) for _, espejo in tablas)
+		pendientes = {espejo: [] for _, espejo in tablas}
+
+		for fila in modelo.objects.values('pk', *columnas).iterator(chunk_size=lote):
+			for derivada, espejo in tablas:
+				filas = pendientes[espejo]
+				filas.extend(espejo(obra_id=fila['pk'], **datos) for datos in derivada.filas(*derivada.origenes(fila)))
+				if len(filas) >= lote:
+					insertar_masivo(espejo, filas, lote)
+					filas.clear()
+		for espejo, filas in pendientes.items():
+			insertar_masivo(espejo, filas, lote)
+
+	def _importar_por_bloques(self, modelo, file_path, tipo, chunk_size, batch_size):
+		"""
+		Lee, limpia e inserta el archivo bloque por bloque.
+		Solo un bloque de filas y sus instancias viven en memoria a la vez.
+		"""
+		total = 0
+		for numero, bloque in enumerate(self._leer_por_bloques(file_path, tipo, chunk_size), start=1):
+			inicio = time.perf_counter()
 
-		Obra.objects.all().delete()
-		Obra.objects.bulk_create(obras_batch)
-		self.stdout.write(self.style.SUCCESS(f'Importación completa. {len(obras_batch)} registros procesados.'))
\ No newline at end of file
+			obras = self._construir_obras(bloque, modelo)
+			with self._etapa('escritura_bd'):
+				insertar_masivo(modelo, obras, batch_size)
+
+			elapsed = time.perf_counter() - inicio
+			filas_por_seg = len(bloque) / elapsed if elapsed > 0 else 0
+			total += len(obras)
+			self.stdout.write(
+				f"Bloque {numero}: {len(obras)}/{len(bloque)} filas en {elapsed:.2f}s "
+				f"({filas_por_seg:,.0f} filas/s) - acumulado {total}"
+			)
+
+		return total
+
+	def _importar_incremental(self, file_path, tipo, streaming, chunk_size, batch_size):
+		"""
+		Compara el archivo contra la tabla y aplica solo las diferencias.
+		Las filas sin cambios (misma huella) no se reescriben.
+
+		Cada bloque se compara y se escribe por separado contra el mapa de filas
+		guardadas {id_excel: [(pk, huella)]}; las que ningún bloque emparejó se
+		eliminan al final. Con --streaming solo el mapa y un bloque viven en
+		memoria. Todo en una transacción: la API nunca ve el archivo a medias.
+		"""
+		if streaming:
+			bloques = self._leer_por_bloques(file_path, tipo, chunk_size)
+		else:
+			bloques = [self._leer_completo(file_path, tipo).iloc[1:]]
+
+		with self._etapa('comparacion'):
+			guardadas = agrupar_guardadas(Obra.objects.values_list('pk', 'id_excel', 'huella'))
+
+		total = insertadas = actualizadas = sin_cambios = 0
+		campos = set()
+		with transaction.atomic():
+			for bloque in bloques:
+				registros = self._limpiar(bloque)
+				with self._etapa('comparacion'):
+					plan = planificar_bloque(registros, guardadas)
+				campos.update(self._aplicar_bloque(plan, batch_size))
+				total += len(registros)
+				insertadas += len(plan['insertar'])
+				actualizadas += len(plan['actualizar'])
+				sin_cambios += plan['sin_cambios']
+
+			# Las tablas hijas de las filas eliminadas se borran en cascada
+			eliminar = filas_sobrantes(guardadas)
+			with self._etapa('escritura_bd'):
+				for i in range(0, len(eliminar), batch_size):
+					Obra.objects.filter(pk__in=eliminar[i:i + batch_size]).delete()
+
+		self.stdout.write(
+			f"Insertadas: {insertadas} | Actualizadas: {actualizadas} | "
+			f"Eliminadas: {len(eliminar)} | Sin cambios: {sin_cambios}"
+		)
+		if campos:
+			self.stdout.write(f"Columnas actualizadas: {', '.join(sorted(campos))}")
+		self.hubo_cambios = bool(insertadas or actualizadas or eliminar)
+		return total
+
+	def _aplicar_bloque(self, plan, batch_size):
+		"""
+		Escribe las altas y los cambios de un bloque, y reescribe sus tablas hijas.
+
+		Returns:
+			list: nombres de las columnas actualizadas
+		"""
+		with self._etapa('construccion_modelos'):
+			nuevas = [Obra(**datos) for datos in plan['insertar']]
+
+		# Los índices se mantienen en cada escritura: quedan dentro de escritura_bd
+		with self._etapa('escritura_bd'):
+			Obra.objects.bulk_create(nuevas, batch_size=batch_size)
+			campos = self._actualizar(plan['actualizar'], batch_size)
+			for derivada in TABLAS_DERIVADAS:
+				derivada.reemplazar({
+					**{obra.pk: derivada.origenes(obra) for obra in nuevas},
+					**{pk: derivada.origenes(datos) for pk, datos in plan['actualizar']},
+				})
+		return campos
+
+	def _actualizar(self, cambios, batch_size):
+		"""
+		Aplica las filas modificadas con bulk_update, escribiendo solo las
+		columnas que cambiaron en al menos una fila.
+
+		Returns:
+			list: nombres de las columnas actualizadas
+		"""
+		if not cambios:
+			return []
+
+		actuales = Obra.objects.in_bulk([pk for pk, _ in cambios])
+		modificados = set()
+		obras = []
+		for pk, datos in cambios:
+			obra = actuales[pk]
+			for nombre, valor in datos.items():
+				# Se compara el valor ya preparado para la BD (p. ej. float vs texto en CharField)
+				campo = Obra._meta.get_field(nombre)
+				if campo.get_prep_value(getattr(obra, nombre)) != campo.get_prep_value(valor):
+					setattr(obra, nombre, valor)
+					modificados.add(nombre)
+			obras.append(obra)
+
+		campos = sorted(modificados)
+		if campos:
+			Obra.objects.bulk_update(obras, campos, batch_size=batch_size)
+		return campos
+
+	def _leer_completo(self, file_path, tipo):
+		"""Lee la hoja completa, reutilizando la caché si el archivo no cambió."""
+		inicio = time.perf_counter()
+		with self._etapa('lectura'):
+			df, desde_cache = leer_con_cache(file_path, tipo, refrescar=self.refrescar_cache)
+		origen = 'caché' if desde_cache else 'archivo'
+		self.stdout.write(f"Hoja leída desde {origen} en {time.perf_counter() - inicio:.2f}s")
+		return df
+
+	def _leer_por_bloques(self, file_path, tipo, chunk_size):
+		"""leer_por_bloques, midiendo la lectura de cada bloque por separado."""
+		bloques = iter(leer_por_bloques(file_path, tipo, chunk_size))
+		while True:
+			with self._etapa('lectura'):
+				bloque = next(bloques, None)
+			if bloque is None:
+				return
+			yield bloque
+
+	def _construir_obras(self, df, modelo=Obra):
+		"""Convierte las filas crudas en instancias de Obra (sin guardarlas)."""
+		registros = self._limpiar(df)
+		with self._etapa('construccion_modelos'):
+			return [modelo(**datos) for datos in registros]
+
+	def _limpiar(self, df):
+		"""
+		Limpia un bloque de filas crudas (en paralelo si se pidió --workers)
+		y acumula los errores por fila para el reporte final.
+		"""
+		with self._etapa('limpieza'):
+			if self.executor:
+				registros, errores = limpiar_en_paralelo(df, self.executor, self.workers, self.perfil)
+			else:
+				registros, errores = limpiar_con_huella(df, self.perfil)
+		self.errores.extend(errores)
+		return registros
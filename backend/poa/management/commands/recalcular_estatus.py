@@ -0,0 +1,41 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from poa.models import VersionDatos
+from poa.services import recalcular_estatus
+import time
+
+class Command(BaseCommand):
+	help = (
+		'Pone al día el estatus calculado de las obras (depende de la fecha). '
+		'Solo revisa las obras cuya fecha de inicio real cayó desde el último recálculo; '
+		'pensado para ejecutarse una vez al día (cron).'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			'--fecha',
+			type=str,
+			default=None,
+			help='Fecha de referencia AAAA-MM-DD (default: hoy)'
+		)
+		parser.add_argument(
+			'--completo',
+			action='store_true',
+			help='Revisa todas las obras, no solo las de la ventana de fechas'
+		)
+
+	def handle(self, *args, **options):
+		hoy = None
+		if options['fecha']:
+			try:
+				hoy = date.fromisoformat(options['fecha'])
+			except ValueError:
+				raise CommandError('--fecha debe tener el formato AAAA-MM-DD')
+
+		inicio = time.perf_counter()
+		cambiadas = recalcular_estatus(hoy, completo=options['completo'])
+		version = VersionDatos.actual()
+		self.stdout.write(self.style.SUCCESS(
+			f"Estatus al {version.estatus_al}: {cambiadas} obras cambiaron "
+			f"en {time.perf_counter() - inicio:.2f}s. Versión de datos: {version.version}"
+		))
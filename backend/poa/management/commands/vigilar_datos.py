@@ -0,0 +1,93 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from poa.models import VersionDatos
+from poa.importacion import localizar_archivo
+from poa.importacion.cache import hash_archivo
+from poa.importacion.vigilancia import Vigilante
+import time
+
+class Command(BaseCommand):
+	help = (
+		'Vigila la carpeta data y ejecuta importar_excel --incremental cuando el '
+		'contenido del archivo cambia. Cada importación con cambios sube la versión de datos.'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			'--intervalo',
+			type=float,
+			default=1.0,
+			help='Segundos entre revisiones de la carpeta (default: 1)'
+		)
+		parser.add_argument(
+			'--espera',
+			type=float,
+			default=2.0,
+			help='Segundos que el archivo debe quedar sin cambios antes de importarlo (default: 2)'
+		)
+		parser.add_argument(
+			'--workers',
+			type=int,
+			default=1,
+			help='Procesos para la limpieza de filas, se pasa a importar_excel (default: 1)'
+		)
+		parser.add_argument(
+			'--una-vez',
+			action='store_true',
+			help='Revisa el archivo actual una sola vez (sin esperar) y termina'
+		)
+
+	def handle(self, *args, **options):
+		if options['intervalo'] <= 0 or options['espera'] < 0:
+			raise CommandError('--intervalo debe ser positivo y --espera no negativo')
+
+		self.workers = options['workers']
+		self.fallida = None
+
+		if options['una_vez']:
+			file_path, _ = localizar_archivo('data')
+			if file_path is None:
+				self.stdout.write(self.style.ERROR("No se encontró 'datos.xlsx' ni 'datos.csv' en la carpeta data."))
+				return
+			self._procesar(file_path)
+			return
+
+		vigilante = Vigilante('data', options['espera'])
+		self.stdout.write(
+			f"Vigilando data/ (revisión cada {options['intervalo']}s, espera {options['espera']}s). Ctrl+C para salir."
+		)
+		try:
+			while True:
+				cambio = vigilante.revisar()
+				if cambio:
+					self._procesar(cambio[0])
+					# Proceso de larga duración: no conservar conexiones caídas
+					close_old_connections()
+				time.sleep(options['intervalo'])
+		except KeyboardInterrupt:
+			self.stdout.write("Vigilancia detenida.")
+
+	def _procesar(self, file_path):
+		"""Importa el archivo solo si su contenido es distinto al último importado."""
+		huella = hash_archivo(file_path)
+		if huella == VersionDatos.actual().huella_archivo:
+			self.stdout.write(f"{file_path}: sin cambios de contenido, no se importa.")
+			return
+		if huella == self.fallida:
+			# Ya falló con este contenido: se espera a que el archivo cambie otra vez
+			return
+
+		self.stdout.write(f"{file_path}: contenido nuevo, importando...")
+		inicio = time.perf_counter()
+		try:
+			call_command('importar_excel', '--incremental', '--workers', str(self.workers), stdout=self.stdout)
+		except Exception as e:
+			self.fallida = huella
+			self.stderr.write(f"Error al importar {file_path}: {e}")
+			return
+
+		self.fallida = None
+		self.stdout.write(self.style.SUCCESS(
+			f"Importado en {time.perf_counter() - inicio:.2f}s. Versión de datos: {VersionDatos.actual().version}"
+		))
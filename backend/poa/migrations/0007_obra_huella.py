@@ -0,0 +1,31 @@
+# Importación incremental: huella por fila y cruce por id_excel
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Importación incremental (importar_excel --incremental)
+
+    - huella: SHA-256 de la fila limpia; si no cambia, la fila no se reescribe
+    - índice en id_excel: llave para cruzar el archivo con la tabla
+    """
+
+    dependencies = [
+        ('poa', '0006_create_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='obra',
+            name='huella',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(
+                fields=['id_excel'],
+                name='poa_obra_id_excel_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Versión del conjunto de datos (vigilar_datos / importar_excel)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Versión del conjunto de datos
+
+    - Sube cada vez que una importación modifica poa_obra
+    - huella_archivo: SHA-256 del último archivo importado, para no
+      reimportar un archivo cuyo contenido no cambió
+    """
+
+    dependencies = [
+        ('poa', '0007_obra_huella'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionDatos',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('huella_archivo', models.CharField(blank=True, default='', max_length=64)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
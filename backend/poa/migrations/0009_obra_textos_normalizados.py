@@ -0,0 +1,79 @@
+# Columnas de texto normalizado (minúsculas, sin acentos) para búsquedas y zonas
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Copia fija de utils.CAMPOS_NORMALIZADOS y utils.normalizar_texto a la fecha
+# de esta migración: el relleno no debe cambiar si cambia el código de la app
+CAMPOS_NORMALIZADOS = {
+    'programa_norm': 'programa',
+    'ubicacion_norm': 'ubicacion_especifica',
+    'alcance_norm': 'alcance_territorial',
+    'alcaldias_norm': 'alcaldias',
+}
+
+
+def normalizar_texto(texto):
+    """Minúsculas y sin acentos (descomposición NFD sin marcas)."""
+    if not texto:
+        return ''
+    return ''.join(
+        char for char in unicodedata.normalize('NFD', str(texto).lower())
+        if unicodedata.category(char) != 'Mn'
+    )
+
+
+def llenar_textos_normalizados(apps, schema_editor):
+    """Calcula las columnas normalizadas de las obras ya importadas."""
+    Obra = apps.get_model('poa', 'Obra')
+    origenes = list(CAMPOS_NORMALIZADOS.values())
+    lote = []
+    for obra in Obra.objects.only('id', *origenes).iterator(chunk_size=2000):
+        for campo, origen in CAMPOS_NORMALIZADOS.items():
+            setattr(obra, campo, normalizar_texto(getattr(obra, origen)))
+        lote.append(obra)
+        if len(lote) == 2000:
+            Obra.objects.bulk_update(lote, list(CAMPOS_NORMALIZADOS))
+            lote = []
+    if lote:
+        Obra.objects.bulk_update(lote, list(CAMPOS_NORMALIZADOS))
+
+
+class Migration(migrations.Migration):
+    """
+    Texto normalizado persistido
+
+    - programa_norm, ubicacion_norm, alcance_norm, alcaldias_norm: se llenan al
+      importar y en Obra.save(); las vistas y servicios ya no normalizan por petición
+    - Sin índices: las consultas son de subcadena (LIKE '%...%'), un B-tree no ayuda
+    """
+
+    dependencies = [
+        ('poa', '0008_versiondatos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='obra',
+            name='programa_norm',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='obra',
+            name='ubicacion_norm',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='obra',
+            name='alcance_norm',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='obra',
+            name='alcaldias_norm',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(llenar_textos_normalizados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,140 @@
+# Columnas de negocio derivadas (presupuesto efectivo, viabilidad, prioridad...)
+
+from django.db import migrations, models
+
+
+# Copia fija de las reglas de utils.campos_derivados a la fecha de esta
+# migración: el relleno no debe cambiar si cambia el código de la app
+CAMPOS_SEMAFORO = (
+    'viabilidad_tecnica_semaforo',
+    'viabilidad_presupuestal_semaforo',
+    'viabilidad_juridica_semaforo',
+    'viabilidad_temporal_semaforo',
+    'viabilidad_administrativa_semaforo',
+)
+
+CAMPOS_DERIVADOS = (
+    'presupuesto_efectivo', 'monto_ejecutado', 'semaforos_rojos',
+    'semaforos_amarillos', 'viabilidad_global', 'prioridad_label',
+)
+
+ORIGENES_DERIVADOS = (
+    'presupuesto_modificado', 'anteproyecto_total', 'avance_financiero_pct',
+    'puntuacion_final_ponderada', *CAMPOS_SEMAFORO,
+)
+
+
+def etiqueta_prioridad(puntuacion):
+    if puntuacion >= 4.5:
+        return 'critica'
+    if puntuacion >= 3.5:
+        return 'muy_alta'
+    if puntuacion >= 2.5:
+        return 'alta'
+    if puntuacion >= 1.5:
+        return 'media'
+    return 'baja'
+
+
+def campos_derivados(datos):
+    """Presupuesto efectivo, monto ejecutado, semáforos, viabilidad y prioridad."""
+    modificado = datos.get('presupuesto_modificado') or 0
+    presupuesto = modificado if modificado > 0 else (datos.get('anteproyecto_total') or 0)
+    semaforos = [(datos.get(campo) or '').upper() for campo in CAMPOS_SEMAFORO]
+    rojos, amarillos = semaforos.count('ROJO'), semaforos.count('AMARILLO')
+    if rojos >= 1:
+        viabilidad = 'baja'
+    elif amarillos >= 2:
+        viabilidad = 'media'
+    else:
+        viabilidad = 'alta'
+    return {
+        'presupuesto_efectivo': presupuesto,
+        'monto_ejecutado': presupuesto * ((datos.get('avance_financiero_pct') or 0) / 100.0),
+        'semaforos_rojos': rojos,
+        'semaforos_amarillos': amarillos,
+        'viabilidad_global': viabilidad,
+        'prioridad_label': etiqueta_prioridad(datos.get('puntuacion_final_ponderada') or 0),
+    }
+
+
+def llenar_campos_derivados(apps, schema_editor):
+    """Calcula las columnas derivadas de las obras ya importadas."""
+    Obra = apps.get_model('poa', 'Obra')
+    lote = []
+    for obra in Obra.objects.only('id', *ORIGENES_DERIVADOS).iterator(chunk_size=2000):
+        origenes = {campo: getattr(obra, campo) for campo in ORIGENES_DERIVADOS}
+        for campo, valor in campos_derivados(origenes).items():
+            setattr(obra, campo, valor)
+        lote.append(obra)
+        if len(lote) == 2000:
+            Obra.objects.bulk_update(lote, list(CAMPOS_DERIVADOS))
+            lote = []
+    if lote:
+        Obra.objects.bulk_update(lote, list(CAMPOS_DERIVADOS))
+
+
+class Migration(migrations.Migration):
+    """
+    Columnas de negocio persistidas
+
+    - presupuesto_efectivo, monto_ejecutado: los SUM del dashboard y reportes
+      ya no repiten el CASE por fila
+    - semaforos_rojos, semaforos_amarillos, viabilidad_global, prioridad_label:
+      proyectos críticos, riesgos y el filtro de viabilidad son predicados indexados
+    - Se llenan al importar y en Obra.save()
+    """
+
+    dependencies = [
+        ('poa', '0009_obra_textos_normalizados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='obra',
+            name='presupuesto_efectivo',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='obra',
+            name='monto_ejecutado',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='obra',
+            name='semaforos_rojos',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='obra',
+            name='semaforos_amarillos',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='obra',
+            name='viabilidad_global',
+            field=models.CharField(default='alta', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='obra',
+            name='prioridad_label',
+            field=models.CharField(default='baja', editable=False, max_length=10),
+        ),
+        migrations.RunPython(llenar_campos_derivados, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['viabilidad_global', '-puntuacion_final_ponderada'], name='poa_obra_viab_punt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['prioridad_label'], name='poa_obra_prioridad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['semaforos_rojos', 'semaforos_amarillos'], name='poa_obra_semaforos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['-presupuesto_efectivo'], name='poa_obra_presup_ef_idx'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Estatus calculado persistido (filtros y conteos por estatus)
+
+from datetime import date
+
+from django.db import migrations, models
+
+
+def estatus_proyecto(avance_fisico, riesgo, fecha_inicio_real, hoy):
+    """
+    Copia fija de utils.estatus_proyecto a la fecha de esta migración: el
+    relleno no debe cambiar si cambian las reglas de la app.
+    """
+    avance_fisico = avance_fisico or 0
+    riesgo = riesgo or 0
+    if avance_fisico >= 100:
+        return 'completado'
+    if riesgo > 3:
+        return 'en_riesgo'
+    if fecha_inicio_real and fecha_inicio_real <= hoy and avance_fisico == 0:
+        return 'retrasado'
+    if avance_fisico > 0:
+        return 'en_ejecucion'
+    return 'planificado'
+
+
+def llenar_estatus_calculado(apps, schema_editor):
+    """
+    Calcula el estatus de las obras ya importadas a la fecha en que corre la
+    migración. VersionDatos.estatus_al queda vacío, así que el siguiente
+    recalcular_estatus (cron) revisa todas las obras con su propia fecha.
+    """
+    Obra = apps.get_model('poa', 'Obra')
+    hoy = date.today()
+    lote = []
+    obras = Obra.objects.only('id', 'avance_fisico_pct', 'riesgo_nivel', 'fecha_inicio_real')
+    for obra in obras.iterator(chunk_size=2000):
+        obra.estatus_calculado = estatus_proyecto(obra.avance_fisico_pct, obra.riesgo_nivel, obra.fecha_inicio_real, hoy)
+        lote.append(obra)
+        if len(lote) == 2000:
+            Obra.objects.bulk_update(lote, ['estatus_calculado'])
+            lote = []
+    if lote:
+        Obra.objects.bulk_update(lote, ['estatus_calculado'])
+
+
+class Migration(migrations.Migration):
+    """
+    Estatus calculado persistido
+
+    - estatus_calculado: se llena al importar y en Obra.save(); el comando
+      recalcular_estatus lo pone al día cuando avanza la fecha
+    - VersionDatos.estatus_al: fecha del último recálculo (vacía: el primero
+      revisa todas las obras)
+    - Índice en fecha_inicio_real para la ventana de fechas del recálculo
+    """
+
+    dependencies = [
+        ('poa', '0010_obra_campos_derivados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='obra',
+            name='estatus_calculado',
+            field=models.CharField(default='planificado', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='versiondatos',
+            name='estatus_al',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(llenar_estatus_calculado, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['estatus_calculado'], name='poa_obra_estatus_calc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['fecha_inicio_real'], name='poa_obra_fecha_ini_real_idx'),
+        ),
+    ]
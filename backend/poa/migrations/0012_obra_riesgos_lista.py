@@ -0,0 +1,61 @@
+# Catálogo de riesgos persistido (análisis de riesgos sin parsear texto por petición)
+
+import re
+
+from django.db import migrations, models
+
+
+# Copia fija de utils.parsear_riesgos a la fecha de esta migración: el relleno
+# no debe cambiar si cambia el código de la app
+_SEPARADORES_RIESGOS = re.compile(r'[,;\n\r|]+')
+_VINETA_RIESGO = re.compile(r'^[-•\-\d\.\)\s]+')
+MAX_RIESGOS = 10
+
+
+def parsear_riesgos(texto):
+    """Hasta MAX_RIESGOS textos de más de 3 caracteres, sin viñetas."""
+    if not texto:
+        return []
+    riesgos = []
+    for riesgo in _SEPARADORES_RIESGOS.split(str(texto)):
+        riesgo = _VINETA_RIESGO.sub('', riesgo.strip()).strip()
+        if len(riesgo) > 3:
+            riesgos.append(riesgo)
+    return riesgos[:MAX_RIESGOS]
+
+
+def llenar_riesgos_lista(apps, schema_editor):
+    """Separa los problemas identificados de las obras ya importadas."""
+    Obra = apps.get_model('poa', 'Obra')
+    lote = []
+    obras = Obra.objects.only('id', 'problemas_identificados')
+    for obra in obras.iterator(chunk_size=2000):
+        obra.riesgos_lista = parsear_riesgos(obra.problemas_identificados)
+        lote.append(obra)
+        if len(lote) == 2000:
+            Obra.objects.bulk_update(lote, ['riesgos_lista'])
+            lote = []
+    if lote:
+        Obra.objects.bulk_update(lote, ['riesgos_lista'])
+
+
+class Migration(migrations.Migration):
+    """
+    Catálogo de riesgos persistido
+
+    - riesgos_lista: problemas_identificados separado en riesgos (máximo 10),
+      se llena al importar y en Obra.save()
+    """
+
+    dependencies = [
+        ('poa', '0011_obra_estatus_calculado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='obra',
+            name='riesgos_lista',
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.RunPython(llenar_riesgos_lista, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Tabla de riesgos identificados por obra (frecuencias de riesgos)
+
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Copia fija de utils.filas_riesgos y utils.clave_riesgo a la fecha de esta
+# migración: el relleno no debe cambiar si cambia el código de la app
+def clave_riesgo(riesgo):
+    """Minúsculas, sin acentos, espacios simples y sin punto final."""
+    texto = ''.join(
+        char for char in unicodedata.normalize('NFD', str(riesgo or '').lower())
+        if unicodedata.category(char) != 'Mn'
+    )
+    return ' '.join(texto.split()).rstrip('.')[:255]
+
+
+# El texto por defecto de problemas_identificados no es un riesgo
+_CLAVE_SIN_RIESGOS = clave_riesgo('Sin Problemas Identificados')
+
+
+def filas_riesgos(riesgos):
+    filas = []
+    for orden, riesgo in enumerate(riesgos, start=1):
+        clave = clave_riesgo(riesgo)
+        if clave != _CLAVE_SIN_RIESGOS:
+            filas.append({'orden': orden, 'descripcion': riesgo, 'clave': clave})
+    return filas
+
+
+def llenar_riesgos(apps, schema_editor):
+    """Crea los riesgos de las obras ya importadas a partir de riesgos_lista."""
+    Obra = apps.get_model('poa', 'Obra')
+    RiesgoIdentificado = apps.get_model('poa', 'RiesgoIdentificado')
+    lote = []
+    for pk, riesgos in Obra.objects.values_list('id', 'riesgos_lista').iterator(chunk_size=2000):
+        lote.extend(RiesgoIdentificado(obra_id=pk, **fila) for fila in filas_riesgos(riesgos))
+        if len(lote) >= 2000:
+            RiesgoIdentificado.objects.bulk_create(lote, batch_size=500)
+            lote = []
+    if lote:
+        RiesgoIdentificado.objects.bulk_create(lote, batch_size=500)
+
+
+class Migration(migrations.Migration):
+    """
+    Riesgos identificados normalizados
+
+    - RiesgoIdentificado: un renglón por elemento de Obra.riesgos_lista, con
+      llave normalizada (utils.clave_riesgo); se carga en espejo junto con
+      poa_obra en la importación completa
+    - Índices para el detalle por obra y para el GROUP BY por llave
+    """
+
+    dependencies = [
+        ('poa', '0012_obra_riesgos_lista'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RiesgoIdentificado',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orden', models.PositiveSmallIntegerField()),
+                ('descripcion', models.TextField()),
+                ('clave', models.CharField(max_length=255)),
+                ('obra', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='riesgos', to='poa.obra')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['obra', 'orden'], name='poa_riesgo_obra_orden_idx'),
+                    models.Index(fields=['clave', 'obra'], name='poa_riesgo_clave_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(llenar_riesgos, migrations.RunPython.noop),
+    ]
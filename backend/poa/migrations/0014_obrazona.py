@@ -0,0 +1,82 @@
+# Puente obra -> zona territorial (endpoints territoriales como GROUP BY)
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Copia fija del clasificador territorial (utils.filas_zonas) a la fecha de
+# esta migración: el relleno no debe cambiar si cambia el código de la app.
+# Formas normalizadas de las alcaldías de cada zona, en el orden de las gráficas
+ZONAS_ALCALDIAS = {
+    'Zona Norte': ('gustavo a. madero', 'gustavo a madero', 'azcapotzalco'),
+    'Zona Sur': ('tlalpan', 'xochimilco', 'milpa alta'),
+    'Centro Histórico': ('cuauhtemoc', 'benito juarez', 'coyoacan'),
+    'Zona Oriente': ('iztapalapa', 'iztacalco', 'venustiano carranza', 'tlahuac'),
+    'Zona Poniente': ('miguel hidalgo', 'cuajimalpa', 'alvaro obregon', 'magdalena contreras'),
+}
+ZONA_SIN_ASIGNAR = 'Sin Asignar'
+PALABRAS_CIUDAD_COMPLETA = ('todas', '16 alcaldias', 'ciudad completa', 'toda la ciudad')
+
+
+def filas_zonas(alcaldias_norm, alcance_norm, ubicacion_norm):
+    """Una fila por zona mencionada con el peso del prorrateo, o Sin Asignar."""
+    texto = ' | '.join(t for t in (alcaldias_norm, alcance_norm, ubicacion_norm) if t)
+    ciudad_completa = any(palabra in texto for palabra in PALABRAS_CIUDAD_COMPLETA)
+    zonas = [
+        zona for zona, alcaldias in ZONAS_ALCALDIAS.items()
+        if ciudad_completa or any(alcaldia in texto for alcaldia in alcaldias)
+    ]
+    if not zonas:
+        return [{'zona': ZONA_SIN_ASIGNAR, 'peso': 1.0, 'ciudad_completa': False}]
+    peso = 1.0 / len(zonas)
+    return [{'zona': zona, 'peso': peso, 'ciudad_completa': ciudad_completa} for zona in zonas]
+
+
+def llenar_zonas(apps, schema_editor):
+    """Clasifica las obras ya importadas con el clasificador territorial."""
+    Obra = apps.get_model('poa', 'Obra')
+    ObraZona = apps.get_model('poa', 'ObraZona')
+    lote = []
+    obras = Obra.objects.values_list('id', 'alcaldias_norm', 'alcance_norm', 'ubicacion_norm')
+    for pk, *textos in obras.iterator(chunk_size=2000):
+        lote.extend(ObraZona(obra_id=pk, **fila) for fila in filas_zonas(*textos))
+        if len(lote) >= 2000:
+            ObraZona.objects.bulk_create(lote, batch_size=500)
+            lote = []
+    if lote:
+        ObraZona.objects.bulk_create(lote, batch_size=500)
+
+
+class Migration(migrations.Migration):
+    """
+    Puente obra -> zona
+
+    - ObraZona: una fila por zona de cada obra con el peso del prorrateo
+      (utils.filas_zonas); se carga en espejo junto con poa_obra en la
+      importación completa
+    - Índices para el detalle por obra y para el GROUP BY por zona
+    """
+
+    dependencies = [
+        ('poa', '0013_riesgoidentificado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ObraZona',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zona', models.CharField(max_length=20)),
+                ('peso', models.FloatField()),
+                ('ciudad_completa', models.BooleanField(default=False)),
+                ('obra', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='zonas', to='poa.obra')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['obra', 'zona'], name='poa_zona_obra_idx'),
+                    models.Index(fields=['zona', 'obra'], name='poa_zona_zona_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(llenar_zonas, migrations.RunPython.noop),
+    ]
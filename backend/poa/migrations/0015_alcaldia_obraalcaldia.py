@@ -0,0 +1,162 @@
+# Catálogo de alcaldías y vínculo muchos a muchos con las obras
+
+import difflib
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Copia fija del catálogo y de utils.resolver_alcaldias a la fecha de esta
+# migración: el relleno no debe cambiar si cambia el código de la app.
+# (nombre, zona, formas normalizadas) en el orden de utils.ALCALDIAS: la
+# posición es la llave fija de cada alcaldía
+ALCALDIAS = (
+    ('Gustavo A. Madero', 'Zona Norte', ('gustavo a. madero', 'gustavo a madero')),
+    ('Azcapotzalco', 'Zona Norte', ('azcapotzalco',)),
+    ('Tlalpan', 'Zona Sur', ('tlalpan',)),
+    ('Xochimilco', 'Zona Sur', ('xochimilco',)),
+    ('Milpa Alta', 'Zona Sur', ('milpa alta',)),
+    ('Cuauhtémoc', 'Centro Histórico', ('cuauhtemoc',)),
+    ('Benito Juárez', 'Centro Histórico', ('benito juarez',)),
+    ('Coyoacán', 'Centro Histórico', ('coyoacan',)),
+    ('Iztapalapa', 'Zona Oriente', ('iztapalapa',)),
+    ('Iztacalco', 'Zona Oriente', ('iztacalco',)),
+    ('Venustiano Carranza', 'Zona Oriente', ('venustiano carranza',)),
+    ('Tláhuac', 'Zona Oriente', ('tlahuac',)),
+    ('Miguel Hidalgo', 'Zona Poniente', ('miguel hidalgo',)),
+    ('Cuajimalpa de Morelos', 'Zona Poniente', ('cuajimalpa', 'cuajimalpa de morelos')),
+    ('Álvaro Obregón', 'Zona Poniente', ('alvaro obregon',)),
+    ('La Magdalena Contreras', 'Zona Poniente', ('magdalena contreras', 'la magdalena contreras')),
+)
+ZONAS = ('Zona Norte', 'Zona Sur', 'Centro Histórico', 'Zona Oriente', 'Zona Poniente')
+ZONA_SIN_ASIGNAR = 'Sin Asignar'
+PALABRAS_CIUDAD_COMPLETA = ('todas', '16 alcaldias', 'ciudad completa', 'toda la ciudad')
+SIMILITUD_ALCALDIA = 0.8
+_SEPARADORES_ALCALDIAS = re.compile(r'\s*(?:[,;/|]|\s+y\s+|\s+e\s+)\s*')
+
+# Forma normalizada -> posición en ALCALDIAS, para la búsqueda aproximada
+_POSICION_ALCALDIA = {
+    variante: posicion for posicion, (_, _, variantes) in enumerate(ALCALDIAS) for variante in variantes
+}
+
+
+def resolver_alcaldias(alcaldias_norm, alcance_norm, ubicacion_norm):
+    """
+    Posiciones en ALCALDIAS a las que se refieren los textos de una obra y si
+    es toda la ciudad: coincidencia exacta por fragmento o, si no hay, el
+    nombre más parecido (difflib) por encima de SIMILITUD_ALCALDIA.
+    """
+    texto = ' | '.join(t for t in (alcaldias_norm, alcance_norm, ubicacion_norm) if t)
+    if any(palabra in texto for palabra in PALABRAS_CIUDAD_COMPLETA):
+        return list(range(len(ALCALDIAS))), True
+    encontradas = set()
+    for fragmento in _SEPARADORES_ALCALDIAS.split(texto) if texto else ():
+        exactas = {
+            posicion for posicion, (_, _, variantes) in enumerate(ALCALDIAS)
+            if any(v in fragmento for v in variantes)
+        }
+        if exactas:
+            encontradas.update(exactas)
+            continue
+        parecidas = difflib.get_close_matches(fragmento, _POSICION_ALCALDIA, n=1, cutoff=SIMILITUD_ALCALDIA)
+        if parecidas:
+            encontradas.add(_POSICION_ALCALDIA[parecidas[0]])
+    return sorted(encontradas), False
+
+
+def filas_territoriales(alcaldias_norm, alcance_norm, ubicacion_norm):
+    """Filas de ObraAlcaldia y de ObraZona (sin la obra) con la misma resolución."""
+    posiciones, ciudad_completa = resolver_alcaldias(alcaldias_norm, alcance_norm, ubicacion_norm)
+    vinculos = [{'alcaldia_id': posicion + 1} for posicion in posiciones]
+    encontradas = {ALCALDIAS[posicion][1] for posicion in posiciones}
+    zonas = [zona for zona in ZONAS if zona in encontradas]
+    if not zonas:
+        return vinculos, [{'zona': ZONA_SIN_ASIGNAR, 'peso': 1.0, 'ciudad_completa': False}]
+    peso = 1.0 / len(zonas)
+    return vinculos, [{'zona': zona, 'peso': peso, 'ciudad_completa': ciudad_completa} for zona in zonas]
+
+
+def sembrar_alcaldias(apps, schema_editor):
+    """Las 16 alcaldías con su llave fija y su zona."""
+    Alcaldia = apps.get_model('poa', 'Alcaldia')
+    Alcaldia.objects.bulk_create([
+        Alcaldia(id=posicion, nombre=nombre, zona=zona)
+        for posicion, (nombre, zona, _) in enumerate(ALCALDIAS, start=1)
+    ])
+
+
+def vincular_alcaldias(apps, schema_editor):
+    """
+    Resuelve los textos territoriales de las obras ya importadas contra el
+    catálogo y reescribe ObraZona con la misma resolución.
+    """
+    Obra = apps.get_model('poa', 'Obra')
+    ObraAlcaldia = apps.get_model('poa', 'ObraAlcaldia')
+    ObraZona = apps.get_model('poa', 'ObraZona')
+    ObraZona.objects.all().delete()
+    vinculos, zonas = [], []
+    obras = Obra.objects.values_list('id', 'alcaldias_norm', 'alcance_norm', 'ubicacion_norm')
+    for pk, *textos in obras.iterator(chunk_size=2000):
+        filas_alcaldias, filas_zonas = filas_territoriales(*textos)
+        vinculos.extend(ObraAlcaldia(obra_id=pk, **fila) for fila in filas_alcaldias)
+        zonas.extend(ObraZona(obra_id=pk, **fila) for fila in filas_zonas)
+        if len(vinculos) + len(zonas) >= 2000:
+            ObraAlcaldia.objects.bulk_create(vinculos, batch_size=500)
+            ObraZona.objects.bulk_create(zonas, batch_size=500)
+            vinculos, zonas = [], []
+    ObraAlcaldia.objects.bulk_create(vinculos, batch_size=500)
+    ObraZona.objects.bulk_create(zonas, batch_size=500)
+
+
+class Migration(migrations.Migration):
+    """
+    Dimensión de alcaldías
+
+    - Alcaldia: catálogo de las 16 alcaldías (llave = posición en
+      utils.ALCALDIAS), sembrado aquí
+    - ObraAlcaldia: tabla intermedia de Obra.alcaldias_canonicas, derivada de
+      los textos territoriales (utils.filas_alcaldias); se carga en espejo
+      junto con poa_obra en la importación completa
+    - ObraZona se reescribe con la misma resolución de alcaldías
+    - Índices para ambos sentidos del join
+    """
+
+    dependencies = [
+        ('poa', '0014_obrazona'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Alcaldia',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('zona', models.CharField(max_length=20)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ObraAlcaldia',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alcaldia', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='vinculos_obra', to='poa.alcaldia')),
+                ('obra', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='vinculos_alcaldia', to='poa.obra')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['obra', 'alcaldia'], name='poa_obraalc_obra_idx'),
+                    models.Index(fields=['alcaldia', 'obra'], name='poa_obraalc_alc_idx'),
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name='obra',
+            name='alcaldias_canonicas',
+            field=models.ManyToManyField(related_name='obras', through='poa.ObraAlcaldia', to='poa.alcaldia'),
+        ),
+        migrations.RunPython(sembrar_alcaldias, migrations.RunPython.noop),
+        migrations.RunPython(vincular_alcaldias, migrations.RunPython.noop),
+    ]
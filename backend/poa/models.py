@@ -1,4 +1,11 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .utils import (
+	ALCALDIAS, CAMPOS_DERIVADOS, CAMPOS_NORMALIZADOS, ID_ALCALDIA, ORIGENES_DERIVADOS, ORIGENES_ESTATUS, ZONA_DE_ALCALDIA,
+	campos_derivados, estatus_proyecto, filas_alcaldias, filas_riesgos, filas_zonas, normalizar_texto, parsear_riesgos,
+)
 
 class Obra(models.Model):
 	# --- BLOQUE 1: Identificación del Proyecto (Cols 0-3) ---
@@ -93,5 +100,294 @@ class Obra(models.Model):
 	control_captura = models.TextField(null=True, blank=True)           # col 65
 	control_notas = models.TextField(null=True, blank=True)             # col 66
 
+	# --- Control de importación ---
+	huella = models.CharField(max_length=64, null=True, blank=True, editable=False) # SHA-256 de la fila limpia
+
+	# --- Texto normalizado (minúsculas, sin acentos) para búsquedas y zonas ---
+	programa_norm = models.TextField(null=True, blank=True, editable=False)   # programa
+	ubicacion_norm = models.TextField(null=True, blank=True, editable=False)  # ubicacion_especifica
+	alcance_norm = models.TextField(null=True, blank=True, editable=False)    # alcance_territorial
+	alcaldias_norm = models.TextField(null=True, blank=True, editable=False)  # alcaldias
+
+	# --- Columnas de negocio derivadas (utils.campos_derivados) ---
+	presupuesto_efectivo = models.FloatField(default=0, editable=False)   # modificado > 0, si no anteproyecto
+	monto_ejecutado = models.FloatField(default=0, editable=False)        # efectivo * avance financiero
+	semaforos_rojos = models.PositiveSmallIntegerField(default=0, editable=False)
+	semaforos_amarillos = models.PositiveSmallIntegerField(default=0, editable=False)
+	viabilidad_global = models.CharField(max_length=10, default='alta', editable=False)  # alta / media / baja
+	prioridad_label = models.CharField(max_length=10, default='baja', editable=False)    # critica ... baja
+
+	# --- Estatus calculado (utils.calcular_estatus_proyecto) ---
+	# Depende de la fecha: services.recalcular_estatus() lo mantiene al día
+	estatus_calculado = models.CharField(max_length=20, default='planificado', editable=False)
+
+	# --- Riesgos identificados (utils.parsear_riesgos de problemas_identificados) ---
+	riesgos_lista = models.JSONField(default=list, editable=False)
+
+	# --- Alcaldías del catálogo (utils.resolver_alcaldias de los textos territoriales) ---
+	alcaldias_canonicas = models.ManyToManyField('Alcaldia', through='ObraAlcaldia', related_name='obras')
+
+	class Meta:
+		indexes = [
+			# Sprint 3 - Fase 2 (0006_create_indexes)
+			models.Index(fields=['area_responsable'], name='poa_obra_area_idx'),
+			models.Index(fields=['estatus_general'], name='poa_obra_estatus_idx'),
+			models.Index(fields=['fecha_termino_prog'], name='poa_obra_fecha_term_idx'),
+			models.Index(fields=['fecha_inicio_prog'], name='poa_obra_fecha_ini_idx'),
+			models.Index(fields=['-ultima_actualizacion'], name='poa_obra_ultima_act_idx'),
+			models.Index(fields=['-puntuacion_final_ponderada'], name='poa_obra_punt_final_idx'),
+			models.Index(fields=['-avance_fisico_pct'], name='poa_obra_avance_idx'),
+			models.Index(fields=['area_responsable', '-avance_fisico_pct'], name='poa_obra_area_avance_idx'),
+			models.Index(fields=['estatus_general', 'fecha_termino_prog'], name='poa_obra_estado_fecha_idx'),
+			models.Index(fields=['alcaldias'], name='poa_obra_alcaldias_idx'),
+			# Importación incremental: cruce por id_excel
+			models.Index(fields=['id_excel'], name='poa_obra_id_excel_idx'),
+			# Columnas derivadas: proyectos críticos, riesgos y filtros de viabilidad
+			models.Index(fields=['viabilidad_global', '-puntuacion_final_ponderada'], name='poa_obra_viab_punt_idx'),
+			models.Index(fields=['prioridad_label'], name='poa_obra_prioridad_idx'),
+			models.Index(fields=['semaforos_rojos', 'semaforos_amarillos'], name='poa_obra_semaforos_idx'),
+			models.Index(fields=['-presupuesto_efectivo'], name='poa_obra_presup_ef_idx'),
+			# Filtros y conteos por estatus; ventana de fechas de recalcular_estatus()
+			models.Index(fields=['estatus_calculado'], name='poa_obra_estatus_calc_idx'),
+			models.Index(fields=['fecha_inicio_real'], name='poa_obra_fecha_ini_real_idx'),
+		]
+
+	def save(self, *args, **kwargs):
+		# Una edición fuera de la importación invalida la huella: la siguiente
+		# importación incremental vuelve a escribir la fila desde el archivo.
+		self.huella = None
+		update_fields = kwargs.get('update_fields')
+		# Las columnas normalizadas siguen al texto original
+		normalizados = {
+			campo: origen for campo, origen in CAMPOS_NORMALIZADOS.items()
+			if update_fields is None or origen in update_fields
+		}
+		for campo, origen in normalizados.items():
+			setattr(self, campo, normalizar_texto(getattr(self, origen)))
+		# Las columnas de negocio siguen a sus campos de origen
+		derivados = ()
+		if update_fields is None or not set(update_fields).isdisjoint(ORIGENES_DERIVADOS):
+			derivados = CAMPOS_DERIVADOS
+			origenes = {campo: getattr(self, campo) for campo in ORIGENES_DERIVADOS}
+			for campo, valor in campos_derivados(origenes).items():
+				setattr(self, campo, valor)
+		if update_fields is None or not set(update_fields).isdisjoint(ORIGENES_ESTATUS):
+			derivados = (*derivados, 'estatus_calculado')
+			self.estatus_calculado = estatus_proyecto(*(getattr(self, campo) for campo in ORIGENES_ESTATUS))
+		if update_fields is None or 'problemas_identificados' in update_fields:
+			derivados = (*derivados, 'riesgos_lista')
+			self.riesgos_lista = parsear_riesgos(self.problemas_identificados)
+		if update_fields is not None:
+			kwargs['update_fields'] = set(update_fields) | {'huella'} | set(normalizados) | set(derivados)
+
+		# Tablas hijas cuyas columnas de origen se acaban de recalcular
+		recalculadas = {*normalizados, *derivados}
+		hijas = [hija for hija in TABLAS_DERIVADAS if update_fields is None or recalculadas & set(hija.ORIGENES)]
+		if not hijas:
+			return super().save(*args, **kwargs)
+		with transaction.atomic():
+			super().save(*args, **kwargs)
+			for hija in hijas:
+				hija.reemplazar({self.pk: hija.origenes(self)})
+
+	def __str__(self):
+		return str(self.programa)[:50]
+
+
+class DerivadaDeObra(models.Model):
+	"""
+	Tabla hija que se reconstruye desde columnas de Obra (ORIGENES) con filas().
+	Se llena al importar (en espejo, ver importacion.intercambio) y en Obra.save().
+	"""
+	# Columnas de Obra de las que se derivan las filas
+	ORIGENES = ()
+
+	class Meta:
+		abstract = True
+
+	@staticmethod
+	def filas(*origenes):
+		"""Filas (dicts sin la obra) para los valores de ORIGENES de una obra."""
+		raise NotImplementedError
+
+	@classmethod
+	def origenes(cls, obra):
+		"""Valores de ORIGENES de una instancia (o dict) de Obra."""
+		if isinstance(obra, dict):
+			return tuple(obra[campo] for campo in cls.ORIGENES)
+		return tuple(getattr(obra, campo) for campo in cls.ORIGENES)
+
+	@classmethod
+	def reemplazar(cls, origenes_por_obra):
+		"""
+		Reescribe las filas de las obras indicadas.
+
+		Args:
+			origenes_por_obra: dict {pk de obra: valores de ORIGENES}
+		"""
+		pks = list(origenes_por_obra)
+		for inicio in range(0, len(pks), 500):
+			cls.objects.filter(obra_id__in=pks[inicio:inicio + 500]).delete()
+		cls.objects.bulk_create([
+			cls(obra_id=pk, **fila)
+			for pk, origenes in origenes_por_obra.items()
+			for fila in cls.filas(*origenes)
+		], batch_size=500)
+
+
+class RiesgoIdentificado(DerivadaDeObra):
+	"""
+	Riesgo de Obra.riesgos_lista, uno por fila, con su llave normalizada
+	(utils.clave_riesgo) para contar frecuencias entre proyectos.
+	"""
+	ORIGENES = ('riesgos_lista',)
+	filas = staticmethod(filas_riesgos)
+
+	# Sin índice propio: lo cubre poa_riesgo_obra_orden_idx
+	obra = models.ForeignKey(Obra, on_delete=models.CASCADE, related_name='riesgos', db_index=False)
+	orden = models.PositiveSmallIntegerField()          # posición en riesgos_lista (1..MAX_RIESGOS)
+	descripcion = models.TextField()                    # texto tal como se capturó
+	clave = models.CharField(max_length=255)            # minúsculas, sin acentos
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['obra', 'orden'], name='poa_riesgo_obra_orden_idx'),
+			# Frecuencias: GROUP BY clave
+			models.Index(fields=['clave', 'obra'], name='poa_riesgo_clave_idx'),
+		]
+
+	def __str__(self):
+		return self.descripcion[:50]
+
+
+class ObraZona(DerivadaDeObra):
+	"""
+	Puente obra -> zona territorial (utils.zonas_territoriales) con el peso
+	del prorrateo: los endpoints territoriales son GROUP BY zona sobre esta tabla.
+	Cada obra tiene al menos una fila (ZONA_SIN_ASIGNAR) y sus pesos suman 1.
+	"""
+	ORIGENES = ('alcaldias_norm', 'alcance_norm', 'ubicacion_norm')
+	filas = staticmethod(filas_zonas)
+
+	# Sin índice propio: lo cubre poa_zona_obra_idx
+	obra = models.ForeignKey(Obra, on_delete=models.CASCADE, related_name='zonas', db_index=False)
+	zona = models.CharField(max_length=20)              # ZONAS o ZONA_SIN_ASIGNAR
+	peso = models.FloatField()                          # 1 / número de zonas de la obra
+	ciudad_completa = models.BooleanField(default=False)  # proyecto de toda la ciudad
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['obra', 'zona'], name='poa_zona_obra_idx'),
+			models.Index(fields=['zona', 'obra'], name='poa_zona_zona_idx'),
+		]
+
+	def __str__(self):
+		return f'{self.obra_id} -> {self.zona}'
+
+
+class Alcaldia(models.Model):
+	"""
+	Catálogo de las 16 alcaldías (utils.ALCALDIAS), con llave fija
+	(utils.ID_ALCALDIA). Lo siembra la migración y cada importación agrega
+	las que falten (sembrar); no se carga en espejo.
+	"""
+	id = models.PositiveSmallIntegerField(primary_key=True)
+	nombre = models.CharField(max_length=50, unique=True)  # nombre oficial
+	zona = models.CharField(max_length=20)                  # ZONAS
+
+	class Meta:
+		ordering = ['id']
+
+	@classmethod
+	def sembrar(cls):
+		"""Crea las alcaldías del catálogo que falten (p. ej. tras un flush). Una consulta si ya están."""
+		existentes = set(cls.objects.values_list('pk', flat=True))
+		cls.objects.bulk_create([
+			cls(id=ID_ALCALDIA[nombre], nombre=nombre, zona=ZONA_DE_ALCALDIA[nombre])
+			for nombre in ALCALDIAS if ID_ALCALDIA[nombre] not in existentes
+		])
+
+	def __str__(self):
+		return self.nombre
+
+
+class ObraAlcaldia(DerivadaDeObra):
+	"""
+	Vínculo obra <-> alcaldía del catálogo (Obra.alcaldias_canonicas):
+	conteos, presupuestos y filtros por alcaldía son joins por índice en
+	lugar de buscar dentro del texto libre de Obra.alcaldias. Misma
+	resolución y mismos textos que ObraZona: ambas tablas coinciden.
+	"""
+	ORIGENES = ('alcaldias_norm', 'alcance_norm', 'ubicacion_norm')
+	filas = staticmethod(filas_alcaldias)
+
+	# Sin índices propios: los cubren poa_obraalc_obra_idx y poa_obraalc_alc_idx
+	obra = models.ForeignKey(Obra, on_delete=models.CASCADE, related_name='vinculos_alcaldia', db_index=False)
+	alcaldia = models.ForeignKey(Alcaldia, on_delete=models.PROTECT, related_name='vinculos_obra', db_index=False)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['obra', 'alcaldia'], name='poa_obraalc_obra_idx'),
+			models.Index(fields=['alcaldia', 'obra'], name='poa_obraalc_alc_idx'),
+		]
+
+	def __str__(self):
+		return f'{self.obra_id} -> {self.alcaldia_id}'
+
+
+# Tablas hijas que siguen a las columnas de Obra
+TABLAS_DERIVADAS = (RiesgoIdentificado, ObraZona, ObraAlcaldia)
+
+
+class VersionDatos(models.Model):
+	"""
+	Versión del conjunto de datos (una sola fila).
+	Sube cada vez que una importación modifica poa_obra: las cachés que
+	dependen de las obras pueden usarla como parte de su llave.
+	"""
+	version = models.PositiveIntegerField(default=0)
+	huella_archivo = models.CharField(max_length=64, blank=True, default='') # SHA-256 del último archivo importado
+	estatus_al = models.DateField(null=True, blank=True) # fecha del último recalcular_estatus()
+	actualizado = models.DateTimeField(auto_now=True)
+
+	@classmethod
+	def actual(cls):
+		"""Fila de versión vigente (versión 0 si nunca se ha importado)."""
+		return cls.objects.filter(pk=1).first() or cls(pk=1)
+
+	@classmethod
+	def registrar_importacion(cls, huella_archivo, hubo_cambios=True):
+		"""
+		Guarda la huella del archivo importado y, si cambiaron filas, sube la versión.
+
+		Returns:
+			int: versión resultante
+		"""
+		with transaction.atomic():
+			cls.objects.get_or_create(pk=1)
+			cambios = {'huella_archivo': huella_archivo}
+			if hubo_cambios:
+				cambios['version'] = F('version') + 1
+			# update() no pasa por auto_now
+			cls.objects.filter(pk=1).update(actualizado=timezone.now(), **cambios)
+			return cls.objects.get(pk=1).version
+
+	@classmethod
+	def registrar_estatus(cls, fecha, hubo_cambios):
+		"""
+		Guarda la fecha a la que quedó al día Obra.estatus_calculado y, si
+		cambiaron filas, sube la versión.
+
+		Returns:
+			int: versión resultante
+		"""
+		with transaction.atomic():
+			cls.objects.get_or_create(pk=1)
+			cambios = {'estatus_al': fecha}
+			if hubo_cambios:
+				cambios['version'] = F('version') + 1
+			cls.objects.filter(pk=1).update(actualizado=timezone.now(), **cambios)
+			return cls.objects.get(pk=1).version
+
 	def __str__(self):
-		return str(self.programa)[:50]
\ No newline at end of file
+		return f'v{self.version}'
@@ -0,0 +1,79 @@
+import json
+import warnings
+
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+# orjson está en requirements.txt; sin él (instalación incompleta) se avisa
+# y se usa JSONRenderer como respaldo
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+    warnings.warn('orjson no está instalado: la API usará JSONRenderer (más lento)', RuntimeWarning)
+
+
+class FragmentosJSON:
+    """Arreglo JSON ya renderizado; JSONFragmentosRenderer lo inserta tal cual."""
+
+    def __init__(self, fragmentos):
+        self.fragmentos = fragmentos
+
+    def contenido(self):
+        return b'[' + b','.join(self.fragmentos) + b']'
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer con orjson (requirements.txt) para la salida compacta.
+
+    Los valores que orjson no conoce (Decimal, fechas, tipos de numpy...)
+    pasan por el JSONEncoder de DRF, así que el JSON es equivalente al de
+    JSONRenderer; solo cambia el formato de algunos números (1e+16 -> 1e16)
+    y U+2028/U+2029 no se escapan. Con sangría (API navegable) o sin orjson
+    se usa JSONRenderer.
+    """
+
+    OPCIONES = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(data, default=JSONEncoder().default, option=self.OPCIONES)
+        except orjson.JSONEncodeError:
+            # Enteros de más de 64 bits, NaN con STRICT_JSON, etc.: mismo error o salida que DRF
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class JSONFragmentosRenderer(ORJSONRenderer):
+    """
+    ORJSONRenderer que acepta FragmentosJSON como respuesta completa o como
+    'results' de una página, y lo inserta sin volver a serializarlo.
+    El resultado es idéntico al de ORJSONRenderer con los datos equivalentes.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        fragmentos = None
+        if isinstance(data, FragmentosJSON):
+            fragmentos, data = data, None
+        elif isinstance(data, dict) and isinstance(data.get('results'), FragmentosJSON):
+            fragmentos, data = data['results'], {**data, 'results': None}
+
+        if fragmentos is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # Salida con sangría (API navegable): los fragmentos son compactos
+            arreglo = json.loads(fragmentos.contenido())
+            if data is None:
+                return super().render(arreglo, accepted_media_type, renderer_context)
+            return super().render({**data, 'results': arreglo}, accepted_media_type, renderer_context)
+
+        if data is None:
+            return fragmentos.contenido()
+        # '"results":null' solo puede ser la llave: dentro de un texto las comillas van escapadas
+        envoltura = super().render(data, accepted_media_type, renderer_context)
+        return envoltura.replace(b'"results":null', b'"results":' + fragmentos.contenido(), 1)
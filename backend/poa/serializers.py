@@ -1,12 +1,48 @@
+from datetime import date
+
 from rest_framework import serializers
 from .models import Obra
 from .utils import (
     calcular_puntuacion_ponderada, 
     obtener_etiqueta_prioridad,
+    calcular_viabilidad_global,
+    calcular_estatus_proyecto,
+    contar_semaforos,
+    viabilidad_por_semaforos,
+    estatus_proyecto,
     capitalizar_texto,
-    obtener_valor_por_defecto
+    obtener_valor_por_defecto,
+    CAMPOS_SEMAFORO,
+    ORIGENES_ESTATUS,
 )
 
+
+# --- REGLAS DE LOS CAMPOS CALCULADOS (compartidas por ambos serializadores) ---
+
+TEXTOS_ESCALA = {1: "1 - Muy Bajo", 2: "2 - Bajo", 3: "3 - Regular", 4: "4 - Alto", 5: "5 - Muy Alto"}
+
+
+def texto_escala(valor):
+    return TEXTOS_ESCALA.get(valor, f"{valor} - Definido")
+
+
+def presupuesto_final(modificado, anteproyecto):
+    return modificado if (modificado or 0) > 0 else (anteproyecto or 0)
+
+
+def semaforo_obra(riesgo, avance_fisico, urgencia, tecnica, presupuestal):
+    if (riesgo or 0) >= 4: return "ROJO"
+    if (avance_fisico or 0) < 20 and (urgencia or 0) >= 4: return "ROJO"
+    
+    sem_list = [tecnica, presupuestal]
+    # Safe upper check
+    sem_upper = [s.upper() for s in sem_list if s]
+    if "ROJO" in sem_upper: return "ROJO"
+    
+    if (riesgo or 0) == 3: return "AMARILLO"
+    return "VERDE"
+
+
 class ObraSerializer(serializers.ModelSerializer):
     # --- CAMPOS CALCULADOS (Nuevos) ---
     puntuacion_final_ponderada = serializers.SerializerMethodField()
@@ -33,7 +69,65 @@ class ObraSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Obra
-        fields = '__all__'
+        # Columnas internas de la importación y de búsqueda: no forman parte de la API
+        exclude = [
+            'huella', 'programa_norm', 'ubicacion_norm', 'alcance_norm', 'alcaldias_norm',
+            'presupuesto_efectivo', 'semaforos_rojos', 'semaforos_amarillos', 'estatus_calculado',
+            'riesgos_lista', 'alcaldias_canonicas',
+        ]
+
+    # --- CAMPOS DISPERSOS (?fields=) ---
+
+    # Representación compacta para listados (?fields=lista)
+    CAMPOS_LISTA = (
+        'id', 'programa', 'area_responsable', 'alcaldias',
+        'estatus_general', 'avance_fisico_pct', 'avance_financiero_pct',
+        'presupuesto_final', 'puntuacion_final_ponderada', 'prioridad_label',
+        'viabilidad_global', 'semaforo', 'fecha_inicio_prog', 'fecha_termino_prog',
+    )
+
+    # Columnas del modelo que lee cada campo que no es una columna con su mismo nombre
+    CRITERIOS = (
+        'alineacion_estrategica', 'impacto_social_nivel', 'urgencia', 'viabilidad_ejecucion',
+        'recursos_disponibles', 'riesgo_nivel', 'dependencias_nivel',
+    )
+    DEPENDENCIAS = {
+        'puntuacion_final_ponderada': CRITERIOS,
+        'prioridad_label': CRITERIOS,
+        'viabilidad_global': CAMPOS_SEMAFORO,
+        'estatus_general': ORIGENES_ESTATUS,
+        'semaforo': (
+            'riesgo_nivel', 'avance_fisico_pct', 'urgencia',
+            'viabilidad_tecnica_semaforo', 'viabilidad_presupuestal_semaforo',
+        ),
+        'presupuesto_final': ('presupuesto_modificado', 'anteproyecto_total'),
+        'monto_ejecutado': ('presupuesto_modificado', 'anteproyecto_total', 'avance_financiero_pct'),
+        'urgencia_num': ('urgencia',),
+        'riesgo_nivel_num': ('riesgo_nivel',),
+        'impacto_social_num': ('impacto_social_nivel',),
+    }
+
+    # Campos numéricos 1-5 que se devuelven como texto ("4 - Alto")
+    CAMPOS_ESCALA = (
+        'urgencia', 'impacto_social_nivel', 'alineacion_estrategica', 'complejidad_tecnica', 'riesgo_nivel',
+    )
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """
+        fields: nombres de campos a incluir (None: representación completa).
+        """
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for nombre in set(self.fields) - set(fields):
+                self.fields.pop(nombre)
+
+    @classmethod
+    def columnas_necesarias(cls, fields):
+        """Columnas del modelo para .only() al serializar solo `fields`."""
+        columnas = {'id'}
+        for campo in fields:
+            columnas.update(cls.DEPENDENCIAS.get(campo, (campo,)))
+        return columnas
 
     # --- LÓGICA DE NEGOCIO ---
 
@@ -62,40 +156,31 @@ class ObraSerializer(serializers.ModelSerializer):
         Calcula viabilidad usando función centralizada de utils.
         Mantiene consistencia en toda la aplicación.
         """
-        from .utils import calcular_viabilidad_global
         return calcular_viabilidad_global(obj)
 
     def get_estatus_general(self, obj):
         """
         Calcula el estado real del proyecto usando función centralizada.
         """
-        from .utils import calcular_estatus_proyecto
         return calcular_estatus_proyecto(obj)
 
     # --- HELPERS ---
 
     def get_presupuesto_final(self, obj):
-        return obj.presupuesto_modificado if (obj.presupuesto_modificado or 0) > 0 else (obj.anteproyecto_total or 0)
+        return presupuesto_final(obj.presupuesto_modificado, obj.anteproyecto_total)
 
     def get_monto_ejecutado(self, obj):
         presupuesto = self.get_presupuesto_final(obj)
         return presupuesto * ((obj.avance_financiero_pct or 0) / 100.0)
 
     def get_semaforo(self, obj):
-        if (obj.riesgo_nivel or 0) >= 4: return "ROJO"
-        if (obj.avance_fisico_pct or 0) < 20 and (obj.urgencia or 0) >= 4: return "ROJO"
-        
-        sem_list = [obj.viabilidad_tecnica_semaforo, obj.viabilidad_presupuestal_semaforo]
-        # Safe upper check
-        sem_upper = [s.upper() for s in sem_list if s]
-        if "ROJO" in sem_upper: return "ROJO"
-        
-        if (obj.riesgo_nivel or 0) == 3: return "AMARILLO"
-        return "VERDE"
+        return semaforo_obra(
+            obj.riesgo_nivel, obj.avance_fisico_pct, obj.urgencia,
+            obj.viabilidad_tecnica_semaforo, obj.viabilidad_presupuestal_semaforo,
+        )
 
     def _to_text(self, valor):
-        textos = {1: "1 - Muy Bajo", 2: "2 - Bajo", 3: "3 - Regular", 4: "4 - Alto", 5: "5 - Muy Alto"}
-        return textos.get(valor, f"{valor} - Definido")
+        return texto_escala(valor)
 
     def get_urgencia(self, obj): return self._to_text(obj.urgencia)
     def get_impacto_social_nivel(self, obj): return self._to_text(obj.impacto_social_nivel)
@@ -105,34 +190,37 @@ class ObraSerializer(serializers.ModelSerializer):
 
     # --- NORMALIZACIÓN Y VALORES POR DEFECTO ---
     
+    # Campos que siempre van en MAYÚSCULAS (solo dependencias/áreas)
+    CAMPOS_MAYUSCULAS = (
+        'area_responsable',
+    )
+    
+    # Campos que deben capitalizarse normalmente
+    CAMPOS_A_CAPITALIZAR = (
+        'programa', 'eje_institucional',
+        'tipo_obra', 'tipo_recurso', 'fuente_financiamiento',
+        'alcance_territorial', 'etapa_desarrollo', 'estatus_general',
+        'responsable_operativo', 'contratista', 'alcaldias',
+        'ubicacion_especifica', 'impacto_social_desc', 'observaciones',
+        'problema_resuelve', 'solucion_ofrece', 'beneficiarios_directos',
+        'problemas_identificados', 'acciones_correctivas', 'riesgos',
+        'permisos_requeridos', 'estatus_permisos', 'multianualidad',
+        'hitos_comunicacionales', 'concentrado_programas', 'capitulo_gasto',
+        'unidad_medida',
+    )
+    
     def to_representation(self, instance):
         """
         Sobrescribe la representación para aplicar capitalización y valores por defecto
         a todos los campos de texto antes de serializarlos.
         """
-        data = super().to_representation(instance)
-        
-        # Campos que siempre van en MAYÚSCULAS (solo dependencias/áreas)
-        campos_mayusculas = [
-            'area_responsable'
-        ]
-        
-        # Campos que deben capitalizarse normalmente
-        campos_a_capitalizar = [
-            'programa', 'eje_institucional',
-            'tipo_obra', 'tipo_recurso', 'fuente_financiamiento',
-            'alcance_territorial', 'etapa_desarrollo', 'estatus_general',
-            'responsable_operativo', 'contratista', 'alcaldias',
-            'ubicacion_especifica', 'impacto_social_desc', 'observaciones',
-            'problema_resuelve', 'solucion_ofrece', 'beneficiarios_directos',
-            'problemas_identificados', 'acciones_correctivas', 'riesgos',
-            'permisos_requeridos', 'estatus_permisos', 'multianualidad',
-            'hitos_comunicacionales', 'concentrado_programas', 'capitulo_gasto',
-            'unidad_medida'
-        ]
-        
+        return self.normalizar_textos(super().to_representation(instance))
+
+    @staticmethod
+    def normalizar_textos(data, mayusculas=CAMPOS_MAYUSCULAS, a_capitalizar=CAMPOS_A_CAPITALIZAR):
+        """Valores por defecto, MAYÚSCULAS y capitalización de los campos de texto de `data`."""
         # Aplicar MAYÚSCULAS a campos específicos
-        for campo in campos_mayusculas:
+        for campo in mayusculas:
             if campo in data:
                 valor_actual = data[campo]
                 valor_con_default = obtener_valor_por_defecto(campo, valor_actual)
@@ -142,7 +230,7 @@ class ObraSerializer(serializers.ModelSerializer):
                     data[campo] = valor_con_default
         
         # Aplicar capitalización inteligente a otros campos
-        for campo in campos_a_capitalizar:
+        for campo in a_capitalizar:
             if campo in data:
                 valor_actual = data[campo]
                 # Primero obtener valor por defecto si está vacío
@@ -153,4 +241,99 @@ class ObraSerializer(serializers.ModelSerializer):
                 else:
                     data[campo] = valor_con_default
         
-        return data
\ No newline at end of file
+        return data
+
+
+class ObraSerializerRapido:
+    """
+    Serialización de solo lectura para listados: mismo JSON que ObraSerializer,
+    pero a partir de filas de values() y en una sola pasada por obra.
+
+    - Cada campo calculado se evalúa una vez por fila (la puntuación ponderada
+      sirve también para prioridad_label).
+    - Las columnas se convierten con la misma regla que el campo DRF
+      correspondiente (str/int/float/isoformat), sin pasar por Field.get_attribute().
+    - Solo lee las columnas que piden los campos (ObraSerializer.columnas_necesarias).
+    """
+
+    CONVERSIONES = {
+        serializers.CharField: str,
+        serializers.IntegerField: int,
+        serializers.FloatField: float,
+        serializers.DateField: lambda fecha: fecha if isinstance(fecha, str) else fecha.isoformat(),
+    }
+
+    def __init__(self, fields=None):
+        campos = ObraSerializer(fields=fields).fields
+        # (nombre, columna, conversión); columna None: campo calculado
+        self.plan = []
+        for nombre, campo in campos.items():
+            if isinstance(campo, serializers.SerializerMethodField):
+                self.plan.append((nombre, None, None))
+            else:
+                self.plan.append((nombre, campo.source, self.CONVERSIONES[type(campo)]))
+
+        self.calculados = {nombre for nombre, columna, _ in self.plan if columna is None}
+        self.columnas = sorted(ObraSerializer.columnas_necesarias(campos))
+        self.mayusculas = [c for c in ObraSerializer.CAMPOS_MAYUSCULAS if c in campos]
+        self.a_capitalizar = [c for c in ObraSerializer.CAMPOS_A_CAPITALIZAR if c in campos]
+
+    def filas(self, queryset):
+        """El queryset como filas de values() con las columnas necesarias."""
+        return queryset.values(*self.columnas)
+
+    def representar(self, filas):
+        """Lista de dicts (en el orden de campos de ObraSerializer) para `filas`."""
+        hoy = date.today()
+        return [self.representar_fila(fila, hoy) for fila in filas]
+
+    def representar_fila(self, fila, hoy):
+        valores = self._campos_calculados(fila, hoy) if self.calculados else None
+
+        data = {}
+        for nombre, columna, convertir in self.plan:
+            if columna is None:
+                data[nombre] = valores[nombre]
+            else:
+                valor = fila[columna]
+                data[nombre] = None if valor is None else convertir(valor)
+
+        return ObraSerializer.normalizar_textos(data, self.mayusculas, self.a_capitalizar)
+
+    def _campos_calculados(self, fila, hoy):
+        pedidos = self.calculados
+        valores = {}
+
+        if 'puntuacion_final_ponderada' in pedidos or 'prioridad_label' in pedidos:
+            puntuacion = calcular_puntuacion_ponderada(
+                *(fila[criterio] or 1 for criterio in ObraSerializer.CRITERIOS)
+            )
+            valores['puntuacion_final_ponderada'] = puntuacion
+            valores['prioridad_label'] = obtener_etiqueta_prioridad(puntuacion)
+
+        if 'viabilidad_global' in pedidos:
+            valores['viabilidad_global'] = viabilidad_por_semaforos(
+                *contar_semaforos(fila[campo] for campo in CAMPOS_SEMAFORO)
+            )
+
+        if 'estatus_general' in pedidos:
+            valores['estatus_general'] = estatus_proyecto(
+                fila['avance_fisico_pct'], fila['riesgo_nivel'], fila['fecha_inicio_real'], hoy
+            )
+
+        if 'semaforo' in pedidos:
+            valores['semaforo'] = semaforo_obra(
+                fila['riesgo_nivel'], fila['avance_fisico_pct'], fila['urgencia'],
+                fila['viabilidad_tecnica_semaforo'], fila['viabilidad_presupuestal_semaforo'],
+            )
+
+        if 'presupuesto_final' in pedidos or 'monto_ejecutado' in pedidos:
+            presupuesto = presupuesto_final(fila['presupuesto_modificado'], fila['anteproyecto_total'])
+            valores['presupuesto_final'] = presupuesto
+            if 'monto_ejecutado' in pedidos:
+                valores['monto_ejecutado'] = presupuesto * ((fila['avance_financiero_pct'] or 0) / 100.0)
+
+        for nombre in pedidos.intersection(ObraSerializer.CAMPOS_ESCALA):
+            valores[nombre] = texto_escala(fila[nombre])
+
+        return valores
@@ -1,71 +1,42 @@
 # backend/poa/services.py
-import unicodedata
 from typing import Dict, List, Any
-from decimal import Decimal
-from django.db.models import QuerySet
-from .models import Obra
-
-# Reglas de Negocio (Movidas desde src/lib/zones.ts)
-ZONA_MAPPING = {
-    'Zona Norte': ['Gustavo A. Madero', 'Azcapotzalco', 'Tláhuac', 'Milpa Alta'],
-    'Zona Sur': ['Coyoacán', 'Tlalpan', 'Xochimilco', 'La Magdalena Contreras'],
-    'Centro Histórico': ['Cuauhtémoc', 'Benito Juárez'],
-    'Zona Oriente': ['Iztapalapa', 'Iztacalco', 'Venustiano Carranza'],
-    'Zona Poniente': ['Miguel Hidalgo', 'Cuajimalpa de Morelos', 'Álvaro Obregón']
-}
-
-CITY_WIDE_KEYWORDS = ['todas', '16 alcaldias', 'ciudad completa']
-
-def normalize_text(text: str) -> str:
-    """Normalización optimizada para búsquedas."""
-    if not text: return ""
-    return ''.join(c for c in unicodedata.normalize('NFD', str(text).lower()) if unicodedata.category(c) != 'Mn')
+from datetime import date
+from django.db import transaction
+from django.db.models import QuerySet, Count, F, Sum
+from .models import Obra, ObraZona, VersionDatos
+from .utils import ZONAS, ZONA_SIN_ASIGNAR, calcular_estatus_proyecto
 
-def calculate_territorial_stats(queryset: QuerySet[Obra]) -> Dict[str, Any]:
-    # Inicialización de acumuladores con Sets para IDs únicos
-    stats = {zone: {
-        'project_ids': set(),  # Set para contar proyectos únicos
-        'budget': Decimal(0), 
-        'beneficiaries': 0
-    } for zone in ZONA_MAPPING}
-    stats['Sin Asignar'] = {'project_ids': set(), 'budget': Decimal(0), 'beneficiaries': 0}
-
-    # Iteración optimizada (en memoria es rápido en Python, idealmente esto sería SQL puro en Fase 3)
-    # Usamos .iterator() para no cargar todo en RAM si son muchos registros
-    for obra in queryset.iterator():
-        ubicacion = normalize_text(obra.ubicacion_especifica or "")
-        alcance = normalize_text(obra.alcance_territorial or "")
-        
-        # Regla de Negocio: Presupuesto Modificado manda sobre Anteproyecto
-        presupuesto = Decimal(obra.presupuesto_modificado if obra.presupuesto_modificado > 0 else obra.anteproyecto_total)
-        beneficiarios = obra.beneficiarios_num or 0
+# Reglas de Negocio (Movidas desde src/lib/zones.ts): el clasificador único
+# es utils.zonas_territoriales y su resultado vive en el puente ObraZona
 
-        matching_zones = []
+def estadisticas_por_zona(queryset: QuerySet[Obra]) -> Dict[str, Dict[str, Any]]:
+    """
+    Un solo GROUP BY zona sobre ObraZona (índice poa_zona_zona_idx).
 
-        # Detección de zonas
-        is_city_wide = any(kw in ubicacion or kw in alcance for kw in CITY_WIDE_KEYWORDS)
-        
-        if is_city_wide:
-            matching_zones = list(ZONA_MAPPING.keys())
-        else:
-            for zone_name, alcaldias in ZONA_MAPPING.items():
-                if any(normalize_text(alc) in ubicacion or normalize_text(alc) in alcance for alc in alcaldias):
-                    matching_zones.append(zone_name)
-        
-        # Prorrateo
-        if matching_zones:
-            divisor = len(matching_zones)
-            for zone in matching_zones:
-                stats[zone]['project_ids'].add(obra.id)  # Agregar ID único al set
-                stats[zone]['budget'] += presupuesto / divisor
-                stats[zone]['beneficiaries'] += beneficiarios / divisor
-        else:
-            stats['Sin Asignar']['project_ids'].add(obra.id)
-            stats['Sin Asignar']['budget'] += presupuesto
-            stats['Sin Asignar']['beneficiaries'] += beneficiarios
-
-    # Formateo para Frontend (DTO)
-    return _format_for_charts(stats)
+    El presupuesto y los beneficiarios se prorratean con el peso de cada fila
+    (1 / número de zonas de la obra), así la suma entre zonas es el total.
+
+    Returns:
+        dict: {zona: {'proyectos', 'budget', 'beneficiaries'}} para las 5 zonas
+        y ZONA_SIN_ASIGNAR, en ese orden
+    """
+    filas = ObraZona.objects.filter(obra__in=queryset.values('pk')).values('zona').annotate(
+        proyectos=Count('obra'),
+        budget=Sum(F('obra__presupuesto_efectivo') * F('peso')),
+        beneficiaries=Sum(F('obra__beneficiarios_num') * F('peso')),
+    )
+    stats = {zona: {'proyectos': 0, 'budget': 0.0, 'beneficiaries': 0.0} for zona in (*ZONAS, ZONA_SIN_ASIGNAR)}
+    for fila in filas:
+        stats[fila['zona']] = {
+            'proyectos': fila['proyectos'],
+            'budget': fila['budget'] or 0.0,
+            'beneficiaries': fila['beneficiaries'] or 0.0,
+        }
+    return stats
+
+def calculate_territorial_stats(queryset: QuerySet[Obra]) -> Dict[str, Any]:
+    """Estadísticas por zona para las gráficas de /v2/dashboard/territorial/."""
+    return _format_for_charts(estadisticas_por_zona(queryset))
 
 def _format_for_charts(stats: Dict) -> Dict[str, List[Dict]]:
     pie_data = []
@@ -75,13 +46,13 @@ def _format_for_charts(stats: Dict) -> Dict[str, List[Dict]]:
         if data['budget'] > 0:
             pie_data.append({"name": zone, "value": float(round(data['budget'], 2))})
         
-        if zone != 'Sin Asignar':
+        if zone != ZONA_SIN_ASIGNAR:
             # Nombre corto para UX móvil en eje X
             short_name = zone.replace('Zona ', '').replace('Centro Histórico', 'Centro')
             bar_data.append({
                 "name": short_name,
                 "fullName": zone,
-                "proyectos": len(data['project_ids']),  # Contar IDs únicos
+                "proyectos": data['proyectos'],  # Proyectos únicos (una fila por obra y zona)
                 "beneficiarios": int(data['beneficiaries'])
             })
             
@@ -89,111 +60,52 @@ def _format_for_charts(stats: Dict) -> Dict[str, List[Dict]]:
 
 
 # ==================== V2: OPTIMIZACIÓN SQL-FIRST ====================
-# Estrategia: Usar anotaciones Django para reducir queries y procesamiento Python
-# Beneficio: ~83% más rápido (800ms → 120ms) con datasets grandes (1000+ proyectos)
-
-from django.db.models import Q, F, Case, When, DecimalField, Sum, Count, Value
-from django.db.models.functions import Lower, Coalesce
 
 def calculate_territorial_stats_v2(queryset: QuerySet[Obra]) -> Dict[str, Any]:
     """
-    V2 Optimizada: Usa agregaciones SQL nativas de Django/Postgres.
-    
-    Mejoras vs V1:
-    - Single-pass sobre los datos (no múltiples iteraciones)
-    - Postgres hace el trabajo de matching con ILIKE (case-insensitive)
-    - Menos transferencia Python ↔ Database
-    - Caché-friendly: resultados agregados ocupan ~1KB vs ~500KB de V1
-    
-    Limitación conocida: Prorrateo aún se hace en Python (Fase 3: mover a Postgres con CTEs)
+    Compatibilidad con ?version=v2: V1 y V2 ya son la misma agregación SQL
+    sobre ObraZona (el prorrateo se calcula al importar, no por petición).
     """
-    from collections import defaultdict
-    
-    # Estructura optimizada para acumulación
-    zone_stats = defaultdict(lambda: {
-        'project_ids': set(),
-        'budget': Decimal(0),
-        'beneficiaries': 0
-    })
-    
-    # OPTIMIZACIÓN 1: Traer solo campos necesarios (reduce payload en ~70%)
-    obras_qs = queryset.only(
-        'id', 'ubicacion_especifica', 'alcance_territorial',
-        'presupuesto_modificado', 'anteproyecto_total', 'beneficiarios_num'
-    ).annotate(
-        # OPTIMIZACIÓN 2: Calcular presupuesto efectivo en SQL una sola vez
-        presupuesto_efectivo=Case(
-            When(presupuesto_modificado__gt=0, then=F('presupuesto_modificado')),
-            default=F('anteproyecto_total'),
-            output_field=DecimalField()
-        ),
-        # OPTIMIZACIÓN 3: Normalización básica en SQL (Postgres LOWER)
-        ubicacion_lower=Lower('ubicacion_especifica'),
-        alcance_lower=Lower('alcance_territorial')
-    )
-    
-    # OPTIMIZACIÓN 4: Bulk fetch con prefetch para reducir queries
-    # En lugar de N queries individuales, una sola
-    obras_data = list(obras_qs.values(
-        'id', 'ubicacion_lower', 'alcance_lower',
-        'presupuesto_efectivo', 'beneficiarios_num'
-    ))
-    
-    # Procesamiento en Python (aún necesario para lógica de prorrateo compleja)
-    for obra_dict in obras_data:
-        ubicacion_norm = normalize_text(obra_dict.get('ubicacion_lower') or '')
-        alcance_norm = normalize_text(obra_dict.get('alcance_lower') or '')
-        presupuesto = Decimal(str(obra_dict.get('presupuesto_efectivo') or 0))
-        beneficiarios = obra_dict.get('beneficiarios_num') or 0
-        obra_id = obra_dict['id']
-        
-        matching_zones = _find_matching_zones_optimized(ubicacion_norm, alcance_norm)
-        
-        # Prorrateo
-        if matching_zones:
-            divisor = len(matching_zones)
-            for zone_name in matching_zones:
-                zone_stats[zone_name]['project_ids'].add(obra_id)
-                zone_stats[zone_name]['budget'] += presupuesto / divisor
-                zone_stats[zone_name]['beneficiaries'] += beneficiarios / divisor
-        else:
-            zone_stats['Sin Asignar']['project_ids'].add(obra_id)
-            zone_stats['Sin Asignar']['budget'] += presupuesto
-            zone_stats['Sin Asignar']['beneficiaries'] += beneficiarios
-    
-    # Formateo final (reutilizamos _format_for_charts)
-    stats_dict = {
-        zone: {
-            'project_ids': data['project_ids'],
-            'budget': data['budget'],
-            'beneficiaries': data['beneficiaries']
-        }
-        for zone, data in zone_stats.items()
-    }
-    
-    return _format_for_charts(stats_dict)
+    return calculate_territorial_stats(queryset)
 
+# ==================== ESTATUS CALCULADO ====================
 
-def _find_matching_zones_optimized(ubicacion_norm: str, alcance_norm: str) -> List[str]:
+def recalcular_estatus(hoy: date = None, completo: bool = False) -> int:
     """
-    Versión optimizada del matching de zonas.
-    Pre-computa búsquedas para evitar múltiples normalizaciones.
+    Pone al día Obra.estatus_calculado para la fecha `hoy`.
+
+    Importación y Obra.save() guardan el estatus del día en que se escribe la
+    fila; la única regla que depende de la fecha es "retrasado"
+    (fecha_inicio_real <= hoy sin avance). Por eso, desde la última fecha
+    recalculada (VersionDatos.estatus_al) solo pueden cambiar las obras cuya
+    fecha_inicio_real cae en el intervalo (estatus_al, hoy]: son las únicas
+    que se leen. Sin fecha previa, con el reloj hacia atrás o con
+    completo=True se revisan todas.
+
+    Lo ejecuta el comando recalcular_estatus (cron diario). Las vistas no lo
+    llaman: escribe (bulk_update y VersionDatos) y una petición GET no debe
+    tomar el candado de escritura ni competir con otra por el mismo recálculo.
+
+    Returns:
+        int: obras cuyo estatus cambió
     """
-    # Caché estática para alcaldías normalizadas (se computa una sola vez)
-    if not hasattr(_find_matching_zones_optimized, '_alcaldias_cache'):
-        _find_matching_zones_optimized._alcaldias_cache = {
-            zone: [normalize_text(alc) for alc in alcaldias]
-            for zone, alcaldias in ZONA_MAPPING.items()
-        }
-    
-    # Detección de proyectos de toda la ciudad
-    if any(kw in ubicacion_norm or kw in alcance_norm for kw in CITY_WIDE_KEYWORDS):
-        return list(ZONA_MAPPING.keys())
-    
-    # Matching con alcaldías (usando caché)
-    matching = []
-    for zone_name, alcaldias_norm in _find_matching_zones_optimized._alcaldias_cache.items():
-        if any(alc in ubicacion_norm or alc in alcance_norm for alc in alcaldias_norm):
-            matching.append(zone_name)
-    
-    return matching
\ No newline at end of file
+    hoy = hoy or date.today()
+    desde = VersionDatos.actual().estatus_al
+    if desde == hoy and not completo:
+        return 0
+
+    obras = Obra.objects.only('id', 'avance_fisico_pct', 'riesgo_nivel', 'fecha_inicio_real', 'estatus_calculado')
+    if desde is not None and desde < hoy and not completo:
+        obras = obras.filter(fecha_inicio_real__gt=desde, fecha_inicio_real__lte=hoy)
+
+    with transaction.atomic():
+        cambiadas = []
+        for obra in obras.iterator(chunk_size=2000):
+            estatus = calcular_estatus_proyecto(obra, hoy)
+            if estatus != obra.estatus_calculado:
+                obra.estatus_calculado = estatus
+                cambiadas.append(obra)
+        # bulk_update no pasa por save(): la huella de importación se conserva
+        Obra.objects.bulk_update(cambiadas, ['estatus_calculado'], batch_size=500)
+        VersionDatos.registrar_estatus(hoy, bool(cambiadas))
+    return len(cambiadas)
@@ -0,0 +1,526 @@
+"""
+Tests de los endpoints de la API (poa/views.py) y sus servicios.
+
+Uso:
+    python manage.py test poa.tests_api
+"""
+
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from poa.models import Alcaldia, Obra, RiesgoIdentificado, VersionDatos
+from poa.serializers import ObraSerializer, ObraSerializerRapido
+from poa.services import calculate_territorial_stats, calculate_territorial_stats_v2, recalcular_estatus
+from poa.utils import (
+	calcular_estatus_proyecto, calcular_viabilidad_global, obtener_etiqueta_prioridad, resolver_alcaldias,
+)
+
+
+def leer_json(respuesta):
+	"""Cuerpo JSON de una respuesta normal o en partes (page_size=todos)."""
+	if respuesta.streaming:
+		return json.loads(b''.join(respuesta.streaming_content))
+	return respuesta.json()
+
+
+class TextosNormalizadosTest(TestCase):
+	"""Las columnas *_norm siguen al texto original y las consultas las usan."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.linea = Obra.objects.create(
+			programa='Construcción de la Línea de Conducción',
+			ubicacion_especifica='Álvaro Obregón',
+			alcance_territorial='Una Alcaldía',
+			alcaldias='ÁLVARO OBREGÓN',
+			presupuesto_modificado=100,
+		)
+		cls.parque = Obra.objects.create(
+			programa='Parque lineal',
+			ubicacion_especifica='Tláhuac',
+			alcaldias='Tláhuac',
+			presupuesto_modificado=50,
+		)
+
+	def test_save_llena_columnas(self):
+		self.assertEqual(self.linea.programa_norm, 'construccion de la linea de conduccion')
+		self.assertEqual(self.linea.alcaldias_norm, 'alvaro obregon')
+
+		self.parque.programa = 'Parque Ecológico'
+		self.parque.save(update_fields=['programa'])
+		self.parque.refresh_from_db()
+		self.assertEqual(self.parque.programa_norm, 'parque ecologico')
+		self.assertEqual(self.parque.ubicacion_norm, 'tlahuac')
+
+	def test_busqueda_ignora_acentos(self):
+		cliente = APIClient()
+		for termino in ('construccion', 'CONDUCCIÓN', 'obregon'):
+			respuesta = cliente.get('/api/v2/obras/filtered/', {'search': termino, 'page_size': 'todos'})
+			ids = [obra['id'] for obra in leer_json(respuesta)['results']]
+			self.assertEqual(ids, [self.linea.id], termino)
+
+	def test_api_no_expone_columnas_internas(self):
+		obra = APIClient().get(f'/api/obras/{self.linea.id}/').json()
+		for campo in ('huella', 'programa_norm', 'ubicacion_norm', 'alcance_norm', 'alcaldias_norm'):
+			self.assertNotIn(campo, obra)
+
+	def test_estadisticas_territoriales(self):
+		# Un solo clasificador (utils.zonas_territoriales) para todos los endpoints
+		for calcular in (calculate_territorial_stats, calculate_territorial_stats_v2):
+			barras = {z['fullName']: z['proyectos'] for z in calcular(Obra.objects.all())['bar_chart_data']}
+			self.assertEqual(barras['Zona Poniente'], 1)
+			self.assertEqual(barras['Zona Oriente'], 1)  # Tláhuac
+
+		territorios = APIClient().get('/api/v2/dashboard/territories/').json()['territories']
+		proyectos = {t['name']: t['projects'] for t in territorios}
+		self.assertEqual(proyectos['Zona Poniente'], 1)
+		self.assertEqual(proyectos['Zona Oriente'], 1)
+
+
+class CamposDerivadosTest(TestCase):
+	"""Las columnas de negocio siguen a sus campos de origen y los filtros las usan."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.critica = Obra.objects.create(
+			programa='Rehabilitación de colector', presupuesto_modificado=0, anteproyecto_total=80,
+			avance_financiero_pct=25, puntuacion_final_ponderada=4.6,
+			viabilidad_tecnica_semaforo='Rojo',
+		)
+		cls.media = Obra.objects.create(
+			programa='Pozo de absorción', presupuesto_modificado=100, anteproyecto_total=80,
+			puntuacion_final_ponderada=3.2,
+			viabilidad_juridica_semaforo='AMARILLO', viabilidad_temporal_semaforo='amarillo',
+		)
+		cls.viable = Obra.objects.create(
+			programa='Parque lineal', presupuesto_modificado=50, puntuacion_final_ponderada=3.9,
+			viabilidad_tecnica_semaforo='VERDE', viabilidad_presupuestal_semaforo='AMARILLO',
+		)
+
+	def test_save_llena_columnas(self):
+		for obra in (self.critica, self.media, self.viable):
+			obra.refresh_from_db()
+			self.assertEqual(obra.viabilidad_global, calcular_viabilidad_global(obra))
+			self.assertEqual(obra.prioridad_label, obtener_etiqueta_prioridad(obra.puntuacion_final_ponderada))
+		self.assertEqual(self.critica.presupuesto_efectivo, 80)
+		self.assertEqual(self.critica.monto_ejecutado, 20)
+		self.assertEqual(self.media.presupuesto_efectivo, 100)
+		self.assertEqual((self.media.semaforos_rojos, self.media.semaforos_amarillos), (0, 2))
+
+		# update_fields: solo se recalculan si cambió algún campo de origen
+		obra = Obra.objects.only('id', 'programa').get(pk=self.viable.pk)
+		obra.viabilidad_temporal_semaforo = 'Amarillo'
+		obra.save(update_fields=['viabilidad_temporal_semaforo'])
+		obra = Obra.objects.get(pk=self.viable.pk)
+		self.assertEqual(obra.viabilidad_global, 'media')
+		self.assertEqual(obra.presupuesto_efectivo, 50)
+
+	def test_filtro_viabilidad(self):
+		cliente = APIClient()
+		for filtro, esperados in [
+			('baja', {self.critica.id}),
+			('media', {self.media.id}),
+			('alta', {self.viable.id}),
+			('baja,media', {self.critica.id, self.media.id}),
+		]:
+			respuesta = cliente.get('/api/v2/obras/filtered/', {'viabilidad': filtro, 'page_size': 'todos'})
+			self.assertEqual({obra['id'] for obra in leer_json(respuesta)['results']}, esperados, filtro)
+
+	def test_proyectos_criticos_y_presupuesto(self):
+		cliente = APIClient()
+		criticos = cliente.get('/api/v2/dashboard/critical-projects/').json()['results']
+		self.assertEqual([obra['id'] for obra in criticos], [self.critica.id, self.media.id])
+
+		# page_size acotado: valores inválidos usan el default, los grandes se recortan
+		for page_size in ('todos', '0', 'x', '1000'):
+			respuesta = cliente.get('/api/v2/dashboard/critical-projects/', {'page_size': page_size})
+			self.assertEqual(respuesta.status_code, 200, page_size)
+		pagina = cliente.get('/api/v2/dashboard/critical-projects/', {'page_size': 1, 'page': 2}).json()
+		self.assertEqual((pagina['count'], [obra['id'] for obra in pagina['results']]), (2, [self.media.id]))
+
+		matriz = cliente.get('/api/v2/dashboard/risk-analysis/').json()['matrix']
+		self.assertEqual([p['id'] for p in matriz], [self.critica.id, self.media.id])
+		self.assertEqual(matriz[0]['prioridad_label'], 'critica')
+
+		kpis = cliente.get('/api/v2/dashboard/kpis/').json()
+		self.assertEqual(kpis['budget']['total'], 230)
+		self.assertEqual(kpis['budget']['executed'], 20)
+		self.assertEqual(kpis['priority_attention']['count'], 2)
+
+	def test_kpis_en_una_agregacion(self):
+		# Agregación, alcaldías distintas y detalle de críticos; la petición no
+		# recalcula el estatus (eso es del comando recalcular_estatus)
+		with self.assertNumQueries(3):
+			kpis = APIClient().get('/api/v2/dashboard/kpis/').json()
+		self.assertIsNone(VersionDatos.actual().estatus_al)
+
+		self.assertEqual(kpis['projects'], {'total': 3, 'active': 3, 'completed': 0})
+		self.assertEqual(kpis['progress']['average'], 0)
+		self.assertEqual(kpis['by_status'], [{'estatus_general': 'planificado', 'count': 3}])
+		self.assertEqual(
+			[p['id'] for p in kpis['priority_attention']['_debug']['critical_projects']],
+			[self.critica.id, self.media.id]
+		)
+
+	def test_analisis_de_riesgos_en_un_recorrido(self):
+		obra = Obra.objects.only('id').get(pk=self.media.pk)
+		obra.problemas_identificados = '1. Falta de permisos; - Lluvias | n/a'
+		obra.acciones_correctivas = 'Gestión con la alcaldía'
+		obra.save(update_fields=['problemas_identificados', 'acciones_correctivas'])
+		obra.refresh_from_db()
+		self.assertEqual(obra.riesgos_lista, ['Falta de permisos', 'Lluvias'])
+
+		# Recorrido de matriz y mitigaciones, y conteo por categorías
+		with self.assertNumQueries(2):
+			datos = APIClient().get('/api/v2/dashboard/risk-analysis/').json()
+
+		self.assertEqual([r['risk'] for r in datos['risks']], ['Falta de permisos', 'Lluvias'])
+		self.assertEqual([p['id'] for p in datos['mitigations']], [self.media.id])
+		self.assertEqual([c['count'] for c in datos['categories']], [1, 1, 1, 0, 0])
+
+
+class ZonasTerritorialesTest(TestCase):
+	"""El puente ObraZona sigue a los textos territoriales y respalda los endpoints."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.ciudad = Obra.objects.create(
+			programa='Balizamiento', alcaldias='16 Alcaldías', presupuesto_modificado=100,
+			beneficiarios_num=1000, avance_fisico_pct=50,
+		)
+		cls.dos = Obra.objects.create(
+			programa='Colector', alcaldias='Álvaro Obregón, Magdalena Contreras y Benito Juárez',
+			presupuesto_modificado=40, beneficiarios_num=10,
+		)
+		cls.sin_zona = Obra.objects.create(programa='Estudio', presupuesto_modificado=7)
+
+	def _zonas(self, obra):
+		return list(obra.zonas.order_by('zona').values_list('zona', 'peso', 'ciudad_completa'))
+
+	def test_save_clasifica(self):
+		self.assertEqual(len(self._zonas(self.ciudad)), 5)
+		self.assertEqual({peso for _, peso, ciudad in self._zonas(self.ciudad) if ciudad}, {0.2})
+		# La Magdalena Contreras también se reconoce sin el artículo
+		self.assertEqual(self._zonas(self.dos), [('Centro Histórico', 0.5, False), ('Zona Poniente', 0.5, False)])
+		self.assertEqual(self._zonas(self.sin_zona), [('Sin Asignar', 1.0, False)])
+
+		obra = Obra.objects.only('id').get(pk=self.sin_zona.pk)
+		obra.ubicacion_especifica = 'Mercado de Iztapalapa'
+		obra.save(update_fields=['ubicacion_especifica'])
+		self.assertEqual(self._zonas(self.sin_zona), [('Zona Oriente', 1.0, False)])
+
+	def test_endpoints_agrupan_el_puente(self):
+		cliente = APIClient()
+		with self.assertNumQueries(2):
+			datos = cliente.get('/api/v2/dashboard/territorial/').json()
+		pastel = {z['name']: z['value'] for z in datos['pie_chart_data']}
+		self.assertEqual(pastel, {
+			'Zona Norte': 20, 'Zona Sur': 20, 'Centro Histórico': 40, 'Zona Oriente': 20,
+			'Zona Poniente': 40, 'Sin Asignar': 7,
+		})
+		self.assertEqual(cliente.get('/api/v2/dashboard/territorial/', {'version': 'v2'}).json()['pie_chart_data'], datos['pie_chart_data'])
+
+		# Zonas y alcance territorial
+		with self.assertNumQueries(2):
+			datos = cliente.get('/api/v2/dashboard/territories/').json()
+		centro, por_asignar = datos['territories'][2], datos['territories'][5]
+		self.assertEqual((centro['name'], centro['projects'], centro['total_budget']), ('Centro Histórico', 2, 40))
+		self.assertEqual((centro['beneficiaries'], centro['avg_progress']), (205, 25))
+		self.assertEqual((por_asignar['name'], por_asignar['projects']), ('Por Asignar', 1))
+		self.assertEqual(datos['scope_breakdown'], {
+			'una_alcaldia': 0, 'multiples_alcaldias': 1, 'ciudad_completa': 1, 'sin_asignar': 1,
+		})
+
+
+class AlcaldiasCanonicasTest(TestCase):
+	"""ObraAlcaldia vincula el texto libre de alcaldías con el catálogo sembrado."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.colector = Obra.objects.create(
+			programa='Colector', alcaldias='Álvaro Obregón, Magdalena Contreras y Benito Juárez',
+		)
+		# Mal escrita: se resuelve por parecido
+		cls.pozo = Obra.objects.create(programa='Pozo', alcaldias='Iztapalpa')
+		cls.estudio = Obra.objects.create(programa='Estudio', alcaldias='Por determinar')
+
+	def _nombres(self, obra):
+		return list(obra.alcaldias_canonicas.values_list('nombre', flat=True))
+
+	def test_resolucion(self):
+		self.assertEqual(Alcaldia.objects.count(), 16)
+		self.assertEqual(resolver_alcaldias('milpa alta tlahuac y gam'), ('Milpa Alta', 'Tláhuac'))
+		self.assertEqual(len(resolver_alcaldias('16 alcaldias')), 16)
+
+		self.assertEqual(self._nombres(self.colector), ['Benito Juárez', 'Álvaro Obregón', 'La Magdalena Contreras'])
+		self.assertEqual(self._nombres(self.pozo), ['Iztapalapa'])
+		self.assertEqual(self._nombres(self.estudio), [])
+
+		obra = Obra.objects.only('id').get(pk=self.estudio.pk)
+		obra.alcaldias = 'Coyoacán'
+		obra.save(update_fields=['alcaldias'])
+		self.assertEqual(self._nombres(self.estudio), ['Coyoacán'])
+
+	def test_zonas_y_alcaldias_coinciden(self):
+		# La misma resolución (mal escrita incluida) para ObraAlcaldia y ObraZona
+		self.assertEqual(list(self.pozo.zonas.values_list('zona', flat=True)), ['Zona Oriente'])
+		self.assertEqual(list(self.estudio.zonas.values_list('zona', flat=True)), ['Sin Asignar'])
+		territorios = APIClient().get('/api/v2/dashboard/territories/').json()['territories']
+		self.assertEqual({t['name']: t['projects'] for t in territorios}['Zona Oriente'], 1)
+		por_alcaldia = APIClient().get('/api/v2/obras/filtered/', {'alcaldia': 'Iztapalapa'}).json()
+		self.assertEqual([o['id'] for o in por_alcaldia['results']], [self.pozo.id])
+
+		obra = Obra.objects.only('id').get(pk=self.estudio.pk)
+		obra.ubicacion_especifica = 'Deportivo Cuemanco, Xochimilcco'
+		obra.save(update_fields=['ubicacion_especifica'])
+		self.assertEqual(self._nombres(self.estudio), ['Xochimilco'])
+		self.assertEqual(list(self.estudio.zonas.values_list('zona', flat=True)), ['Zona Sur'])
+
+	def test_kpis_y_filtro_por_alcaldia(self):
+		zonas = APIClient().get('/api/v2/dashboard/kpis/').json()['zones']
+		self.assertEqual(zonas['total'], 4)
+		self.assertEqual(zonas['list'], ['Benito Juárez', 'Iztapalapa', 'La Magdalena Contreras', 'Álvaro Obregón'])
+
+		datos = leer_json(APIClient().get(
+			'/api/v2/obras/filtered/', {'alcaldia': 'iztapalapa,benito juarez', 'page_size': 'todos'}
+		))
+		self.assertEqual(sorted(o['id'] for o in datos['results']), [self.colector.id, self.pozo.id])
+
+
+class FrecuenciaRiesgosTest(TestCase):
+	"""RiesgoIdentificado sigue a problemas_identificados y respalda las frecuencias."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.colector = Obra.objects.create(
+			programa='Colector', area_responsable='DGOIV', puntuacion_final_ponderada=4.6,
+			problemas_identificados='1. Falta de permisos; 2. Lluvias',
+		)
+		cls.pozo = Obra.objects.create(
+			programa='Pozo', area_responsable='DGOIV', puntuacion_final_ponderada=2.0,
+			problemas_identificados='Falta de Permisos.',
+		)
+		cls.parque = Obra.objects.create(
+			programa='Parque', area_responsable='DGSUS', puntuacion_final_ponderada=2.0,
+			problemas_identificados='- falta de permisos | Sin problemas identificados',
+		)
+
+	def test_save_reemplaza_riesgos(self):
+		self.assertEqual(
+			list(self.colector.riesgos.order_by('orden').values_list('orden', 'descripcion', 'clave')),
+			[(1, 'Falta de permisos', 'falta de permisos'), (2, 'Lluvias', 'lluvias')]
+		)
+		# El texto por defecto no es un riesgo
+		self.assertEqual(list(self.parque.riesgos.values_list('clave', flat=True)), ['falta de permisos'])
+
+		obra = Obra.objects.only('id').get(pk=self.pozo.pk)
+		obra.problemas_identificados = 'Inundación'
+		obra.save(update_fields=['problemas_identificados'])
+		self.assertEqual(list(self.pozo.riesgos.values_list('clave', flat=True)), ['inundacion'])
+
+		# Otros campos no tocan los riesgos
+		obra.programa = 'Pozo de absorción'
+		with self.assertNumQueries(1):
+			obra.save(update_fields=['programa'])
+
+		self.colector.delete()
+		self.assertFalse(RiesgoIdentificado.objects.filter(obra_id=self.colector.pk).exists())
+
+	def test_frecuencias(self):
+		# Top de riesgos, desglose por dirección, por prioridad y totales
+		with self.assertNumQueries(4):
+			datos = APIClient().get('/api/v2/dashboard/risk-frequencies/', {'limit': 1}).json()
+
+		self.assertEqual(datos['summary'], {'total_mentions': 4, 'distinct_risks': 2, 'projects_with_risks': 3})
+		self.assertEqual(len(datos['risks']), 1)
+		riesgo = datos['risks'][0]
+		self.assertEqual((riesgo['key'], riesgo['projects'], riesgo['mentions']), ('falta de permisos', 3, 3))
+		self.assertEqual(riesgo['by_area'], [{'area': 'DGOIV', 'projects': 2}, {'area': 'DGSUS', 'projects': 1}])
+		self.assertEqual(riesgo['by_priority'], [{'prioridad': 'media', 'projects': 2}, {'prioridad': 'critica', 'projects': 1}])
+
+		# limit inválido usa el default
+		datos = APIClient().get('/api/v2/dashboard/risk-frequencies/', {'limit': 'x'}).json()
+		self.assertEqual([r['key'] for r in datos['risks']], ['falta de permisos', 'lluvias'])
+
+
+class EstatusCalculadoTest(TestCase):
+	"""estatus_calculado se guarda, se pone al día con la fecha y sirve filtros y conteos."""
+
+	@classmethod
+	def setUpTestData(cls):
+		hoy = date.today()
+		cls.futura = Obra.objects.create(programa='Inicia pronto', fecha_inicio_real=hoy + timedelta(days=3))
+		cls.retrasada = Obra.objects.create(programa='Sin avance', fecha_inicio_real=hoy - timedelta(days=10))
+		cls.en_curso = Obra.objects.create(programa='En curso', avance_fisico_pct=40)
+		cls.riesgosa = Obra.objects.create(programa='Riesgosa', riesgo_nivel=5, avance_fisico_pct=10)
+		cls.terminada = Obra.objects.create(programa='Terminada', avance_fisico_pct=100)
+
+	def test_save_guarda_estatus(self):
+		for obra in Obra.objects.all():
+			self.assertEqual(obra.estatus_calculado, calcular_estatus_proyecto(obra), obra.programa)
+
+		obra = Obra.objects.only('id').get(pk=self.retrasada.pk)
+		obra.avance_fisico_pct = 15
+		obra.save(update_fields=['avance_fisico_pct'])
+		self.assertEqual(Obra.objects.get(pk=obra.pk).estatus_calculado, 'en_ejecucion')
+
+	def test_recalculo_solo_revisa_la_ventana_de_fechas(self):
+		hoy = date.today()
+		self.assertEqual(recalcular_estatus(hoy), 0)
+		self.assertEqual(VersionDatos.actual().estatus_al, hoy)
+		version = VersionDatos.actual().version
+
+		# Estatus desactualizado fuera de la ventana: el recálculo diario no lo lee
+		Obra.objects.filter(pk=self.en_curso.pk).update(estatus_calculado='planificado')
+
+		self.assertEqual(recalcular_estatus(hoy + timedelta(days=3)), 1)
+		self.assertEqual(Obra.objects.get(pk=self.futura.pk).estatus_calculado, 'retrasado')
+		self.assertEqual(Obra.objects.get(pk=self.en_curso.pk).estatus_calculado, 'planificado')
+		self.assertEqual(VersionDatos.actual().version, version + 1)
+
+		# Mismo día: no hay nada que revisar
+		with self.assertNumQueries(1):
+			self.assertEqual(recalcular_estatus(hoy + timedelta(days=3)), 0)
+
+		# Reloj hacia atrás o recálculo completo: se revisan todas
+		self.assertEqual(recalcular_estatus(hoy, completo=True), 2)
+		self.assertEqual(Obra.objects.get(pk=self.futura.pk).estatus_calculado, 'planificado')
+		self.assertEqual(Obra.objects.get(pk=self.en_curso.pk).estatus_calculado, 'en_ejecucion')
+
+	def test_filtro_y_conteo_por_estatus(self):
+		cliente = APIClient()
+		for estatus, obra in [
+			('planificado', self.futura), ('retrasado', self.retrasada), ('en_ejecucion', self.en_curso),
+			('en_riesgo', self.riesgosa), ('Completado', self.terminada),
+		]:
+			respuesta = cliente.get('/api/v2/obras/filtered/', {'status': estatus, 'page_size': 'todos'})
+			self.assertEqual([o['id'] for o in leer_json(respuesta)['results']], [obra.id], estatus)
+
+		por_estatus = {
+			item['estatus_general']: item['count']
+			for item in cliente.get('/api/v2/dashboard/kpis/').json()['by_status']
+		}
+		self.assertEqual(por_estatus, dict.fromkeys(
+			['planificado', 'en_ejecucion', 'en_riesgo', 'retrasado', 'completado'], 1
+		))
+
+
+class CamposDispersosTest(TestCase):
+	"""?fields= limita los campos de la respuesta y las columnas leídas."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.obra = Obra.objects.create(
+			programa='rehabilitación de colector', presupuesto_modificado=0, anteproyecto_total=80,
+			avance_financiero_pct=25, puntuacion_final_ponderada=4.6, viabilidad_tecnica_semaforo='Rojo',
+			observaciones='Texto largo que los listados no necesitan',
+		)
+
+	def test_campos_pedidos(self):
+		cliente = APIClient()
+		completa = cliente.get(f'/api/obras/{self.obra.id}/').json()
+
+		obra = cliente.get(f'/api/obras/{self.obra.id}/', {'fields': 'programa,presupuesto_final'}).json()
+		self.assertEqual(obra, {campo: completa[campo] for campo in ('programa', 'presupuesto_final')})
+
+		for url in ('/api/obras/', '/api/v2/obras/filtered/', '/api/v2/dashboard/critical-projects/'):
+			respuesta = leer_json(cliente.get(url, {'fields': 'lista'}))
+			resultados = respuesta['results'] if isinstance(respuesta, dict) else respuesta
+			self.assertEqual(resultados, [{campo: completa[campo] for campo in ObraSerializer.CAMPOS_LISTA}], url)
+
+	def test_campo_desconocido(self):
+		respuesta = APIClient().get('/api/v2/obras/filtered/', {'fields': 'programa,no_existe'})
+		self.assertEqual(respuesta.status_code, 400)
+		self.assertIn('no_existe', respuesta.json()['fields'])
+
+	def test_consulta_solo_lee_columnas_necesarias(self):
+		with CaptureQueriesContext(connection) as consultas:
+			APIClient().get('/api/v2/obras/filtered/', {'fields': 'id,presupuesto_final'})
+		select = consultas.captured_queries[-1]['sql']
+		self.assertIn('"anteproyecto_total"', select)
+		self.assertNotIn('"observaciones"', select)
+		self.assertNotIn('"programa"', select)
+
+
+class SerializadorRapidoTest(TestCase):
+	"""ObraSerializerRapido produce el mismo JSON que ObraSerializer."""
+
+	@classmethod
+	def setUpTestData(cls):
+		Obra.objects.create(
+			programa='construcción de la línea 3 CDMX', area_responsable='dirección de obras',
+			presupuesto_modificado=120.5, avance_fisico_pct=35, avance_financiero_pct=20,
+			urgencia=5, riesgo_nivel=3, alineacion_estrategica=4,
+			viabilidad_tecnica_semaforo='rojo', viabilidad_juridica_semaforo='AMARILLO',
+			fecha_inicio_prog=date(2025, 3, 1), fecha_inicio_real=date(2025, 4, 15), duracion_meses=8,
+		)
+		Obra.objects.create(programa='', anteproyecto_total=0, observaciones=None)
+
+	def test_mismo_json(self):
+		renderer = JSONRenderer()
+		for campos in (None, list(ObraSerializer.CAMPOS_LISTA), ['riesgo_nivel', 'monto_ejecutado', 'id']):
+			drf = ObraSerializer(Obra.objects.order_by('id'), many=True, fields=campos).data
+			rapido = ObraSerializerRapido(campos)
+			filas = rapido.filas(Obra.objects.order_by('id'))
+			self.assertEqual(renderer.render(rapido.representar(filas)), renderer.render(drf), campos)
+
+
+class FragmentosJSONTest(TestCase):
+	"""Los listados reutilizan el JSON de cada obra mientras su huella no cambie."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.obra = Obra.objects.create(programa='colector pluvial', avance_fisico_pct=10)
+		cls.otra = Obra.objects.create(programa='pozo de absorción', avance_fisico_pct=60)
+		# Filas como las deja la importación
+		Obra.objects.filter(pk=cls.obra.pk).update(huella='a' * 64)
+		Obra.objects.filter(pk=cls.otra.pk).update(huella='b' * 64)
+
+	def setUp(self):
+		caches['obras_json'].clear()
+		self.cliente = APIClient()
+
+	def listar(self):
+		return leer_json(self.cliente.get('/api/v2/obras/filtered/', {'page_size': 'todos', 'ordering': 'avance_fisico_pct'}))
+
+	def test_reutiliza_fragmentos(self):
+		primera = self.listar()
+		with CaptureQueriesContext(connection) as consultas:
+			segunda = self.listar()
+		self.assertEqual(segunda['results'], primera['results'])
+		# Conteo y (id, huella): ninguna obra se vuelve a leer
+		self.assertFalse(any('"programa"' in c['sql'] for c in consultas.captured_queries))
+
+		esperado = ObraSerializer(Obra.objects.order_by('avance_fisico_pct'), many=True).data
+		self.assertEqual(segunda['results'], json.loads(JSONRenderer().render(esperado)))
+
+	def test_respuesta_en_partes(self):
+		paginada = self.cliente.get('/api/v2/obras/filtered/', {'page_size': 100, 'ordering': 'avance_fisico_pct'})
+		with mock.patch('poa.fragmentos.TAMANO_LOTE', 1):
+			respuesta = self.cliente.get('/api/v2/obras/filtered/', {'page_size': 'todos', 'ordering': 'avance_fisico_pct'})
+			partes = list(respuesta.streaming_content)
+		self.assertGreater(len(partes), 4)
+		cuerpo = json.loads(b''.join(partes))
+		self.assertEqual(cuerpo['results'], paginada.json()['results'])
+		self.assertEqual(cuerpo['_meta']['total_count'], 2)
+
+		# La API navegable y /api/obras/ sin paginación
+		self.assertFalse(self.cliente.get('/api/v2/obras/filtered/?page_size=todos&format=api').streaming)
+		self.assertEqual(len(leer_json(self.cliente.get('/api/obras/'))), 2)
+
+	def test_edicion_e_importacion_invalidan(self):
+		self.listar()
+		self.cliente.patch(f'/api/obras/{self.obra.id}/', {'programa': 'colector editado'}, format='json')
+		self.assertEqual(self.listar()['results'][0]['programa'], 'Colector Editado')
+
+		# La importación reescribe la fila con otra huella
+		Obra.objects.filter(pk=self.otra.pk).update(programa='pozo importado', huella='c' * 64)
+		self.assertEqual(self.listar()['results'][1]['programa'], 'Pozo Importado')
@@ -0,0 +1,666 @@
+"""
+Tests del pipeline de importación (poa/importacion).
+
+Uso:
+    python manage.py test poa.tests_importacion
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from unittest import mock
+
+import pandas as pd
+from openpyxl import Workbook
+from django.core.management import call_command
+from django.db import connection, models
+from django.test import SimpleTestCase, TransactionTestCase
+
+from poa.importacion import (
+	leer_completo, leer_por_bloques, limpiar_fila, limpiar_bloque,
+	huella_registro, planificar_cambios, agrupar_guardadas, planificar_bloque, filas_sobrantes,
+)
+from poa.importacion import fechas
+from poa.importacion import cache as cache_hojas
+from poa.importacion import perfil as perfil_importacion
+from poa.importacion.paralelo import limpiar_con_huella, limpiar_en_paralelo
+from poa.importacion.vigilancia import Vigilante
+from poa.importacion.intercambio import TABLA_NUEVA, TABLA_ANTERIOR, carga_masiva, _indice_temporal
+from poa.models import Obra, ObraAlcaldia, ObraZona, RiesgoIdentificado, VersionDatos
+from poa.utils import (
+	CATALOGO_ESCALAS,
+	clean_money, clean_money_series,
+	clean_percentage, clean_percentage_series,
+	interpretar_escala_flexible, interpretar_escala_series,
+	clean_beneficiarios_advanced, clean_beneficiarios_series,
+	capitalizar_texto, normalizar_texto,
+)
+
+# Celdas representativas (incluye casos límite de tipos y formatos)
+CORPUS = [
+	None, float('nan'), float('inf'), -float('inf'), True, False, 0, 1, 3, 7, -2,
+	0.5, 1.0, 2.5, 3.5, 4.6, 7.0, 1990.6, 1234567.891, 0.125, 2.675, 1e15,
+	'', ' ', 'nan', 'NA', 'N/A', '-', '0', '1', '5', '4.6', '1_000', '1e3',
+	'$ 1,990.6', '$1,234,567.89', '(500)', '12%', '45.5 %', '0.85', '100',
+	'5 - Muy alto', '3 - Regular', 'Muy alto', 'muy bajo', 'Alto', 'Media',
+	'Crítico', 'baja', '2-3', 'nivel 4', 'sin dato',
+	'15 mil habitantes', '1.5 millones', '2 millones de personas', 'Toda la alcaldía',
+	'3,500 personas', '120 familias', 'aprox. 800', '10 mil', 'Población general',
+	'2 Millones', 'Entre 200 y 300', '99999999999999999999',
+]
+
+
+def _fila_ejemplo(n):
+	"""Fila cruda con el layout de 67 columnas del POA."""
+	fila = [None] * 67
+	fila[0] = n
+	fila[1] = f'construcción de obra {n}'
+	fila[2] = 'dirección de obras'
+	fila[8] = 1990.6 + n
+	fila[16] = 'Iztapalapa' if n % 2 else None
+	fila[21] = '5 - Muy alto'
+	fila[22] = n % 5 + 1
+	fila[26] = 'NA' if n % 3 == 0 else '3 - Regular'
+	fila[29] = 'rojo' if n % 4 == 0 else 'verde'
+	fila[34] = 'Iztapalapa' if n % 2 else None
+	fila[36] = f'{n} mil habitantes'
+	fila[38] = '28 de noviembre de 2025' if n % 2 else datetime(2026, 1, n % 28 + 1)
+	fila[43] = 0.5
+	fila[52] = '1. Falta de permisos; 2. Lluvias' if n % 3 == 0 else None
+	return fila
+
+
+class LectoresTest(SimpleTestCase):
+	"""La lectura por bloques debe entregar las mismas celdas que la lectura completa."""
+
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.tmpdir = tempfile.mkdtemp()
+		cls.xlsx_path = os.path.join(cls.tmpdir, 'datos.xlsx')
+
+		libro = Workbook()
+		hoja = libro.active
+		hoja.append([f'COL {i}' for i in range(67)])
+		for n in range(1, 24):
+			hoja.append(_fila_ejemplo(n))
+		hoja.append([None] * 67)  # Fila vacía intermedia
+		hoja.append(_fila_ejemplo(24))
+		libro.save(cls.xlsx_path)
+
+		cls.csv_path = os.path.join(cls.tmpdir, 'datos.csv')
+		pd.read_excel(cls.xlsx_path, header=None).to_csv(cls.csv_path, header=False, index=False)
+
+	@classmethod
+	def tearDownClass(cls):
+		shutil.rmtree(cls.tmpdir)
+		super().tearDownClass()
+
+	def _comparar(self, ruta, tipo):
+		completo = leer_completo(ruta, tipo).iloc[1:]
+		bloques = list(leer_por_bloques(ruta, tipo, tamano_bloque=5))
+
+		self.assertEqual(sum(len(b) for b in bloques), len(completo))
+		self.assertTrue(all(len(b) <= 5 for b in bloques))
+
+		filas_bloques = [fila for b in bloques for _, fila in b.iterrows()]
+		for (_, esperada), obtenida in zip(completo.iterrows(), filas_bloques):
+			self.assertEqual(esperada.name, obtenida.name)
+			self.assertEqual(repr(limpiar_fila(esperada)), repr(limpiar_fila(obtenida)))
+
+	def test_bloques_excel_igual_a_lectura_completa(self):
+		self._comparar(self.xlsx_path, 'xlsx')
+
+	def test_bloques_csv_igual_a_lectura_completa(self):
+		self._comparar(self.csv_path, 'csv')
+
+
+class CacheHojaTest(SimpleTestCase):
+	"""La hoja cargada desde caché es idéntica a la leída del archivo."""
+
+	def setUp(self):
+		self.tmpdir = tempfile.mkdtemp()
+		self.ruta = os.path.join(self.tmpdir, 'datos.xlsx')
+		libro = Workbook()
+		hoja = libro.active
+		hoja.append([f'COL {i}' for i in range(67)])
+		for n in range(1, 16):
+			fila = _fila_ejemplo(n)
+			fila[40] = n % 2 == 0        # bool
+			fila[41] = 'ñandú\u00e9 ' * n  # texto no ASCII
+			hoja.append(fila)
+		libro.save(self.ruta)
+
+	def tearDown(self):
+		shutil.rmtree(self.tmpdir)
+
+	def _assert_iguales(self, a, b):
+		self.assertEqual(list(a.columns), list(b.columns))
+		self.assertEqual(list(a.dtypes), list(b.dtypes))
+		for columna in a.columns:
+			self.assertEqual(
+				[(type(v), repr(v)) for v in a[columna].tolist()],
+				[(type(v), repr(v)) for v in b[columna].tolist()]
+			)
+
+	def test_segunda_lectura_desde_cache(self):
+		original, desde_cache = cache_hojas.leer_con_cache(self.ruta, 'xlsx')
+		self.assertFalse(desde_cache)
+
+		with mock.patch.object(cache_hojas, 'leer_completo', side_effect=AssertionError('no debe leer el Excel')):
+			cacheado, desde_cache = cache_hojas.leer_con_cache(self.ruta, 'xlsx')
+		self.assertTrue(desde_cache)
+		self._assert_iguales(original, cacheado)
+		self.assertEqual(
+			repr(limpiar_bloque(original.iloc[1:])),
+			repr(limpiar_bloque(cacheado.iloc[1:]))
+		)
+
+	def test_refrescar_y_archivo_modificado(self):
+		cache_hojas.leer_con_cache(self.ruta, 'xlsx')
+		_, desde_cache = cache_hojas.leer_con_cache(self.ruta, 'xlsx', refrescar=True)
+		self.assertFalse(desde_cache)
+
+		with open(self.ruta, 'ab') as archivo:
+			archivo.write(b'\0')  # Cambia el hash sin invalidar el zip
+		_, desde_cache = cache_hojas.leer_con_cache(self.ruta, 'xlsx')
+		self.assertFalse(desde_cache)
+		self.assertEqual(len(os.listdir(os.path.join(self.tmpdir, '.cache'))), 1)
+
+
+class LimpiezaVectorizadaTest(SimpleTestCase):
+	"""Los limpiadores por columna deben coincidir exactamente con los escalares."""
+
+	def _comparar(self, vectorizada, escalar):
+		validos = []
+		for valor in CORPUS:
+			try:
+				escalar(valor)
+			except Exception as e:
+				# Si el escalar falla, la columna también debe fallar con el mismo error
+				with self.assertRaises(type(e), msg=f'valor={valor!r}'):
+					vectorizada(pd.Series([valor], dtype=object))
+			else:
+				validos.append(valor)
+
+		obtenidos = vectorizada(pd.Series(validos, dtype=object)).tolist()
+		for valor, obtenido in zip(validos, obtenidos):
+			self.assertEqual(repr(escalar(valor)), repr(obtenido), f'valor={valor!r}')
+
+	def test_dinero_mdp(self):
+		self._comparar(lambda s: clean_money_series(s, es_mdp=True), lambda v: clean_money(v, es_mdp=True))
+
+	def test_dinero_sin_escala(self):
+		self._comparar(lambda s: clean_money_series(s, es_mdp=False), lambda v: clean_money(v, es_mdp=False))
+
+	def test_porcentaje(self):
+		self._comparar(clean_percentage_series, clean_percentage)
+
+	def test_escala(self):
+		self._comparar(interpretar_escala_series, interpretar_escala_flexible)
+
+	def test_escala_coincidencia_mas_larga(self):
+		"""La clave más larga del catálogo gana sin importar su orden."""
+		for texto, esperado in [
+			('Muy alto', 5), ('muy alta (estimado)', 5), ('MUY_ALTO', 5), ('Alto', 4),
+			('muy bajo', 1), ('Bajo', 2), ('nivel 5 - muy alto', 5), ('Crítica', 5), ('sin dato', 1),
+		]:
+			self.assertEqual(interpretar_escala_flexible(texto), esperado, texto)
+		for clave, numero in CATALOGO_ESCALAS.items():
+			self.assertEqual(interpretar_escala_flexible(clave), numero, clave)
+
+	def test_textos(self):
+		"""Rutas rápidas de normalizar_texto y capitalizar_texto memorizado."""
+		for texto, esperado in [
+			('Línea de Conducción', 'linea de conduccion'), ('ÑOÑO', 'nono'), ('Pingüino', 'pinguino'),
+			('plain ascii', 'plain ascii'), ('Ærø Straße', 'ærø straße'), ('e\u0301', 'e'), (None, ''),
+		]:
+			self.assertEqual(normalizar_texto(texto), esperado, texto)
+		self.assertEqual(capitalizar_texto('  sistema de agua potable cdmx '), 'Sistema de Agua Potable CDMX')
+		self.assertEqual(capitalizar_texto('sistema de agua potable cdmx'), 'Sistema de Agua Potable CDMX')
+		self.assertEqual(capitalizar_texto('obra brt', siglas={'OBRA'}), 'OBRA Brt')
+		self.assertIsNone(capitalizar_texto('   '))
+
+	def test_beneficiarios(self):
+		self._comparar(clean_beneficiarios_series, clean_beneficiarios_advanced)
+
+	def test_columnas_numericas(self):
+		"""Columnas con dtype numérico (lectura completa) toman la ruta rápida."""
+		for serie in (pd.Series([1.0, 2.5, float('nan'), 4.6]), pd.Series([1, 3, 9])):
+			self.assertEqual(
+				repr(interpretar_escala_series(serie).tolist()),
+				repr([interpretar_escala_flexible(v) for v in serie.tolist()])
+			)
+			self.assertEqual(
+				repr(clean_money_series(serie).tolist()),
+				repr([clean_money(v) for v in serie.tolist()])
+			)
+
+	def test_bloque_igual_a_filas(self):
+		df = pd.DataFrame([_fila_ejemplo(n) for n in range(1, 40)], index=range(1, 40))
+		registros, errores = limpiar_bloque(df)
+
+		self.assertEqual(errores, [])
+		esperados = [limpiar_fila(fila) for _, fila in df.iterrows()]
+		self.assertEqual(repr(esperados), repr(registros))
+
+
+class FechasTest(SimpleTestCase):
+	"""Motor de fechas: casos de validate_sprint3_dates.py y estadísticas de caché."""
+
+	CASOS = [
+		('2026-01-15', date(2026, 1, 15)),
+		('15/01/2026', date(2026, 1, 15)),
+		('15-01-2026', date(2026, 1, 15)),
+		('2026/01/15', date(2026, 1, 15)),
+		('abril 2026', date(2026, 4, 1)),
+		('28 de noviembre de 2025', date(2025, 11, 28)),
+		(45292, date(2024, 1, 1)),
+		(45292.0, date(2024, 1, 1)),
+		('', None),
+		(None, None),
+		# Inglés, abreviaturas y años de 2 dígitos
+		('Sept 25', date(2025, 9, 1)),
+		('dec 2024', date(2024, 12, 1)),
+		('3 de diciembre de 2024', date(2024, 12, 3)),
+		('31 de febrero de 2025', date(2025, 2, 1)),
+		(datetime(2026, 3, 4, 10, 30), date(2026, 3, 4)),
+		('Por definir', None),
+	]
+
+	def test_casos(self):
+		for valor, esperado in self.CASOS:
+			self.assertEqual(fechas.parse_date(valor), esperado, f'valor={valor!r}')
+
+	def test_primer_mes_del_diccionario(self):
+		"""Con varios meses en el texto gana el primero de MESES, no el primero del texto."""
+		self.assertEqual(fechas.parse_date('mayo 2026 - enero 2027'), date(2027, 1, 1))
+
+	def test_estadisticas_cache(self):
+		fechas.reiniciar_estadisticas(vaciar_cache=True)
+		resultado = fechas.parsear_fechas(['abril 2026'] * 9 + ['mayo 2026', None])
+
+		self.assertEqual(resultado[0], date(2026, 4, 1))
+		stats = fechas.estadisticas()
+		self.assertEqual(stats['valores'], 11)
+		self.assertEqual((stats['aciertos_cache'], stats['fallos_cache']), (8, 2))
+		self.assertAlmostEqual(stats['tasa_aciertos'], 0.8)
+
+
+class PerfilTest(SimpleTestCase):
+	"""Conteo de valores no interpretables por limpiador."""
+
+	def test_no_interpretables(self):
+		contar = perfil_importacion.contar_no_interpretables
+		self.assertEqual(contar('parse_date', ['Por definir', None, '2025-01-01'], [None, None, date(2025, 1, 1)]), 1)
+		self.assertEqual(contar('clean_money', ['N/A', '0', '', '$ 10'], [0.0, 0.0, 0.0, 10.0]), 1)
+		self.assertEqual(contar('interpretar_escala', ['Muy bajo', 'xyz', '1', float('nan')], [1, 1, 1, 1]), 1)
+		self.assertEqual(contar('clean_semaphore', ['gris', 'ROJO'], [None, 'ROJO']), 1)
+
+
+class LimpiezaParalelaTest(SimpleTestCase):
+	"""El resultado no depende del número de procesos."""
+
+	def test_determinista(self):
+		filas = [_fila_ejemplo(n) for n in range(1, 30)]
+		filas[6][22] = float('inf')   # Escala inválida: la fila se descarta
+		filas[20][23] = float('-inf')
+		df = pd.DataFrame(filas, index=range(1, 30))
+
+		esperado = limpiar_con_huella(df)
+		self.assertEqual([(fila, id_excel) for fila, id_excel, _ in esperado[1]], [(7, 7), (21, 21)])
+
+		with ProcessPoolExecutor(2) as executor:
+			for workers in (2, 3, 7):
+				self.assertEqual(repr(limpiar_en_paralelo(df, executor, workers)), repr(esperado))
+
+
+class PlanIncrementalTest(SimpleTestCase):
+	"""El plan incremental solo toca las filas que cambiaron."""
+
+	def _registro(self, id_excel, programa):
+		datos = {'id_excel': id_excel, 'programa': programa}
+		datos['huella'] = huella_registro(datos)
+		return datos
+
+	def test_huella_estable(self):
+		a = {'id_excel': 1, 'fecha': datetime(2025, 1, 1).date(), 'monto': 1.5}
+		b = {'monto': 1.5, 'fecha': datetime(2025, 1, 1).date(), 'id_excel': 1}
+		self.assertEqual(huella_registro(a), huella_registro(b))
+		self.assertEqual(len(huella_registro(a)), 64)
+		self.assertNotEqual(huella_registro(a), huella_registro({**a, 'monto': 1.6}))
+
+	def test_altas_bajas_cambios(self):
+		archivo = [self._registro(1, 'A'), self._registro(2, 'B modificado'), self._registro(4, 'D')]
+		existentes = [
+			(10, 1, self._registro(1, 'A')['huella']),
+			(11, 2, self._registro(2, 'B')['huella']),
+			(12, 3, self._registro(3, 'C')['huella']),
+		]
+		plan = planificar_cambios(archivo, existentes)
+
+		self.assertEqual(plan['sin_cambios'], 1)
+		self.assertEqual([(pk, d['programa']) for pk, d in plan['actualizar']], [(11, 'B modificado')])
+		self.assertEqual([d['programa'] for d in plan['insertar']], ['D'])
+		self.assertEqual(plan['eliminar'], [12])
+
+	def test_id_excel_duplicado(self):
+		"""Con ids repetidos, las filas idénticas se conservan aunque cambie su orden."""
+		archivo = [self._registro(8, 'Nueva'), self._registro(8, 'Segunda'), self._registro(8, 'Primera')]
+		existentes = [
+			(20, 8, self._registro(8, 'Primera')['huella']),
+			(21, 8, self._registro(8, 'Segunda')['huella']),
+		]
+		plan = planificar_cambios(archivo, existentes)
+
+		self.assertEqual(plan['sin_cambios'], 2)
+		self.assertEqual(plan['actualizar'], [])
+		self.assertEqual([d['programa'] for d in plan['insertar']], ['Nueva'])
+		self.assertEqual(plan['eliminar'], [])
+
+	def test_plan_por_bloques(self):
+		"""Las filas guardadas que un bloque no empareja siguen libres para los siguientes."""
+		existentes = [
+			(20, 8, self._registro(8, 'Primera')['huella']),
+			(21, 8, self._registro(8, 'Segunda')['huella']),
+			(22, 9, self._registro(9, 'Quitada')['huella']),
+		]
+		guardadas = agrupar_guardadas(existentes)
+		primero = planificar_bloque([self._registro(8, 'Segunda')], guardadas)
+		segundo = planificar_bloque([self._registro(8, 'Primera'), self._registro(10, 'Nueva')], guardadas)
+
+		self.assertEqual((primero['sin_cambios'], segundo['sin_cambios']), (1, 1))
+		self.assertEqual(primero['actualizar'] + segundo['actualizar'], [])
+		self.assertEqual([d['programa'] for d in segundo['insertar']], ['Nueva'])
+		self.assertEqual(filas_sobrantes(guardadas), [22])
+
+	def test_id_vacio(self):
+		"""NaN en el archivo coincide con NULL en la tabla."""
+		fila = self._registro(float('nan'), 'Sin id')
+		plan = planificar_cambios([fila], [(5, None, fila['huella'])])
+		self.assertEqual(plan['sin_cambios'], 1)
+
+
+class VigilanteTest(SimpleTestCase):
+	"""El archivo se entrega una sola vez, cuando deja de cambiar."""
+
+	def setUp(self):
+		self.tmpdir = tempfile.mkdtemp()
+		self.ruta = os.path.join(self.tmpdir, 'datos.csv')
+		self.ahora = 0.0
+		self.vigilante = Vigilante(self.tmpdir, espera=2.0, reloj=lambda: self.ahora)
+
+	def tearDown(self):
+		shutil.rmtree(self.tmpdir)
+
+	def _escribir(self, texto, mtime):
+		with open(self.ruta, 'w', encoding='utf-8') as archivo:
+			archivo.write(texto)
+		os.utime(self.ruta, (mtime, mtime))
+
+	def test_sin_archivo(self):
+		self.assertIsNone(self.vigilante.revisar())
+
+	def test_antirrebote(self):
+		self._escribir('a', 100)
+		self.assertIsNone(self.vigilante.revisar())
+		self.ahora = 1.5
+		self._escribir('ab', 101)  # Sigue escribiéndose: reinicia la espera
+		self.assertIsNone(self.vigilante.revisar())
+		self.ahora = 3.0
+		self.assertIsNone(self.vigilante.revisar())
+		self.ahora = 3.5
+		self.assertEqual(self.vigilante.revisar(), (self.ruta, 'csv'))
+
+		# Ya entregado: no se repite mientras no cambie
+		self.ahora = 10.0
+		self.assertIsNone(self.vigilante.revisar())
+		self._escribir('abc', 102)
+		self.assertIsNone(self.vigilante.revisar())
+		self.ahora = 12.0
+		self.assertEqual(self.vigilante.revisar(), (self.ruta, 'csv'))
+
+
+class ImportacionConIntercambioTest(TransactionTestCase):
+	"""La importación completa carga en la tabla espejo y la activa al final."""
+
+	def setUp(self):
+		self.tmpdir = tempfile.mkdtemp()
+		os.mkdir(os.path.join(self.tmpdir, 'data'))
+		libro = Workbook()
+		hoja = libro.active
+		hoja.append([f'COL {i}' for i in range(67)])
+		for n in range(1, 13):
+			hoja.append(_fila_ejemplo(n))
+		libro.save(os.path.join(self.tmpdir, 'data', 'datos.xlsx'))
+
+		self.cwd = os.getcwd()
+		os.chdir(self.tmpdir)
+
+	def tearDown(self):
+		os.chdir(self.cwd)
+		shutil.rmtree(self.tmpdir)
+
+	def _importar(self, *args):
+		call_command('importar_excel', *args, stdout=io.StringIO())
+
+	def _tablas(self):
+		with connection.cursor() as cursor:
+			return set(connection.introspection.table_names(cursor))
+
+	def _indices(self):
+		with connection.cursor() as cursor:
+			restricciones = connection.introspection.get_constraints(cursor, Obra._meta.db_table)
+		return {nombre for nombre, info in restricciones.items() if info['index']}
+
+	def test_intercambio_conserva_indices(self):
+		self._importar()
+		self._importar('--streaming', '--chunk-size', '5')
+
+		self.assertEqual(Obra.objects.count(), 12)
+		self.assertNotIn(TABLA_NUEVA, self._tablas())
+		self.assertNotIn(TABLA_ANTERIOR, self._tablas())
+		self.assertTrue({indice.name for indice in Obra._meta.indexes} <= self._indices())
+
+	def test_nombres_temporales_de_indices(self):
+		"""Dos índices que comparten sus primeros 27 caracteres no chocan en la tabla espejo."""
+		indices = [
+			models.Index(fields=['programa_norm'], name='poa_obra_programa_norm_alcance_idx'),
+			models.Index(fields=['programa_norm'], name='poa_obra_programa_norm_alcaldia_idx'),
+			*Obra._meta.indexes,
+		]
+		temporales = [_indice_temporal(indice).name for indice in indices]
+		self.assertEqual(len(set(temporales)), len(indices))
+		self.assertTrue(all(len(nombre) <= 30 for nombre in temporales))
+
+	def test_perfil_json(self):
+		ruta = os.path.join(self.tmpdir, 'perfil.json')
+		self._importar('--streaming', '--chunk-size', '5', '--profile', ruta)
+
+		with open(ruta, encoding='utf-8') as archivo:
+			perfil = json.load(archivo)
+		self.assertEqual(perfil['modo'], 'streaming')
+		self.assertEqual(perfil['filas']['procesadas'], 12)
+		self.assertEqual(perfil['etapas']['lectura']['llamadas'], 4)  # 3 bloques + fin
+		for etapa in ('limpieza', 'construccion_modelos', 'escritura_bd', 'indices', 'intercambio'):
+			self.assertIn(etapa, perfil['etapas'])
+		self.assertEqual(perfil['columnas']['fecha_inicio_prog']['valores'], 12)
+		self.assertEqual(perfil['columnas']['fecha_inicio_prog']['limpiador'], 'parse_date')
+
+	def test_falla_no_toca_tabla_activa(self):
+		self._importar()
+		ids = list(Obra.objects.values_list('id', flat=True))
+
+		with mock.patch(
+			'poa.management.commands.importar_excel.limpiar_con_huella',
+			side_effect=RuntimeError('archivo corrupto')
+		):
+			with self.assertRaises(RuntimeError):
+				self._importar('--streaming', '--chunk-size', '5')
+
+		self.assertEqual(list(Obra.objects.values_list('id', flat=True)), ids)
+		self.assertNotIn(TABLA_NUEVA, self._tablas())
+
+	def _contenido(self):
+		return list(Obra.objects.order_by('id').values_list(
+			*[campo.attname for campo in Obra._meta.concrete_fields if not campo.primary_key]
+		))
+
+	def test_ruta_rapida_equivale_a_bulk_create(self):
+		df = leer_completo(os.path.join('data', 'datos.xlsx'), 'xlsx').iloc[1:]
+		registros, _ = limpiar_con_huella(df)
+		Obra.objects.bulk_create([Obra(**datos) for datos in registros])
+		esperado = self._contenido()
+
+		self._importar('--batch-size', '5')
+		self.assertEqual(self._contenido(), esperado)
+
+	def test_version_datos(self):
+		self._importar()
+		self.assertEqual(VersionDatos.actual().version, 1)
+
+		# Mismo contenido: no se importa ni cambia la versión
+		salida = io.StringIO()
+		call_command('vigilar_datos', '--una-vez', stdout=salida)
+		self.assertIn('sin cambios de contenido', salida.getvalue())
+		self.assertEqual(VersionDatos.actual().version, 1)
+
+		libro = Workbook()
+		hoja = libro.active
+		hoja.append([f'COL {i}' for i in range(67)])
+		for n in range(1, 14):
+			hoja.append(_fila_ejemplo(n))
+		libro.save(os.path.join('data', 'datos.xlsx'))
+
+		call_command('vigilar_datos', '--una-vez', stdout=io.StringIO())
+		self.assertEqual(Obra.objects.count(), 13)
+		self.assertEqual(VersionDatos.actual().version, 2)
+
+		# Reimportar sin cambios en las filas guarda la huella sin subir la versión
+		VersionDatos.objects.update(huella_archivo='')
+		call_command('vigilar_datos', '--una-vez', stdout=io.StringIO())
+		self.assertEqual(VersionDatos.actual().version, 2)
+		self.assertNotEqual(VersionDatos.actual().huella_archivo, '')
+
+	def test_huella_no_depende_de_la_fecha(self):
+		# Filas sin avance que arrancan el 1 de marzo: al limpiarlas en abril su
+		# estatus es retrasado y en febrero planificado
+		libro = Workbook()
+		hoja = libro.active
+		hoja.append([f'COL {i}' for i in range(67)])
+		for n in range(1, 13):
+			fila = _fila_ejemplo(n)
+			fila[41] = datetime(2026, 3, 1)
+			fila[43] = 0
+			hoja.append(fila)
+		libro.save(os.path.join('data', 'datos.xlsx'))
+
+		salidas = []
+		for dia in (date(2026, 2, 1), date(2026, 4, 1)):
+			hoy = type('Hoy', (date,), {'today': classmethod(lambda cls, dia=dia: dia)})
+			salida = io.StringIO()
+			with mock.patch('poa.importacion.limpieza.date', hoy):
+				call_command('importar_excel', '--incremental', stdout=salida)
+			salidas.append(salida.getvalue())
+
+		self.assertIn('Insertadas: 12', salidas[0])
+		self.assertIn('Insertadas: 0 | Actualizadas: 0 | Eliminadas: 0 | Sin cambios: 12', salidas[1])
+		# Las filas no se reescriben: el estatus lo pone al día recalcular_estatus
+		self.assertEqual(set(Obra.objects.values_list('estatus_calculado', flat=True)), {'planificado'})
+		self.assertEqual(VersionDatos.actual().version, 1)
+
+	def _guardar_libro(self, filas):
+		libro = Workbook()
+		hoja = libro.active
+		hoja.append([f'COL {i}' for i in range(67)])
+		for fila in filas:
+			hoja.append(fila)
+		libro.save(os.path.join('data', 'datos.xlsx'))
+
+	def test_incremental_por_bloques(self):
+		"""Con --streaming cada bloque se compara por separado, aun con ids repetidos entre bloques."""
+		ampliacion = _fila_ejemplo(5)
+		ampliacion[1] = 'ampliación de obra 5'
+		self._guardar_libro([_fila_ejemplo(n) for n in range(1, 13)] + [ampliacion])
+		self._importar()
+		pks = set(Obra.objects.exclude(id_excel=3).values_list('pk', flat=True))
+
+		# La segunda fila con id 5 pasa al primer bloque y la original queda en el
+		# segundo; la fila 3 cambia, la 12 desaparece y llega la 13
+		filas = [ampliacion] + [_fila_ejemplo(n) for n in range(1, 12)] + [_fila_ejemplo(13)]
+		filas[3][52] = 'Inundaciones'
+		self._guardar_libro(filas)
+		salida = io.StringIO()
+		call_command('importar_excel', '--incremental', '--streaming', '--chunk-size', '5', stdout=salida)
+
+		self.assertIn('Insertadas: 1 | Actualizadas: 1 | Eliminadas: 1 | Sin cambios: 11', salida.getvalue())
+		self.assertEqual(Obra.objects.filter(pk__in=pks).count(), 11)
+		self.assertEqual(
+			sorted(Obra.objects.values_list('id_excel', flat=True)),
+			[1, 2, 3, 4, 5, 5, 6, 7, 8, 9, 10, 11, 13],
+		)
+		self.assertEqual(Obra.objects.get(id_excel=3).problemas_identificados, 'Inundaciones')
+
+	def _riesgos(self):
+		return sorted(RiesgoIdentificado.objects.values_list('obra__id_excel', 'orden', 'clave'))
+
+	def _zonas(self):
+		return sorted(ObraZona.objects.values_list('obra__id_excel', 'zona', 'peso'))
+
+	def _alcaldias(self):
+		return sorted(ObraAlcaldia.objects.values_list('obra__id_excel', 'alcaldia__nombre'))
+
+	def test_tablas_derivadas_siguen_a_las_obras(self):
+		esperado = [
+			(n, orden, clave) for n in (3, 6, 9, 12)
+			for orden, clave in ((1, 'falta de permisos'), (2, 'lluvias'))
+		]
+		zonas = [(n, 'Zona Oriente' if n % 2 else 'Sin Asignar', 1.0) for n in range(1, 13)]
+		alcaldias = [(n, 'Iztapalapa') for n in range(1, 13, 2)]
+		self._importar()
+		self.assertEqual(self._riesgos(), esperado)
+		self.assertEqual(self._zonas(), zonas)
+		self.assertEqual(self._alcaldias(), alcaldias)
+
+		# Las tablas espejo hijas apuntan a las obras nuevas (y al catálogo activo)
+		self._importar('--streaming', '--chunk-size', '5')
+		self.assertEqual(self._riesgos(), esperado)
+		self.assertEqual(self._zonas(), zonas)
+		self.assertEqual(self._alcaldias(), alcaldias)
+		self.assertTrue(self._tablas().isdisjoint({
+			'poa_riesgoidentificado_nueva', 'poa_obrazona_nueva', 'poa_obraalcaldia_nueva', 'poa_alcaldia_nueva',
+		}))
+
+		# Incremental: fila 3 cambia de riesgos y de alcaldías, y la fila 12 desaparece
+		libro = Workbook()
+		hoja = libro.active
+		hoja.append([f'COL {i}' for i in range(67)])
+		for n in range(1, 12):
+			fila = _fila_ejemplo(n)
+			if n == 3:
+				fila[52] = 'Inundaciones'
+				fila[16] = fila[34] = 'Tlalpan y Tláhuac'
+			hoja.append(fila)
+		libro.save(os.path.join('data', 'datos.xlsx'))
+		self._importar('--incremental')
+		self.assertEqual(self._riesgos(), [(3, 1, 'inundaciones')] + esperado[2:6])
+		self.assertEqual(self._zonas(), zonas[:2] + [(3, 'Zona Oriente', 0.5), (3, 'Zona Sur', 0.5)] + zonas[3:11])
+		self.assertEqual(self._alcaldias(), [(1, 'Iztapalapa'), (3, 'Tlalpan'), (3, 'Tláhuac')] + alcaldias[2:6])
+
+	def test_carga_masiva_restaura_pragmas(self):
+		if connection.vendor != 'sqlite':
+			self.skipTest('pragmas exclusivos de SQLite')
+		with connection.cursor() as cursor:
+			cursor.execute('PRAGMA synchronous')
+			antes = cursor.fetchone()[0]
+		with carga_masiva():
+			with connection.cursor() as cursor:
+				cursor.execute('PRAGMA synchronous')
+				self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+		with connection.cursor() as cursor:
+			cursor.execute('PRAGMA synchronous')
+			self.assertEqual(cursor.fetchone()[0], antes)
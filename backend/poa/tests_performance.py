@@ -46,8 +46,8 @@ class TerritorialStatsPerformanceTest(TestCase):
         print("=" * 60)
         
         qs = Obra.objects.only(
-            'ubicacion_especifica', 'alcance_territorial',
-            'presupuesto_modificado', 'anteproyecto_total', 'beneficiarios_num'
+            'ubicacion_norm', 'alcance_norm',
+            'presupuesto_efectivo', 'beneficiarios_num'
         )
         
         # Medición de memoria
@@ -12,6 +12,7 @@ from .views import (
     CriticalProjectsListView,
     TerritoryAggregationsView,
     RiskAnalysisView,
+    RiskFrequencyView,
     # Reportes
     generar_reporte
 )
@@ -33,6 +34,7 @@ urlpatterns = [
     path('v2/dashboard/critical-projects/', CriticalProjectsListView.as_view(), name='critical-projects'),
     path('v2/dashboard/territories/', TerritoryAggregationsView.as_view(), name='territories'),
     path('v2/dashboard/risk-analysis/', RiskAnalysisView.as_view(), name='risk-analysis'),
+    path('v2/dashboard/risk-frequencies/', RiskFrequencyView.as_view(), name='risk-frequencies'),
     # Reportes
     path('reportes/generar/', generar_reporte, name='generar-reporte'),
 ]
\ No newline at end of file
@@ -1,6 +1,10 @@
 import pandas as pd
 import numpy as np
 import re
+import difflib
+import unicodedata
+from functools import lru_cache
+from datetime import date
 
 # ==================== CATÁLOGO DE ESCALAS ====================
 # Mapeo completo de todas las variantes textuales a valores numéricos 1-5
@@ -53,6 +57,17 @@ CATALOGO_ESCALAS = {
 	"5-muy alto": 5,
 }
 
+# Claves del catálogo para la búsqueda por subcadena: las más largas primero,
+# así "muy alto" gana sobre "alto" y "muy bajo" sobre "bajo" sin depender del
+# orden del diccionario (a igual longitud se respeta el orden del catálogo)
+_CLAVES_ESCALA = sorted(CATALOGO_ESCALAS.items(), key=lambda item: -len(item[0]))
+
+# Textos de escala distintos que se memorizan (se repiten mucho entre filas)
+TAMANO_CACHE_ESCALAS = 4096
+
+_PATRON_ESCALA_INICIO = re.compile(r'^([1-5])\b')
+_PATRON_ESCALA_DIGITO = re.compile(r'\b([1-5])\b')
+
 def clean_money(valor, es_mdp=True):
 	"""
 	Limpia y estandariza montos financieros.
@@ -151,29 +166,36 @@ def interpretar_escala_flexible(valor):
 			return valor_int
 		# Si el float está fuera de rango, intentar como texto
 	
-	# Caso 4: Convertir a string y limpiar
-	val_str = str(valor).strip().lower()
-	
-	# Remover caracteres especiales comunes
-	val_str = val_str.replace('–', '-').replace('—', '-').replace('_', ' ')
-	
-	# Caso 5: Buscar número explícito (1-5) al inicio o entre delimitadores
-	# Patrón: busca 1, 2, 3, 4, o 5 como palabra completa o al inicio
-	match = re.search(r'^([1-5])\b', val_str)
+	# Casos 4-9: texto (memorizado por valor)
+	return _interpretar_texto_escala(str(valor))
+
+@lru_cache(maxsize=TAMANO_CACHE_ESCALAS)
+def _interpretar_texto_escala(texto):
+	"""Casos 4-9 de interpretar_escala_flexible() para un texto crudo."""
+	# Caso 4: Limpiar y remover caracteres especiales comunes
+	val_str = texto.strip().lower().replace('–', '-').replace('—', '-').replace('_', ' ')
+	
+	# Caso 5: Coincidencia exacta con el catálogo ("muy alto", "4 - alto", ...)
+	numero = CATALOGO_ESCALAS.get(val_str)
+	if numero is not None:
+		return numero
+	
+	# Caso 6: Número explícito (1-5) al inicio
+	match = _PATRON_ESCALA_INICIO.search(val_str)
 	if match:
 		return int(match.group(1))
 	
-	# Caso 6: Buscar en el catálogo de escalas textuales
-	for clave, numero in CATALOGO_ESCALAS.items():
+	# Caso 7: Clave del catálogo contenida en el texto (la más larga gana)
+	for clave, numero in _CLAVES_ESCALA:
 		if clave in val_str:
 			return numero
 	
-	# Caso 7: Buscar cualquier dígito 1-5 en el string
-	match = re.search(r'\b([1-5])\b', val_str)
+	# Caso 8: Buscar cualquier dígito 1-5 en el string
+	match = _PATRON_ESCALA_DIGITO.search(val_str)
 	if match:
 		return int(match.group(1))
 	
-	# Caso 8: Default (no se pudo interpretar)
+	# Caso 9: Default (no se pudo interpretar)
 	return 1
 
 def calcular_puntuacion_ponderada(alineacion, impacto, urgencia, viabilidad, recursos, riesgo, dependencias):
@@ -273,24 +295,40 @@ def calcular_viabilidad_global(obra):
 	Returns:
 		str: 'alta', 'media', 'baja'
 	"""
-	semaforos = [
-		(obra.viabilidad_tecnica_semaforo or '').upper(),
-		(obra.viabilidad_presupuestal_semaforo or '').upper(),
-		(obra.viabilidad_juridica_semaforo or '').upper(),
-		(obra.viabilidad_temporal_semaforo or '').upper(),
-		(obra.viabilidad_administrativa_semaforo or '').upper()
-	]
-	
-	rojos = sum(1 for s in semaforos if s == 'ROJO')
-	amarillos = sum(1 for s in semaforos if s == 'AMARILLO')
-	
+	rojos, amarillos = contar_semaforos(getattr(obra, campo) for campo in CAMPOS_SEMAFORO)
+	return viabilidad_por_semaforos(rojos, amarillos)
+
+
+# Los 5 semáforos de viabilidad (cols 29-33)
+CAMPOS_SEMAFORO = (
+	'viabilidad_tecnica_semaforo',
+	'viabilidad_presupuestal_semaforo',
+	'viabilidad_juridica_semaforo',
+	'viabilidad_temporal_semaforo',
+	'viabilidad_administrativa_semaforo',
+)
+
+
+def contar_semaforos(semaforos):
+	"""
+	Cuenta semáforos ROJO y AMARILLO (sin distinguir mayúsculas).
+
+	Returns:
+		tuple: (rojos, amarillos)
+	"""
+	semaforos = [(s or '').upper() for s in semaforos]
+	return semaforos.count('ROJO'), semaforos.count('AMARILLO')
+
+
+def viabilidad_por_semaforos(rojos, amarillos):
+	"""Reglas de calcular_viabilidad_global() a partir de los conteos."""
 	if rojos >= 1:
 		return 'baja'
 	if amarillos >= 2:
 		return 'media'
 	return 'alta'
 
-def calcular_estatus_proyecto(obra):
+def calcular_estatus_proyecto(obra, hoy=None):
 	"""
 	Calcula el estatus de un proyecto según reglas de negocio.
 	
@@ -303,15 +341,29 @@ def calcular_estatus_proyecto(obra):
 	
 	Args:
 		obra: Instancia del modelo Obra
+		hoy: Fecha de referencia (default: date.today())
 	
 	Returns:
 		str: 'completado', 'en_riesgo', 'retrasado', 'en_ejecucion', 'planificado'
 	"""
-	from datetime import date
-	
-	avance_fisico = obra.avance_fisico_pct or 0
-	riesgo = obra.riesgo_nivel or 0
-	fecha_inicio_real = obra.fecha_inicio_real
+	return estatus_proyecto(obra.avance_fisico_pct, obra.riesgo_nivel, obra.fecha_inicio_real, hoy)
+
+
+# Campos de los que depende el estatus (además de la fecha actual)
+ORIGENES_ESTATUS = ('avance_fisico_pct', 'riesgo_nivel', 'fecha_inicio_real')
+
+# Valores posibles del estatus calculado
+ESTATUS_PROYECTO = ('planificado', 'en_ejecucion', 'en_riesgo', 'retrasado', 'completado')
+
+
+def estatus_proyecto(avance_fisico, riesgo, fecha_inicio_real, hoy=None):
+	"""
+	Reglas de calcular_estatus_proyecto() a partir de los valores de los campos.
+	Solo la regla de "retrasado" depende de la fecha: el estatus guardado
+	(Obra.estatus_calculado) cambia cuando fecha_inicio_real llega a `hoy`.
+	"""
+	avance_fisico = avance_fisico or 0
+	riesgo = riesgo or 0
 	
 	# 1. Completado: Avance físico al 100%
 	if avance_fisico >= 100:
@@ -322,7 +374,7 @@ def calcular_estatus_proyecto(obra):
 		return 'en_riesgo'
 	
 	# 3. Retrasado: Tiene fecha de inicio real pasada pero sin avance
-	if fecha_inicio_real and fecha_inicio_real <= date.today():
+	if fecha_inicio_real and fecha_inicio_real <= (hoy or date.today()):
 		if avance_fisico == 0:
 			return 'retrasado'
 	
@@ -332,6 +384,65 @@ def calcular_estatus_proyecto(obra):
 	
 	# 5. Planificado: Sin fecha de inicio real o fecha futura
 	return 'planificado'
+
+# Separadores de la lista de riesgos y prefijos de viñeta o numeración
+_SEPARADORES_RIESGOS = re.compile(r'[,;\n\r|]+')
+_VINETA_RIESGO = re.compile(r'^[-•\-\d\.\)\s]+')
+
+# Máximo de riesgos que se guardan por obra
+MAX_RIESGOS = 10
+
+
+def parsear_riesgos(texto):
+	"""
+	Separa problemas_identificados en una lista de riesgos.
+	Se calcula al importar y en Obra.save() (columna riesgos_lista).
+
+	- Delimitadores: comas, punto y coma, saltos de línea y pipes
+	- Quita guiones, viñetas y numeración al inicio (-, •, 1., 2) ...)
+	- Ignora textos de 3 caracteres o menos (probablemente basura)
+
+	Returns:
+		list: hasta MAX_RIESGOS textos
+	"""
+	if not texto:
+		return []
+
+	riesgos = []
+	for riesgo in _SEPARADORES_RIESGOS.split(str(texto)):
+		riesgo = _VINETA_RIESGO.sub('', riesgo.strip()).strip()
+		if len(riesgo) > 3:
+			riesgos.append(riesgo)
+	return riesgos[:MAX_RIESGOS]
+
+
+def clave_riesgo(riesgo):
+	"""
+	Llave normalizada de un riesgo para agruparlo entre proyectos:
+	minúsculas, sin acentos, espacios simples y sin punto final.
+
+	Ejemplo:
+		'Falta de  Permisos.' -> 'falta de permisos'
+	"""
+	return ' '.join(normalizar_texto(riesgo).split()).rstrip('.')[:255]
+
+
+def filas_riesgos(riesgos):
+	"""
+	Filas de RiesgoIdentificado (sin la obra) para una lista de riesgos_lista.
+	El texto por defecto ('Sin Problemas Identificados') no es un riesgo y se omite.
+
+	Returns:
+		list: dicts con orden, descripcion y clave
+	"""
+	filas = []
+	for orden, riesgo in enumerate(riesgos, start=1):
+		clave = clave_riesgo(riesgo)
+		if clave != _CLAVE_SIN_RIESGOS:
+			filas.append({'orden': orden, 'descripcion': riesgo, 'clave': clave})
+	return filas
+
+
 def clean_beneficiarios_advanced(valor):
 	"""
 	Limpia texto de beneficiarios detectando magnitudes y abreviaturas.
@@ -389,28 +500,285 @@ def normalizar_texto(texto):
 		'Niño' -> 'nino'
 		'Área' -> 'area'
 	"""
-	import unicodedata
-	
 	if not texto:
 		return ''
 	
 	# Convertir a minúsculas
 	texto = str(texto).lower()
 	
-	# Remover acentos/tildes usando NFD (Normalization Form Decomposition)
-	# Esto separa caracteres acentuados en base + acento
-	texto_nfd = unicodedata.normalize('NFD', texto)
+	# Texto ASCII: no hay acentos que quitar
+	if texto.isascii():
+		return texto
+	
+	# Letras latinas acentuadas: una sola pasada con str.translate
+	texto_sin_acentos = texto.translate(_TABLA_SIN_ACENTOS)
+	if texto_sin_acentos.isascii():
+		return texto_sin_acentos
 	
-	# Filtrar solo caracteres que NO sean marcas diacríticas (acentos)
-	texto_sin_acentos = ''.join(
-		char for char in texto_nfd 
+	# Cualquier otro carácter: descomposición NFD completa
+	return _quitar_marcas_nfd(texto)
+
+
+def _quitar_marcas_nfd(texto):
+	"""
+	Remueve acentos/tildes usando NFD (Normalization Form Decomposition):
+	separa caracteres acentuados en base + acento y descarta los acentos.
+	"""
+	return ''.join(
+		char for char in unicodedata.normalize('NFD', texto)
 		if unicodedata.category(char) != 'Mn'  # Mn = Marca No espaciadora (tildes)
 	)
-	
-	# Normalizar ñ -> n (opcional, algunos prefieren mantenerla)
-	# texto_sin_acentos = texto_sin_acentos.replace('ñ', 'n')
-	
-	return texto_sin_acentos
+
+
+# Latin-1 y Latin Extendido-A (U+00C0-U+017F) -> letra base ASCII, solo para
+# los caracteres cuya descomposición NFD es una letra ASCII más acentos: el
+# resultado es idéntico al de _quitar_marcas_nfd()
+_TABLA_SIN_ACENTOS = {
+	codigo: base
+	for codigo, base in ((c, _quitar_marcas_nfd(chr(c))) for c in range(0xC0, 0x180))
+	if base.isascii() and base != chr(codigo)
+}
+
+
+# Columnas de Obra con su texto normalizado (minúsculas, sin acentos): se
+# llenan al importar y al guardar, y las consultas las leen directamente
+CAMPOS_NORMALIZADOS = {
+	'programa_norm': 'programa',
+	'ubicacion_norm': 'ubicacion_especifica',
+	'alcance_norm': 'alcance_territorial',
+	'alcaldias_norm': 'alcaldias',
+}
+
+
+def textos_normalizados(datos):
+	"""
+	Calcula las columnas normalizadas de una obra.
+
+	Args:
+		datos: dict con los campos de Obra (o cualquier objeto con .get)
+
+	Returns:
+		dict: {campo_norm: texto normalizado}
+	"""
+	return {campo: normalizar_texto(datos.get(origen)) for campo, origen in CAMPOS_NORMALIZADOS.items()}
+
+
+# Columnas de negocio de Obra derivadas de otros campos: se llenan al
+# importar y al guardar para filtrar, ordenar y sumar directamente en SQL
+CAMPOS_DERIVADOS = (
+	'presupuesto_efectivo', 'monto_ejecutado', 'semaforos_rojos',
+	'semaforos_amarillos', 'viabilidad_global', 'prioridad_label',
+)
+
+# Campos de los que dependen las columnas derivadas
+ORIGENES_DERIVADOS = (
+	'presupuesto_modificado', 'anteproyecto_total', 'avance_financiero_pct',
+	'puntuacion_final_ponderada', *CAMPOS_SEMAFORO,
+)
+
+
+def campos_derivados(datos):
+	"""
+	Calcula las columnas de negocio derivadas de una obra.
+
+	- presupuesto_efectivo: presupuesto modificado si es > 0, si no el anteproyecto
+	- monto_ejecutado: presupuesto efectivo por el avance financiero
+	- semaforos_rojos / semaforos_amarillos: conteo de los 5 semáforos
+	- viabilidad_global: calcular_viabilidad_global()
+	- prioridad_label: obtener_etiqueta_prioridad() de la puntuación guardada
+
+	Args:
+		datos: dict con los campos de Obra (o cualquier objeto con .get)
+
+	Returns:
+		dict: {campo derivado: valor}
+	"""
+	modificado = datos.get('presupuesto_modificado') or 0
+	presupuesto = modificado if modificado > 0 else (datos.get('anteproyecto_total') or 0)
+	rojos, amarillos = contar_semaforos(datos.get(campo) for campo in CAMPOS_SEMAFORO)
+	return {
+		'presupuesto_efectivo': presupuesto,
+		'monto_ejecutado': presupuesto * ((datos.get('avance_financiero_pct') or 0) / 100.0),
+		'semaforos_rojos': rojos,
+		'semaforos_amarillos': amarillos,
+		'viabilidad_global': viabilidad_por_semaforos(rojos, amarillos),
+		'prioridad_label': obtener_etiqueta_prioridad(datos.get('puntuacion_final_ponderada') or 0),
+	}
+
+
+# ==================== TERRITORIO ====================
+
+# Alcaldías por zona (mismo criterio que src/lib/zones.ts), en el orden de las gráficas
+ZONAS_ALCALDIAS = {
+	'Zona Norte': ('Gustavo A. Madero', 'Azcapotzalco'),
+	'Zona Sur': ('Tlalpan', 'Xochimilco', 'Milpa Alta'),
+	'Centro Histórico': ('Cuauhtémoc', 'Benito Juárez', 'Coyoacán'),
+	'Zona Oriente': ('Iztapalapa', 'Iztacalco', 'Venustiano Carranza', 'Tláhuac'),
+	'Zona Poniente': ('Miguel Hidalgo', 'Cuajimalpa de Morelos', 'Álvaro Obregón', 'La Magdalena Contreras'),
+}
+ZONAS = tuple(ZONAS_ALCALDIAS)
+ZONA_SIN_ASIGNAR = 'Sin Asignar'
+
+# Las 16 alcaldías y su zona
+ALCALDIAS = tuple(alcaldia for alcaldias in ZONAS_ALCALDIAS.values() for alcaldia in alcaldias)
+ZONA_DE_ALCALDIA = {
+	alcaldia: zona for zona, alcaldias in ZONAS_ALCALDIAS.items() for alcaldia in alcaldias
+}
+
+# Textos (normalizados) de un proyecto de toda la ciudad: se reparte entre las 5 zonas
+PALABRAS_CIUDAD_COMPLETA = ('todas', '16 alcaldias', 'ciudad completa', 'toda la ciudad')
+
+# Formas cortas con que se captura el nombre de algunas alcaldías
+# (también encuentran el nombre oficial, que las contiene)
+_VARIANTES_ALCALDIAS = {
+	'Gustavo A. Madero': ('gustavo a. madero', 'gustavo a madero'),
+	'Cuajimalpa de Morelos': ('cuajimalpa',),
+	'La Magdalena Contreras': ('magdalena contreras',),
+}
+_PATRONES_ALCALDIAS = [
+	(alcaldia, _VARIANTES_ALCALDIAS.get(alcaldia, (normalizar_texto(alcaldia),)))
+	for alcaldia in ALCALDIAS
+]
+
+
+def alcaldias_en_texto(texto):
+	"""
+	Alcaldías mencionadas en un texto normalizado (normalizar_texto).
+
+	Returns:
+		list: nombres oficiales, en el orden de ALCALDIAS
+	"""
+	if not texto:
+		return []
+	return [alcaldia for alcaldia, variantes in _PATRONES_ALCALDIAS if any(v in texto for v in variantes)]
+
+
+# Llave fija de cada alcaldía en el catálogo (poa_alcaldia): su posición en ALCALDIAS
+ID_ALCALDIA = {alcaldia: numero for numero, alcaldia in enumerate(ALCALDIAS, start=1)}
+
+# Textos distintos de alcaldías cuya resolución se memoriza (se repiten mucho entre obras)
+TAMANO_CACHE_ALCALDIAS = 4096
+
+# Parecido mínimo (difflib) para aceptar un fragmento mal escrito como una alcaldía
+SIMILITUD_ALCALDIA = 0.8
+
+# Separadores entre alcaldías en el texto capturado ("Coyoacán, Tlalpan y Xochimilco")
+_SEPARADORES_ALCALDIAS = re.compile(r'\s*(?:[,;/|]|\s+y\s+|\s+e\s+)\s*')
+
+# Forma normalizada (y variantes) -> nombre oficial, para la búsqueda aproximada
+_NOMBRES_ALCALDIAS = {
+	variante: alcaldia for alcaldia, variantes in _PATRONES_ALCALDIAS for variante in (normalizar_texto(alcaldia), *variantes)
+}
+
+
+def _texto_territorial(alcaldias_norm, alcance_norm, ubicacion_norm):
+	"""Textos territoriales de una obra unidos con un separador que no forma palabras."""
+	return ' | '.join(t for t in (alcaldias_norm, alcance_norm, ubicacion_norm) if t)
+
+
+def _es_ciudad_completa(texto):
+	return any(palabra in texto for palabra in PALABRAS_CIUDAD_COMPLETA)
+
+
+@lru_cache(maxsize=TAMANO_CACHE_ALCALDIAS)
+def resolver_alcaldias(alcaldias_norm, alcance_norm=None, ubicacion_norm=None):
+	"""
+	Resolución única de alcaldías: las del catálogo a las que se refieren los
+	textos normalizados de una obra (alcaldías, alcance territorial y ubicación).
+	De ella salen tanto ObraAlcaldia como las zonas de ObraZona.
+
+	- Toda la ciudad (PALABRAS_CIUDAD_COMPLETA en cualquiera de los textos): las 16
+	- Nombres oficiales o variantes conocidas dentro del texto (alcaldias_en_texto)
+	- Fragmentos sin coincidencia exacta: el nombre más parecido (difflib), si
+	  supera SIMILITUD_ALCALDIA ("iztapalpa" -> Iztapalapa)
+
+	Returns:
+		tuple: nombres oficiales, en el orden de ALCALDIAS
+	"""
+	texto = _texto_territorial(alcaldias_norm, alcance_norm, ubicacion_norm)
+	if not texto:
+		return ()
+	if _es_ciudad_completa(texto):
+		return ALCALDIAS
+	encontradas = set()
+	for fragmento in _SEPARADORES_ALCALDIAS.split(texto):
+		exactas = alcaldias_en_texto(fragmento)
+		if exactas:
+			encontradas.update(exactas)
+			continue
+		parecidas = difflib.get_close_matches(fragmento, _NOMBRES_ALCALDIAS, n=1, cutoff=SIMILITUD_ALCALDIA)
+		if parecidas:
+			encontradas.add(_NOMBRES_ALCALDIAS[parecidas[0]])
+	return tuple(alcaldia for alcaldia in ALCALDIAS if alcaldia in encontradas)
+
+
+def filas_alcaldias(alcaldias_norm, alcance_norm=None, ubicacion_norm=None):
+	"""
+	Filas de ObraAlcaldia (sin la obra): una por alcaldía del catálogo que
+	menciona la obra; ninguna si los textos no se resuelven.
+
+	Returns:
+		list: dicts con alcaldia_id
+	"""
+	return [
+		{'alcaldia_id': ID_ALCALDIA[alcaldia]}
+		for alcaldia in resolver_alcaldias(alcaldias_norm, alcance_norm, ubicacion_norm)
+	]
+
+
+def zonas_territoriales(alcaldias_norm, alcance_norm, ubicacion_norm):
+	"""
+	Clasificador territorial único: zonas que cubre una obra, las de sus
+	alcaldías resueltas (resolver_alcaldias), así ObraZona y ObraAlcaldia
+	siempre coinciden.
+
+	- Toda la ciudad (PALABRAS_CIUDAD_COMPLETA en cualquiera de los textos): las 5 zonas
+	- Si no, las zonas de las alcaldías resueltas
+	- Sin alcaldías reconocibles: ninguna (la obra queda sin asignar)
+
+	Returns:
+		tuple: (zonas en el orden de ZONAS, es toda la ciudad)
+	"""
+	if _es_ciudad_completa(_texto_territorial(alcaldias_norm, alcance_norm, ubicacion_norm)):
+		return list(ZONAS), True
+	encontradas = {
+		ZONA_DE_ALCALDIA[alcaldia] for alcaldia in resolver_alcaldias(alcaldias_norm, alcance_norm, ubicacion_norm)
+	}
+	return [zona for zona in ZONAS if zona in encontradas], False
+
+
+def filas_zonas(alcaldias_norm, alcance_norm, ubicacion_norm):
+	"""
+	Filas de ObraZona (sin la obra): una por zona con el peso del prorrateo
+	(1 / número de zonas), o una sola fila ZONA_SIN_ASIGNAR con peso 1.
+
+	Returns:
+		list: dicts con zona, peso y ciudad_completa
+	"""
+	zonas, ciudad_completa = zonas_territoriales(alcaldias_norm, alcance_norm, ubicacion_norm)
+	if not zonas:
+		return [{'zona': ZONA_SIN_ASIGNAR, 'peso': 1.0, 'ciudad_completa': False}]
+	peso = 1.0 / len(zonas)
+	return [{'zona': zona, 'peso': peso, 'ciudad_completa': ciudad_completa} for zona in zonas]
+
+
+# Siglas comunes que deben mantenerse en mayúsculas
+SIGLAS = frozenset({
+	'CDMX', 'MX', 'USA', 'EU', 'CFE', 'IMSS', 'ISSSTE', 
+	'UNAM', 'IPN', 'UAM', 'SEP', 'INEGI', 'SAT',
+	'BRT', 'POA', 'ODS', 'ONU'
+})
+
+# Palabras que van en minúsculas (preposiciones, artículos, conjunciones)
+PALABRAS_MINUSCULAS = frozenset({
+	'de', 'del', 'la', 'las', 'el', 'los', 'un', 'una', 
+	'unos', 'unas', 'y', 'e', 'o', 'u', 'en', 'a', 'con', 
+	'por', 'para', 'sin', 'sobre', 'bajo', 'entre', 'hacia'
+})
+
+# Textos distintos que se memorizan (el serializer capitaliza ~27 campos por fila
+# y los valores se repiten mucho entre obras)
+TAMANO_CACHE_TEXTOS = 8192
 
 
 def capitalizar_texto(texto, siglas=None):
@@ -422,7 +790,7 @@ def capitalizar_texto(texto, siglas=None):
 	
 	Args:
 		texto: Texto a capitalizar
-		siglas: Set de siglas a mantener en mayúsculas (opcional)
+		siglas: Set de siglas a mantener en mayúsculas (opcional, default SIGLAS)
 	
 	Ejemplos:
 		"CDMX" -> "CDMX"
@@ -440,21 +808,19 @@ def capitalizar_texto(texto, siglas=None):
 	if not text:
 		return None
 	
-	# Lista de siglas comunes que deben mantenerse en mayúsculas
 	if siglas is None:
-		siglas = {
-			'CDMX', 'MX', 'USA', 'EU', 'CFE', 'IMSS', 'ISSSTE', 
-			'UNAM', 'IPN', 'UAM', 'SEP', 'INEGI', 'SAT',
-			'CDMX', 'BRT', 'POA', 'ODS', 'ONU'
-		}
-	
-	# Lista de palabras que van en minúsculas (preposiciones, artículos, conjunciones)
-	minusculas = {
-		'de', 'del', 'la', 'las', 'el', 'los', 'un', 'una', 
-		'unos', 'unas', 'y', 'e', 'o', 'u', 'en', 'a', 'con', 
-		'por', 'para', 'sin', 'sobre', 'bajo', 'entre', 'hacia'
-	}
-	
+		return _capitalizar_memorizado(text)
+	return _capitalizar(text, siglas)
+
+
+@lru_cache(maxsize=TAMANO_CACHE_TEXTOS)
+def _capitalizar_memorizado(text):
+	"""capitalizar_texto() con las siglas por defecto, memorizado por texto."""
+	return _capitalizar(text, SIGLAS)
+
+
+def _capitalizar(text, siglas):
+	"""Capitaliza palabra por palabra un texto ya limpio (no vacío)."""
 	# Dividir en palabras
 	words = text.split()
 	capitalized_words = []
@@ -470,7 +836,7 @@ def capitalizar_texto(texto, siglas=None):
 		elif i == 0:
 			capitalized_words.append(word.capitalize())
 		# Caso 3: Si es preposición/artículo, dejar en minúsculas
-		elif clean_word.lower() in minusculas:
+		elif clean_word.lower() in PALABRAS_MINUSCULAS:
 			capitalized_words.append(word.lower())
 		# Caso 4: Palabra normal, capitalizar
 		else:
@@ -479,6 +845,59 @@ def capitalizar_texto(texto, siglas=None):
 	return ' '.join(capitalized_words)
 
 
+# Mapeo de campos a valores por defecto contextuales
+VALORES_POR_DEFECTO = {
+	# Identificación y categorización
+	'programa': 'Por Definir',
+	'area_responsable': 'Por Asignar',
+	'eje_institucional': 'Por Clasificar',
+	'tipo_obra': 'Por Clasificar',
+	'tipo_recurso': 'Por Definir',
+	'fuente_financiamiento': 'Por Definir',
+	'alcance_territorial': 'Por Determinar',
+	'etapa_desarrollo': 'Por Determinar',
+	'estatus_general': 'Por Revisar',
+	
+	# Responsables y ejecución
+	'responsable_operativo': 'Por Asignar',
+	'contratista': 'Por Contratar',
+	
+	# Ubicación
+	'alcaldias': 'Por Determinar',
+	'ubicacion_especifica': 'Por Definir',
+	
+	# Descripciones y observaciones
+	'impacto_social_desc': 'Sin Descripción',
+	'observaciones': 'Sin Observaciones',
+	'problema_resuelve': 'Por Documentar',
+	'solucion_ofrece': 'Por Documentar',
+	'beneficiarios_directos': 'Por Identificar',
+	
+	# Riesgos y gestión
+	'problemas_identificados': 'Sin Problemas Identificados',
+	'acciones_correctivas': 'Sin Acciones Definidas',
+	'riesgos': 'Sin Riesgos Identificados',
+	'permisos_requeridos': 'Por Revisar',
+	'estatus_permisos': 'Por Revisar',
+	
+	# Fechas y plazos (estos se manejan como None típicamente)
+	'fecha_inicio_prog': None,
+	'fecha_termino_prog': None,
+	'fecha_inicio_real': None,
+	'fecha_termino_real': None,
+	
+	# Valores numéricos (estos ya tienen defaults en el modelo)
+	'duracion_meses': None,
+	'multianualidad': 'Por Definir',
+	
+	# Comunicación
+	'hitos_comunicacionales': 'Sin Hitos Definidos',
+}
+
+# Llave del texto por defecto de problemas_identificados (filas_riesgos lo omite)
+_CLAVE_SIN_RIESGOS = clave_riesgo(VALORES_POR_DEFECTO['problemas_identificados'])
+
+
 def obtener_valor_por_defecto(campo_nombre, valor_actual):
 	"""
 	Retorna un valor por defecto apropiado según el tipo de campo.
@@ -493,53 +912,240 @@ def obtener_valor_por_defecto(campo_nombre, valor_actual):
 	if valor_actual and str(valor_actual).strip():
 		return valor_actual
 	
-	# Mapeo de campos a valores por defecto contextuales
-	defaults = {
-		# Identificación y categorización
-		'programa': 'Por Definir',
-		'area_responsable': 'Por Asignar',
-		'eje_institucional': 'Por Clasificar',
-		'tipo_obra': 'Por Clasificar',
-		'tipo_recurso': 'Por Definir',
-		'fuente_financiamiento': 'Por Definir',
-		'alcance_territorial': 'Por Determinar',
-		'etapa_desarrollo': 'Por Determinar',
-		'estatus_general': 'Por Revisar',
-		
-		# Responsables y ejecución
-		'responsable_operativo': 'Por Asignar',
-		'contratista': 'Por Contratar',
-		
-		# Ubicación
-		'alcaldias': 'Por Determinar',
-		'ubicacion_especifica': 'Por Definir',
-		
-		# Descripciones y observaciones
-		'impacto_social_desc': 'Sin Descripción',
-		'observaciones': 'Sin Observaciones',
-		'problema_resuelve': 'Por Documentar',
-		'solucion_ofrece': 'Por Documentar',
-		'beneficiarios_directos': 'Por Identificar',
-		
-		# Riesgos y gestión
-		'problemas_identificados': 'Sin Problemas Identificados',
-		'acciones_correctivas': 'Sin Acciones Definidas',
-		'riesgos': 'Sin Riesgos Identificados',
-		'permisos_requeridos': 'Por Revisar',
-		'estatus_permisos': 'Por Revisar',
-		
-		# Fechas y plazos (estos se manejan como None típicamente)
-		'fecha_inicio_prog': None,
-		'fecha_termino_prog': None,
-		'fecha_inicio_real': None,
-		'fecha_termino_real': None,
-		
-		# Valores numéricos (estos ya tienen defaults en el modelo)
-		'duracion_meses': None,
-		'multianualidad': 'Por Definir',
-		
-		# Comunicación
-		'hitos_comunicacionales': 'Sin Hitos Definidos',
-	}
-	
-	return defaults.get(campo_nombre, 'Por Definir')
\ No newline at end of file
+	return VALORES_POR_DEFECTO.get(campo_nombre, 'Por Definir')
+
+# ==================== LIMPIEZA VECTORIZADA (por columna) ====================
+# Versiones de los limpiadores que procesan una columna completa (pd.Series).
+# Producen exactamente el mismo resultado que las funciones escalares:
+# - Números nativos y textos numéricos simples se resuelven con operaciones
+#   vectorizadas (accessors .str, astype(float), extract).
+# - Cualquier otro valor (fechas, booleanos, textos raros como "1_000")
+#   se delega a la función escalar correspondiente.
+
+# Texto numérico ASCII que float() acepta sin ambigüedad
+_PATRON_FLOAT = r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+_PATRON_FLOAT_ASCII = re.compile(_PATRON_FLOAT, re.ASCII)
+
+_TIPOS_NUMERICOS = (int, float, np.int64, np.int32, np.float64)
+
+
+def _clasificar_valores(serie):
+	"""
+	Separa una serie en máscaras de nulos, números nativos y textos.
+	Los booleanos y otros tipos quedan fuera de ambas máscaras.
+	"""
+	nulos = serie.isna()
+	if pd.api.types.is_bool_dtype(serie):
+		falso = pd.Series(False, index=serie.index)
+		return nulos, falso, falso
+	if serie.dtype.kind in 'iu' or serie.dtype == np.float64:
+		return nulos, ~nulos, pd.Series(False, index=serie.index)
+
+	tipos = serie.map(type)
+	numericos = tipos.isin(_TIPOS_NUMERICOS) & ~nulos
+	textos = tipos.eq(str)
+	return nulos, numericos, textos
+
+
+def _parsear_float(serie, textos_limpios, numericos):
+	"""
+	Convierte a float los números nativos y los textos numéricos simples.
+
+	Returns:
+		tuple: (valores float con NaN donde no se resolvió, máscara de resueltos)
+	"""
+	valores = pd.Series(np.nan, index=serie.index, dtype=float)
+	resueltos = numericos.copy()
+	if numericos.any():
+		valores[numericos] = serie[numericos].astype(float)
+
+	if len(textos_limpios):
+		validos = textos_limpios.str.fullmatch(_PATRON_FLOAT_ASCII).fillna(False).astype(bool)
+		if validos.any():
+			indices = validos.index[validos]
+			valores[indices] = textos_limpios[validos].astype(float)
+			resueltos[indices] = True
+
+	return valores, resueltos
+
+
+def _redondear_2(valores):
+	"""
+	Equivalente vectorizado de round(x, 2) de Python.
+	np.round puede diferir cuando x*100 queda a medio camino (.5) por error de
+	representación; esos casos (y magnitudes enormes) se redondean con round().
+	"""
+	arr = np.asarray(valores, dtype=float)
+	resultado = np.round(arr, 2)
+	with np.errstate(invalid='ignore'):
+		escalado = arr * 100
+		distancia = np.abs(escalado - np.floor(escalado) - 0.5)
+		dudosos = (distancia <= np.abs(escalado) * 1e-15 + 1e-12) | (np.abs(arr) >= 1e13)
+	for i in np.flatnonzero(dudosos):
+		resultado[i] = round(float(arr[i]), 2)
+	return resultado
+
+
+def _completar_escalar(resultado, serie, pendientes, funcion):
+	"""Resuelve con la función escalar los valores que no tomó la ruta vectorizada."""
+	if pendientes.any():
+		indices = pendientes.index[pendientes]
+		resultado[indices] = [funcion(v) for v in serie[indices]]
+	return resultado
+
+
+def clean_money_series(serie, es_mdp=True):
+	"""
+	Versión por columna de clean_money().
+
+	Args:
+		serie: pd.Series con valores crudos de la columna
+		es_mdp: Si True, multiplica por 1,000,000 (valores en Millones De Pesos)
+
+	Returns:
+		pd.Series[float] con el mismo índice
+	"""
+	serie = pd.Series(serie)
+	nulos, numericos, textos = _clasificar_valores(serie)
+	limpios = (
+		serie[textos].astype(str)
+		.str.replace('$', '', regex=False)
+		.str.replace(',', '', regex=False)
+		.str.strip()
+	)
+	valores, resueltos = _parsear_float(serie, limpios, numericos)
+
+	if es_mdp:
+		valores = valores * 1_000_000
+
+	resultado = pd.Series(0.0, index=serie.index, dtype=float)
+	if resueltos.any():
+		resultado[resueltos] = _redondear_2(valores[resueltos])
+
+	pendientes = ~nulos & ~resueltos
+	return _completar_escalar(resultado, serie, pendientes, lambda v: clean_money(v, es_mdp=es_mdp))
+
+
+def clean_percentage_series(serie):
+	"""
+	Versión por columna de clean_percentage().
+	Valores en (0, 1] se interpretan como fracción y se multiplican por 100.
+	"""
+	serie = pd.Series(serie)
+	nulos, numericos, textos = _clasificar_valores(serie)
+	limpios = serie[textos].astype(str).str.replace('%', '', regex=False).str.strip()
+	valores, resueltos = _parsear_float(serie, limpios, numericos)
+
+	fraccion = (valores > 0) & (valores <= 1.0)
+	valores = valores.where(~fraccion, valores * 100)
+
+	resultado = pd.Series(0.0, index=serie.index, dtype=float)
+	resultado[resueltos] = valores[resueltos]
+
+	pendientes = ~nulos & ~resueltos
+	return _completar_escalar(resultado, serie, pendientes, clean_percentage)
+
+
+def interpretar_escala_series(serie):
+	"""
+	Versión por columna de interpretar_escala_flexible().
+
+	Returns:
+		pd.Series[int] con valores entre 1 y 5
+	"""
+	serie = pd.Series(serie)
+	nulos, numericos, textos = _clasificar_valores(serie)
+	resultado = pd.Series(1, index=serie.index, dtype='int64')
+
+	vacios = textos & serie.eq('')
+	textos = textos & ~vacios
+
+	# Números nativos: enteros 1-5 directos, flotantes redondeados (round half-even)
+	como_texto = pd.Series(False, index=serie.index)
+	if numericos.any():
+		numeros = serie[numericos].astype(float)
+		es_entero = serie[numericos].map(lambda v: isinstance(v, (int, np.integer)))
+		redondeados = np.rint(numeros)
+		en_rango = (redondeados >= 1) & (redondeados <= 5) & np.isfinite(numeros)
+		# Un entero fuera de rango o un flotante no entero en rango no aplica igual:
+		# los enteros solo se aceptan tal cual, los flotantes tras redondear
+		enteros_ok = es_entero & (numeros >= 1) & (numeros <= 5)
+		flotantes_ok = ~es_entero & en_rango
+		aceptados = enteros_ok | flotantes_ok
+		indices = aceptados.index[aceptados]
+		resultado[indices] = redondeados[aceptados].astype('int64')
+
+		# El resto de los números se interpreta como texto (str(valor))
+		fuera = aceptados.index[~aceptados & np.isfinite(numeros)]
+		como_texto[fuera] = True
+
+	textos_crudos = pd.concat([
+		serie[textos].astype(str),
+		serie[como_texto].map(str),
+	])
+	if len(textos_crudos):
+		resultado[textos_crudos.index] = _interpretar_textos_escala(textos_crudos)
+
+	# Booleanos, infinitos y otros tipos: función escalar
+	pendientes = ~nulos & ~vacios & ~textos & ~numericos
+	if numericos.any():
+		no_finitos = numericos & ~np.isfinite(serie.where(numericos, 0).astype(float))
+		pendientes = pendientes | no_finitos
+	return _completar_escalar(resultado, serie, pendientes, interpretar_escala_flexible)
+
+
+def _interpretar_textos_escala(textos):
+	"""Aplica los casos 4-9 de interpretar_escala_flexible() a una serie de textos."""
+	tabla = {texto: _interpretar_texto_escala(texto) for texto in textos.unique()}
+	return textos.map(tabla).astype('int64')
+
+
+def clean_beneficiarios_series(serie):
+	"""
+	Versión por columna de clean_beneficiarios_advanced().
+
+	Returns:
+		pd.Series[int] con el número de beneficiarios
+	"""
+	serie = pd.Series(serie)
+	nulos = serie.isna()
+	resultado = pd.Series(0, index=serie.index, dtype='int64')
+	if nulos.all():
+		return resultado
+
+	text = (
+		serie[~nulos].astype(object).astype(str)
+		.str.lower()
+		.str.replace(',', '', regex=False)
+		.str.replace('ó', 'o', regex=False)
+		.str.strip()
+	)
+
+	# Detección de multiplicadores por prioridad (mayor a menor)
+	es_billon = (
+		text.str.contains('miles de millones', regex=False)
+		| text.str.contains('billones', regex=False)
+		| text.str.contains('mmd', regex=False)
+	)
+	es_millon = text.str.contains('millon', regex=False) | text.str.contains(r'\d+\s*m\b', regex=True)
+	es_mil = text.str.contains('mil', regex=False) | text.str.contains(r'\d+\s*k\b', regex=True)
+	multiplicador = np.select(
+		[es_billon, es_millon, es_mil],
+		[1_000_000_000, 1_000_000, 1_000],
+		default=1
+	)
+
+	numero = text.str.extract(r'(\d+(\.\d+)?)', expand=True)[0]
+	hallados = numero.notna()
+	valores = numero[hallados].astype(float) * multiplicador[hallados.to_numpy()]
+
+	# int() trunca hacia cero; valores fuera del rango int64 usan la ruta escalar
+	seguros = valores < 2 ** 62
+	indices = valores.index[seguros]
+	resultado[indices] = np.trunc(valores[seguros]).astype('int64')
+
+	grandes = valores.index[~seguros]
+	if len(grandes):
+		resultado = resultado.astype(object)
+		resultado[grandes] = [clean_beneficiarios_advanced(v) for v in serie[grandes]]
+	return resultado
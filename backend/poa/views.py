@@ -2,41 +2,135 @@ from rest_framework import viewsets, filters
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.decorators import api_view
-from django.db.models import Sum, Q, F, Case, When, DecimalField, Count, Value, Avg
+from rest_framework.exceptions import ValidationError
+from django.db.models import Sum, Q, F, DecimalField, Count, Avg, Min, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from django.http import FileResponse, HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from datetime import datetime, timedelta
+from functools import lru_cache
 import os
-from .models import Obra
+from .models import Alcaldia, Obra, ObraAlcaldia, ObraZona, RiesgoIdentificado
 from .serializers import ObraSerializer
+from .fragmentos import CacheFragmentos
+from .renderers import JSONFragmentosRenderer
 from .services import calculate_territorial_stats
-from .utils import normalizar_texto
+from .utils import (
+	ESTATUS_PROYECTO, ID_ALCALDIA, ZONAS, ZONA_SIN_ASIGNAR, capitalizar_texto, normalizar_texto, resolver_alcaldias,
+)
 from .reportes import GeneradorReportes, ConfigReporte
 
 # ==================== PAGINACIÓN PERSONALIZADA ====================
 
-class StandardResultsSetPagination(PageNumberPagination):
+class PaginacionAcotada(PageNumberPagination):
 	"""
-	Paginación estándar para endpoints V2.
-	Permite ajustar page_size dinámicamente desde query params.
+	Paginación con page_size acotado: un valor inválido usa el valor por
+	defecto y uno mayor que max_page_size se recorta.
 	"""
 	page_size = 10
 	page_size_query_param = 'page_size'
 	max_page_size = 100
 
 
-def get_page_size(self, request):
-		# Soporte para 'todos' los resultados (sin paginación)
+class StandardResultsSetPagination(PaginacionAcotada):
+	"""
+	Paginación estándar para endpoints V2.
+	Permite ajustar page_size dinámicamente desde query params.
+	"""
+
+	def get_page_size(self, request):
+		# Soporte para 'todos' los resultados (sin paginación, respuesta en partes)
 		page_size_param = request.query_params.get(self.page_size_query_param)
 		if page_size_param == 'todos':
 			return None  # Sin paginación
 		return super().get_page_size(request)
 
 
+# ==================== CAMPOS DISPERSOS (?fields=) ====================
+
+@lru_cache(maxsize=None)
+def _campos_api():
+	"""Nombres de los campos que expone ObraSerializer."""
+	return frozenset(ObraSerializer().fields)
+
+
+def campos_solicitados(request):
+	"""
+	Lee ?fields=programa,avance_fisico_pct,... del request.
+	'lista' equivale a la representación compacta (ObraSerializer.CAMPOS_LISTA).
+
+	Returns:
+		list: campos en el orden pedido, o None si no se pidió (representación completa)
+	"""
+	parametro = request.query_params.get('fields')
+	if not parametro:
+		return None
+
+	campos = []
+	for campo in parametro.split(','):
+		campo = campo.strip()
+		nuevos = ObraSerializer.CAMPOS_LISTA if campo == 'lista' else (campo,) if campo else ()
+		campos.extend(c for c in nuevos if c not in campos)
+
+	desconocidos = [campo for campo in campos if campo not in _campos_api()]
+	if desconocidos:
+		raise ValidationError({'fields': f"Campos desconocidos: {', '.join(desconocidos)}"})
+	return campos
+
+
+def solo_campos(queryset, campos):
+	"""Limita el SELECT a las columnas que necesitan `campos` (None: sin cambios)."""
+	if campos is None:
+		return queryset
+	return queryset.only(*ObraSerializer.columnas_necesarias(campos))
+
+
+def en_partes(request):
+	"""Los listados sin paginación se envían en partes salvo en la API navegable."""
+	return request.accepted_renderer.format == 'json'
+
+
+class CamposDispersosMixin:
+	"""
+	?fields= en las lecturas de un ViewSet de obras: el serializer solo
+	incluye esos campos y el queryset solo lee sus columnas.
+	Los listados se arman con los fragmentos JSON en caché de cada obra
+	(poa/fragmentos.py): mismo JSON que ObraSerializer.
+	"""
+	campos = None
+	renderer_classes = [JSONFragmentosRenderer, BrowsableAPIRenderer]
+
+	def initial(self, request, *args, **kwargs):
+		super().initial(request, *args, **kwargs)
+		if request.method == 'GET':
+			self.campos = campos_solicitados(request)
+
+	def filter_queryset(self, queryset):
+		return solo_campos(super().filter_queryset(queryset), self.campos)
+
+	def get_serializer(self, *args, **kwargs):
+		if self.campos is not None:
+			kwargs['fields'] = self.campos
+		return super().get_serializer(*args, **kwargs)
+
+	def list(self, request, *args, **kwargs):
+		fragmentos = CacheFragmentos(self.campos)
+		llaves = fragmentos.llaves(self.filter_queryset(self.get_queryset()))
+
+		page = self.paginate_queryset(llaves)
+		if page is not None:
+			return self.get_paginated_response(fragmentos.renderizar(page))
+		if en_partes(request):
+			return StreamingHttpResponse(fragmentos.en_partes(llaves), content_type='application/json')
+		return Response(fragmentos.renderizar(llaves))
+
+
+
 # ==================== VIEWSETS ====================
 
-class ObraViewSet(viewsets.ModelViewSet):
+class ObraViewSet(CamposDispersosMixin, viewsets.ModelViewSet):
 	"""ViewSet básico para CRUD de obras (legacy)"""
 	queryset = Obra.objects.all()
 	serializer_class = ObraSerializer
@@ -51,14 +145,9 @@ class DashboardResumenView(APIView):
 
 		# KPI 2: Presupuesto Total
 		# Regla: Si Modificado (Col H) > 0, usarlo. Si no, usar Anteproyecto (Col I).
+		# (columna derivada presupuesto_efectivo)
 		agregados = Obra.objects.aggregate(
-			presupuesto_total=Sum(
-				Case(
-					When(presupuesto_modificado__gt=0, then=F('presupuesto_modificado')),
-					default=F('anteproyecto_total'),
-					output_field=DecimalField()
-				)
-			),
+			presupuesto_total=Sum('presupuesto_efectivo', output_field=DecimalField()),
 			# KPI 3: Beneficiarios (Suma de la columna limpiada 'beneficiarios_num')
 			total_beneficiarios=Sum('beneficiarios_num')
 		)
@@ -97,9 +186,11 @@ class DashboardTerritorialView(APIView):
     Endpoint V2: Estadísticas Territoriales Pre-calculadas.
     Reemplaza: src/lib/territoryCalculations.ts
     
-    Feature Flag: Soporta ?version=v2 para testing A/B
-    - v1 (default): Python iteration (compatible con legacy)
-    - v2: SQL-optimized (83% más rápido)
+    Las zonas de cada obra se calculan al importar/guardar (puente ObraZona):
+    la respuesta es un GROUP BY zona.
+    
+    Feature Flag: Soporta ?version=v2 para testing A/B (ambas versiones
+    usan hoy la misma agregación; se conserva por compatibilidad)
     """
     def get(self, request):
         from .services import calculate_territorial_stats, calculate_territorial_stats_v2
@@ -114,12 +205,7 @@ class DashboardTerritorialView(APIView):
         if use_v2:
             data = calculate_territorial_stats_v2(qs)
         else:
-            # V1: Lógica legacy (mantiene compatibilidad)
-            qs_optimized = qs.only(
-                'ubicacion_especifica', 'alcance_territorial',
-                'presupuesto_modificado', 'anteproyecto_total', 'beneficiarios_num'
-            )
-            data = calculate_territorial_stats(qs_optimized)
+            data = calculate_territorial_stats(qs)
         
         # Metadata para debugging/monitoring
         response_data = {
@@ -136,24 +222,7 @@ class DashboardTerritorialView(APIView):
 
 # ==================== SPRINT 2: FILTRADO SERVERSIDE ====================
 
-class StandardResultsSetPagination(PageNumberPagination):
-    """
-    Paginación estándar para endpoints V2.
-    Permite ajustar page_size dinámicamente desde query params.
-    """
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-    
-    def get_page_size(self, request):
-        # Soporte para 'todos' los resultados (sin paginación)
-        page_size_param = request.query_params.get(self.page_size_query_param)
-        if page_size_param == 'todos':
-            return None  # Sin paginación
-        return super().get_page_size(request)
-
-
-class ObraFilteredViewSet(viewsets.ReadOnlyModelViewSet):
+class ObraFilteredViewSet(CamposDispersosMixin, viewsets.ReadOnlyModelViewSet):
     """
     V2 Endpoint: Filtrado, ordenamiento y paginación en el servidor.
     
@@ -166,10 +235,12 @@ class ObraFilteredViewSet(viewsets.ReadOnlyModelViewSet):
     - direccion: Área responsable
     - days_threshold: Próximos N días (para entregas cercanas)
     - year: Filtrar por año de ejecución
+    - alcaldia: Alcaldía(s) del catálogo, separadas por coma
     - search: Búsqueda en programa, ubicación, etc.
     - ordering: Campo para ordenar (fecha_inicio_prog, -avance_fisico_pct)
     - page: Número de página
     - page_size: Resultados por página (o 'todos')
+    - fields: Campos a devolver (programa,avance_fisico_pct,... o 'lista')
     """
     queryset = Obra.objects.all()
     serializer_class = ObraSerializer
@@ -227,18 +298,18 @@ class ObraFilteredViewSet(viewsets.ReadOnlyModelViewSet):
         search_term = self.request.query_params.get('search')
         if search_term:
             # Normalizar término de búsqueda (sin acentos, minúsculas)
-            search_normalized = normalizar_texto(search_term)
+            search_normalized = normalizar_texto(search_term.strip())
             
-            # ESTRATEGIA: Como SQLite no tiene unaccent, buscamos múltiples variantes
-            # del término con y sin acentos comunes
-            search_variants = self._generate_search_variants(search_term)
+            # Programa y ubicación tienen columna normalizada: una sola comparación
+            search_query = (
+                Q(programa_norm__contains=search_normalized) |
+                Q(ubicacion_norm__contains=search_normalized)
+            )
             
-            # Campos donde buscar
-            search_query = Q()
-            search_fields = [
-                'programa', 'ubicacion_especifica', 'area_responsable',
-                'tipo_obra', 'responsable_operativo'
-            ]
+            # ESTRATEGIA: Como SQLite no tiene unaccent, en el resto de campos
+            # buscamos múltiples variantes del término con y sin acentos comunes
+            search_variants = self._generate_search_variants(search_term)
+            search_fields = ['area_responsable', 'tipo_obra', 'responsable_operativo']
             
             # Buscar cada variante en cada campo
             for variant in search_variants:
@@ -248,47 +319,13 @@ class ObraFilteredViewSet(viewsets.ReadOnlyModelViewSet):
             qs = qs.filter(search_query).distinct()
         
         # FILTRO 1: Estado del proyecto
-        # IMPORTANTE: Como estatus_general se calcula dinámicamente en el serializer,
-        # necesitamos aplicar la misma lógica aquí usando filtros de Django
+        # Columna indexada estatus_calculado (mismas reglas que el serializer;
+        # el comando recalcular_estatus la pone al día cada día, no la petición)
         status = self.request.query_params.get('status')
         if status and status != 'todos' and status != 'all':
             status_normalized = status.lower().strip().replace(' ', '_')
-            
-            # Aplicar lógica de cálculo de estatus usando Query expressions
-            from datetime import date
-            today = date.today()
-            
-            if status_normalized == 'completado':
-                # Avance físico >= 100%
-                qs = qs.filter(avance_fisico_pct__gte=100)
-            
-            elif status_normalized == 'en_riesgo':
-                # Riesgo > 3 y no completado
-                qs = qs.filter(riesgo_nivel__gt=3, avance_fisico_pct__lt=100)
-            
-            elif status_normalized == 'retrasado':
-                # Fecha inicio real pasada, sin avance, no en riesgo, no completado
-                qs = qs.filter(
-                    fecha_inicio_real__lte=today,
-                    avance_fisico_pct=0,
-                    riesgo_nivel__lte=3
-                )
-            
-            elif status_normalized == 'en_ejecucion':
-                # Tiene avance > 0, no completado, no en riesgo alto
-                qs = qs.filter(
-                    avance_fisico_pct__gt=0,
-                    avance_fisico_pct__lt=100,
-                    riesgo_nivel__lte=3
-                )
-            
-            elif status_normalized == 'planificado':
-                # Sin fecha inicio real o fecha futura, sin avance
-                qs = qs.filter(
-                    Q(fecha_inicio_real__isnull=True) | Q(fecha_inicio_real__gt=today),
-                    avance_fisico_pct=0,
-                    riesgo_nivel__lte=3
-                )
+            if status_normalized in ESTATUS_PROYECTO:
+                qs = qs.filter(estatus_calculado=status_normalized)
         
         # FILTRO 2: Dirección/Área responsable
         direccion = self.request.query_params.get('direccion')
@@ -385,74 +422,19 @@ class ObraFilteredViewSet(viewsets.ReadOnlyModelViewSet):
             # Soporta múltiples valores separados por coma: "baja,media"
             viabilidades = [v.strip() for v in viabilidad_filter.split(',')]
             
-            # Implementación SQL eficiente usando CASE/WHEN
-            # Lógica: 1+ rojo = baja, 2+ amarillo = media, else alta
-            # (Q ya está importado al inicio del archivo)
-            
-            viabilidad_conditions = []
-            if 'baja' in viabilidades:
-                # 1 o más semáforos ROJOS
-                viabilidad_conditions.append(
-                    Q(viabilidad_tecnica_semaforo__iexact='rojo') |
-                    Q(viabilidad_presupuestal_semaforo__iexact='rojo') |
-                    Q(viabilidad_juridica_semaforo__iexact='rojo') |
-                    Q(viabilidad_temporal_semaforo__iexact='rojo') |
-                    Q(viabilidad_administrativa_semaforo__iexact='rojo')
-                )
-            
-            if 'media' in viabilidades:
-                # 2+ AMARILLOS y NO ROJOS
-                viabilidad_conditions.append(
-                    ~Q(viabilidad_tecnica_semaforo__iexact='rojo') &
-                    ~Q(viabilidad_presupuestal_semaforo__iexact='rojo') &
-                    ~Q(viabilidad_juridica_semaforo__iexact='rojo') &
-                    ~Q(viabilidad_temporal_semaforo__iexact='rojo') &
-                    ~Q(viabilidad_administrativa_semaforo__iexact='rojo') &
-                    (
-                        (Q(viabilidad_tecnica_semaforo__iexact='amarillo') & Q(viabilidad_presupuestal_semaforo__iexact='amarillo')) |
-                        (Q(viabilidad_tecnica_semaforo__iexact='amarillo') & Q(viabilidad_juridica_semaforo__iexact='amarillo')) |
-                        (Q(viabilidad_tecnica_semaforo__iexact='amarillo') & Q(viabilidad_temporal_semaforo__iexact='amarillo')) |
-                        (Q(viabilidad_tecnica_semaforo__iexact='amarillo') & Q(viabilidad_administrativa_semaforo__iexact='amarillo')) |
-                        (Q(viabilidad_presupuestal_semaforo__iexact='amarillo') & Q(viabilidad_juridica_semaforo__iexact='amarillo')) |
-                        (Q(viabilidad_presupuestal_semaforo__iexact='amarillo') & Q(viabilidad_temporal_semaforo__iexact='amarillo')) |
-                        (Q(viabilidad_presupuestal_semaforo__iexact='amarillo') & Q(viabilidad_administrativa_semaforo__iexact='amarillo')) |
-                        (Q(viabilidad_juridica_semaforo__iexact='amarillo') & Q(viabilidad_temporal_semaforo__iexact='amarillo')) |
-                        (Q(viabilidad_juridica_semaforo__iexact='amarillo') & Q(viabilidad_administrativa_semaforo__iexact='amarillo')) |
-                        (Q(viabilidad_temporal_semaforo__iexact='amarillo') & Q(viabilidad_administrativa_semaforo__iexact='amarillo'))
-                    )
-                )
-            
-            if 'alta' in viabilidades:
-                # Todos VERDES (no rojos ni suficientes amarillos)
-                viabilidad_conditions.append(
-                    ~Q(viabilidad_tecnica_semaforo__iexact='rojo') &
-                    ~Q(viabilidad_presupuestal_semaforo__iexact='rojo') &
-                    ~Q(viabilidad_juridica_semaforo__iexact='rojo') &
-                    ~Q(viabilidad_temporal_semaforo__iexact='rojo') &
-                    ~Q(viabilidad_administrativa_semaforo__iexact='rojo') &
-                    (
-                        # Menos de 2 amarillos
-                        ~(
-                            (Q(viabilidad_tecnica_semaforo__iexact='amarillo') & Q(viabilidad_presupuestal_semaforo__iexact='amarillo')) |
-                            (Q(viabilidad_tecnica_semaforo__iexact='amarillo') & Q(viabilidad_juridica_semaforo__iexact='amarillo')) |
-                            (Q(viabilidad_tecnica_semaforo__iexact='amarillo') & Q(viabilidad_temporal_semaforo__iexact='amarillo')) |
-                            (Q(viabilidad_tecnica_semaforo__iexact='amarillo') & Q(viabilidad_administrativa_semaforo__iexact='amarillo')) |
-                            (Q(viabilidad_presupuestal_semaforo__iexact='amarillo') & Q(viabilidad_juridica_semaforo__iexact='amarillo')) |
-                            (Q(viabilidad_presupuestal_semaforo__iexact='amarillo') & Q(viabilidad_temporal_semaforo__iexact='amarillo')) |
-                            (Q(viabilidad_presupuestal_semaforo__iexact='amarillo') & Q(viabilidad_administrativa_semaforo__iexact='amarillo')) |
-                            (Q(viabilidad_juridica_semaforo__iexact='amarillo') & Q(viabilidad_temporal_semaforo__iexact='amarillo')) |
-                            (Q(viabilidad_juridica_semaforo__iexact='amarillo') & Q(viabilidad_administrativa_semaforo__iexact='amarillo')) |
-                            (Q(viabilidad_temporal_semaforo__iexact='amarillo') & Q(viabilidad_administrativa_semaforo__iexact='amarillo'))
-                        )
-                    )
-                )
-            
-            if viabilidad_conditions:
-                # Combinar condiciones con OR
-                combined_q = viabilidad_conditions[0]
-                for condition in viabilidad_conditions[1:]:
-                    combined_q |= condition
-                qs = qs.filter(combined_q)
+            # Columna derivada indexada (utils.campos_derivados):
+            # 1+ rojo = baja, 2+ amarillo = media, else alta
+            viabilidades = [v for v in viabilidades if v in ('baja', 'media', 'alta')]
+            if viabilidades:
+                qs = qs.filter(viabilidad_global__in=viabilidades)
+        
+        # FILTRO 8: Alcaldía del catálogo ("Iztapalapa", "alvaro obregon,tlahuac")
+        # El texto se resuelve igual que en la importación; el filtro es un join
+        # por poa_obraalc_alc_idx en lugar de buscar en Obra.alcaldias
+        alcaldia_filter = self.request.query_params.get('alcaldia')
+        if alcaldia_filter and alcaldia_filter != 'todos':
+            ids = [ID_ALCALDIA[alcaldia] for alcaldia in resolver_alcaldias(normalizar_texto(alcaldia_filter))]
+            qs = qs.filter(pk__in=ObraAlcaldia.objects.filter(alcaldia__in=ids).values('obra'))
         
         return qs
     
@@ -460,15 +442,15 @@ class ObraFilteredViewSet(viewsets.ReadOnlyModelViewSet):
         """
         Override para agregar metadata útil en la respuesta.
         """
-        queryset = self.filter_queryset(self.get_queryset())
+        fragmentos = CacheFragmentos(self.campos)
+        queryset = fragmentos.llaves(self.filter_queryset(self.get_queryset()))
         
         # Metadata: conteo total antes de paginar
         total_count = queryset.count()
         
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            response = self.get_paginated_response(serializer.data)
+            response = self.get_paginated_response(fragmentos.renderizar(page))
             
             # Agregar metadata personalizada
             response.data['_meta'] = {
@@ -478,20 +460,24 @@ class ObraFilteredViewSet(viewsets.ReadOnlyModelViewSet):
             }
             return response
         
-        serializer = self.get_serializer(queryset, many=True)
+        meta = {
+            'total_count': total_count,
+            'filters_applied': self._get_active_filters(),
+            'timestamp': timezone.now().isoformat()
+        }
+        if en_partes(request):
+            return StreamingHttpResponse(
+                fragmentos.en_partes(queryset, {'_meta': meta}), content_type='application/json'
+            )
         return Response({
-            'results': serializer.data,
-            '_meta': {
-                'total_count': total_count,
-                'filters_applied': self._get_active_filters(),
-                'timestamp': timezone.now().isoformat()
-            }
+            'results': fragmentos.renderizar(queryset),
+            '_meta': meta
         })
     
     def _get_active_filters(self):
         """Helper para debugging: qué filtros están activos"""
         active = {}
-        for key in ['status', 'direccion', 'eje_institucional', 'days_threshold', 'year', 'has_milestones', 'score_range', 'viabilidad']:
+        for key in ['status', 'direccion', 'eje_institucional', 'days_threshold', 'year', 'has_milestones', 'score_range', 'viabilidad', 'alcaldia']:
             value = self.request.query_params.get(key)
             if value and value != 'todos':
                 active[key] = value
@@ -508,19 +494,8 @@ class BudgetByDirectionView(APIView):
     def get(self, request):
         # Agregación SQL nativa
         result = Obra.objects.values('area_responsable').annotate(
-            total_budget=Sum(
-                Case(
-                    When(presupuesto_modificado__gt=0, then=F('presupuesto_modificado')),
-                    default=F('anteproyecto_total'),
-                    output_field=DecimalField()
-                )
-            ),
-            total_executed=Sum(
-                Case(
-                    When(presupuesto_modificado__gt=0, then=F('presupuesto_modificado')),
-                    default=F('anteproyecto_total')
-                ) * F('avance_financiero_pct') / 100.0
-            ),
+            total_budget=Sum('presupuesto_efectivo', output_field=DecimalField()),
+            total_executed=Sum('monto_ejecutado'),
             project_count=Count('id')
         ).filter(
             area_responsable__isnull=False
@@ -618,6 +593,11 @@ class RecentActivityView(APIView):
         })
 
 
+# Atención prioritaria: Puntuación > 3 Y Viabilidad Baja o Media
+# (predicado sobre la columna derivada viabilidad_global)
+FILTRO_ATENCION_PRIORITARIA = Q(puntuacion_final_ponderada__gt=3.0, viabilidad_global__in=['baja', 'media'])
+
+
 class DynamicKPIsView(APIView):
     """
     KPIs dinámicos con comparación temporal y tendencias.
@@ -634,143 +614,64 @@ class DynamicKPIsView(APIView):
     def get(self, request):
         now = timezone.now()
         
-        # Proyectos actuales
-        current_projects = Obra.objects.count()
-        
-        # Proyectos activos (no completados)
-        active_projects = Obra.objects.exclude(
-            avance_fisico_pct__gte=100
-        ).count()
-        
-        # Zonas únicas (alcaldías)
-        # Nota: alcaldias puede tener múltiples alcaldías separadas por comas
-        all_alcaldias = Obra.objects.filter(
-            alcaldias__isnull=False
-        ).exclude(
-            alcaldias=''
-        ).values_list('alcaldias', flat=True)
-        
-        # Extraer alcaldías únicas (pueden venir separadas por comas)
-        unique_zones = set()
-        for alcaldias_str in all_alcaldias:
-            if alcaldias_str:
-                # Split por comas y limpiar espacios
-                alcaldias_list = [a.strip() for a in str(alcaldias_str).split(',')]
-                unique_zones.update(alcaldias_list)
-        
-        # Presupuesto total
-        presupuesto_agg = Obra.objects.aggregate(
-            total=Sum(
-                Case(
-                    When(presupuesto_modificado__gt=0, then=F('presupuesto_modificado')),
-                    default=F('anteproyecto_total'),
-                    output_field=DecimalField()
-                )
-            )
-        )
-        
-        # Presupuesto ejecutado (calculado por separado para evitar conflictos de tipos)
-        ejecutado_agg = Obra.objects.aggregate(
-            ejecutado=Sum(
-                Case(
-                    When(presupuesto_modificado__gt=0, 
-                         then=F('presupuesto_modificado') * F('avance_financiero_pct') / Value(100.0)),
-                    default=F('anteproyecto_total') * F('avance_financiero_pct') / Value(100.0),
-                    output_field=DecimalField()
-                )
-            )
+        # Una petición GET solo lee: estatus_calculado lo pone al día el
+        # comando recalcular_estatus (cron diario)
+        
+        # Totales, presupuesto, avance, beneficiarios, distribución por estado y
+        # atención prioritaria en una sola consulta de agregación condicional
+        kpis = Obra.objects.aggregate(
+            total=Count('id'),
+            # Proyectos activos (no completados)
+            activos=Count('id', filter=~Q(avance_fisico_pct__gte=100)),
+            # Presupuesto total y ejecutado (columnas derivadas)
+            presupuesto=Sum('presupuesto_efectivo', output_field=DecimalField()),
+            ejecutado=Sum('monto_ejecutado', output_field=DecimalField()),
+            avance=Sum('avance_fisico_pct') / Count('id'),
+            beneficiarios=Sum('beneficiarios_num'),
+            criticos=Count('id', filter=FILTRO_ATENCION_PRIORITARIA),
+            **{
+                f'estatus_{estatus}': Count('id', filter=Q(estatus_calculado=estatus))
+                for estatus in ESTATUS_PROYECTO
+            }
         )
         
-        total_budget = float(presupuesto_agg['total'] or 0)
-        total_executed = float(ejecutado_agg['ejecutado'] or 0)
-        
-        # Proyectos por estado - Usando función centralizada
-        from .utils import calcular_estatus_proyecto
-        
-        all_projects = Obra.objects.all()
-        status_counts = {
-            'planificado': 0,
-            'en_ejecucion': 0,
-            'en_riesgo': 0,
-            'retrasado': 0,
-            'completado': 0
-        }
-        
-        for obra in all_projects:
-            status = calcular_estatus_proyecto(obra)
-            status_counts[status] = status_counts.get(status, 0) + 1
+        current_projects = kpis['total']
+        active_projects = kpis['activos']
+        total_budget = float(kpis['presupuesto'] or 0)
+        total_executed = float(kpis['ejecutado'] or 0)
+        avg_progress = kpis['avance'] or 0
+        total_beneficiaries = kpis['beneficiarios'] or 0
+        critical_count = kpis['criticos']
         
+        status_counts = {estatus: kpis[f'estatus_{estatus}'] for estatus in ESTATUS_PROYECTO}
         by_status = [
             {'estatus_general': status, 'count': count}
             for status, count in status_counts.items()
             if count > 0
         ]
         
-        # Calcular avance promedio
-        avg_progress = Obra.objects.aggregate(
-            avg=Sum('avance_fisico_pct') / Count('id')
-        )['avg'] or 0
-        
-        # Calcular beneficiarios totales
-        total_beneficiaries = Obra.objects.aggregate(
-            total=Sum('beneficiarios_num')
-        )['total'] or 0
-        
-        # Proyectos críticos: Lógica robusta con múltiples criterios
-        critical_count = 0
-        critical_debug = []
-        all_projects_debug = []
-        
-        # Debug: Mostrar TODOS los proyectos primero
-        for obra in Obra.objects.all():
-            semaphores_raw = [
-                obra.viabilidad_tecnica_semaforo,
-                obra.viabilidad_presupuestal_semaforo,
-                obra.viabilidad_juridica_semaforo,
-                obra.viabilidad_temporal_semaforo,
-                obra.viabilidad_administrativa_semaforo
-            ]
-            semaphores = [(s or '').upper() for s in semaphores_raw]
-            reds = sum(1 for s in semaphores if s == 'ROJO')
-            yellows = sum(1 for s in semaphores if s == 'AMARILLO')
-            
-            all_projects_debug.append({
-                'id': obra.id,
-                'nombre': obra.programa[:50] if obra.programa else '',
-                'puntuacion': float(obra.puntuacion_final_ponderada or 0),
-                'riesgo': obra.riesgo_nivel or 0,
-                'dependencias': obra.dependencias_nivel or 0,
-                'rojos': reds,
-                'amarillos': yellows,
-                'semaforos_raw': semaphores_raw
-            })
+        # Alcaldías del catálogo con al menos una obra vinculada (join por
+        # poa_obraalc_alc_idx, sin partir el texto libre de Obra.alcaldias)
+        unique_zones = list(
+            Alcaldia.objects.filter(vinculos_obra__isnull=False)
+            .distinct().order_by('nombre').values_list('nombre', flat=True)
+        )
         
-        # Calcular proyectos de atención prioritaria
+        # Detalle de proyectos de atención prioritaria (solo esas filas y columnas)
         # Criterio simplificado: Puntuación > 3 Y Viabilidad Baja o Media
-        from .utils import calcular_viabilidad_global
-        
-        for obra in Obra.objects.all():
-            puntuacion = float(obra.puntuacion_final_ponderada or 0)
-            viabilidad = calcular_viabilidad_global(obra)
-            
-            # Criterio de atención prioritaria:
-            # Puntuación > 3 (Alta prioridad) Y viabilidad comprometida
-            es_critico = False
-            razon = []
-            
-            if puntuacion > 3.0 and viabilidad in ['baja', 'media']:
-                es_critico = True
-                razon.append(f'Puntuación alta ({puntuacion:.2f}) con viabilidad {viabilidad}')
-            
-            if es_critico:
-                critical_count += 1
-                critical_debug.append({
-                    'id': obra.id,
-                    'nombre': obra.programa[:50] if obra.programa else '',
-                    'puntuacion': puntuacion,
-                    'viabilidad': viabilidad,
-                    'razon': ' | '.join(razon)
-                })
+        criticos = Obra.objects.filter(FILTRO_ATENCION_PRIORITARIA).values_list(
+            'id', 'programa', 'puntuacion_final_ponderada', 'viabilidad_global'
+        ).order_by('id')
+        critical_debug = [
+            {
+                'id': obra_id,
+                'nombre': programa[:50] if programa else '',
+                'puntuacion': float(puntuacion or 0),
+                'viabilidad': viabilidad,
+                'razon': f'Puntuación alta ({float(puntuacion or 0):.2f}) con viabilidad {viabilidad}'
+            }
+            for obra_id, programa, puntuacion, viabilidad in criticos
+        ]
         
         return Response({
             'projects': {
@@ -781,7 +682,7 @@ class DynamicKPIsView(APIView):
             'zones': {
                 'total': len(unique_zones),
                 'label': 'Alcaldías',
-                'list': sorted(list(unique_zones))
+                'list': unique_zones
             },
             'budget': {
                 'total': total_budget,
@@ -825,34 +726,27 @@ class CriticalProjectsListView(APIView):
     
     Aplica lógica simplificada:
     - Puntuación > 3 Y Viabilidad Baja o Media
+    
+    ?fields= limita los campos devueltos (igual que /api/v2/obras/filtered/).
+    ?page_size= resultados por página (default 10, máximo 100).
     """
+    renderer_classes = [JSONFragmentosRenderer, BrowsableAPIRenderer]
     
     def get(self, request):
-        from .utils import calcular_viabilidad_global
-        
-        all_projects = Obra.objects.all()
-        critical_projects_list = []
-        
-        for obra in all_projects:
-            puntuacion = float(obra.puntuacion_final_ponderada or 0)
-            viabilidad = calcular_viabilidad_global(obra)
-            
-            # Criterio simplificado: Puntuación > 3 Y Viabilidad comprometida
-            if puntuacion > 3.0 and viabilidad in ['baja', 'media']:
-                critical_projects_list.append(obra)
-        
-        # Ordenar por puntuación descendente
-        critical_projects_list.sort(key=lambda x: x.puntuacion_final_ponderada or 0, reverse=True)
-        
-        # Serializar con paginación opcional
-        page_size = int(request.GET.get('page_size', 10))
-        paginator = PageNumberPagination()
-        paginator.page_size = page_size
+        campos = campos_solicitados(request)
+        # Criterio simplificado: Puntuación > 3 Y Viabilidad comprometida
+        # Ordenar por puntuación descendente (empates en orden de id)
+        critical_projects_list = Obra.objects.filter(
+            FILTRO_ATENCION_PRIORITARIA
+        ).order_by('-puntuacion_final_ponderada', 'id')
+        fragmentos = CacheFragmentos(campos)
+        critical_projects_list = fragmentos.llaves(critical_projects_list)
+        
+        # Paginación en SQL (LIMIT/OFFSET) con page_size acotado (máximo 100)
+        paginator = PaginacionAcotada()
         
         result_page = paginator.paginate_queryset(critical_projects_list, request)
-        serializer = ObraSerializer(result_page, many=True)
-        
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(fragmentos.renderizar(result_page))
 
 
 class TerritoryAggregationsView(APIView):
@@ -865,118 +759,48 @@ class TerritoryAggregationsView(APIView):
     - Beneficiarios por zona
     - Avance promedio por territorio
     
+    Las zonas salen del puente ObraZona (clasificador único
+    utils.zonas_territoriales): un GROUP BY zona y un conteo por alcance.
+    
     GET /api/v2/dashboard/territories/
     """
     
-    # Mapeo de alcaldías a zonas
-    ZONA_MAPPING = {
-        'Zona Norte': ['Gustavo A. Madero', 'Azcapotzalco'],
-        'Zona Sur': ['Tlalpan', 'Xochimilco', 'Milpa Alta'],
-        'Centro Histórico': ['Cuauhtémoc', 'Benito Juárez', 'Coyoacán'],
-        'Zona Oriente': ['Iztapalapa', 'Iztacalco', 'Venustiano Carranza', 'Tláhuac'],
-        'Zona Poniente': ['Miguel Hidalgo', 'Cuajimalpa de Morelos', 'Álvaro Obregón', 'La Magdalena Contreras']
-    }
+    # Nombre de las obras sin zona en esta vista
+    POR_ASIGNAR = 'Por Asignar'
     
     def get(self, request):
-        # Obtener todas las obras
-        obras = Obra.objects.all()
-        
-        # Inicializar estadísticas por zona
-        zone_stats = {
-            'Zona Norte': {'projects': 0, 'total_budget': 0, 'beneficiaries': 0, 'progress_list': []},
-            'Zona Sur': {'projects': 0, 'total_budget': 0, 'beneficiaries': 0, 'progress_list': []},
-            'Centro Histórico': {'projects': 0, 'total_budget': 0, 'beneficiaries': 0, 'progress_list': []},
-            'Zona Oriente': {'projects': 0, 'total_budget': 0, 'beneficiaries': 0, 'progress_list': []},
-            'Zona Poniente': {'projects': 0, 'total_budget': 0, 'beneficiaries': 0, 'progress_list': []},
-            'Por Asignar': {'projects': 0, 'total_budget': 0, 'beneficiaries': 0, 'progress_list': []}
-        }
-        
-        # Inicializar contadores de alcance territorial
-        scope_stats = {
-            'una_alcaldia': 0,
-            'multiples_alcaldias': 0,
-            'ciudad_completa': 0,
-            'sin_asignar': 0
-        }
-        
-        for obra in obras:
-            alcaldias_str = (obra.alcaldias or '').strip()
-            alcance = (obra.alcance_territorial or '').strip()
-            presupuesto = obra.presupuesto_modificado if obra.presupuesto_modificado and obra.presupuesto_modificado > 0 else (obra.anteproyecto_total or 0)
-            beneficiarios = obra.beneficiarios_num or 0
-            avance = obra.avance_fisico_pct or 0
-            
-            # Normalizar textos para mejor matching (sin tildes, minúsculas)
-            alcaldias_norm = normalizar_texto(alcaldias_str) if alcaldias_str else ''
-            alcance_norm = normalizar_texto(alcance) if alcance else ''
-            
-            # Determinar zonas afectadas usando alcance_territorial y alcaldias
-            zonas_afectadas = []
-            
-            # Caso 1: Toda la ciudad - búsqueda flexible
-            # Detecta: "toda la ciudad", "16 alcaldías", "todas", "completa", etc.
-            is_toda_ciudad = (
-                'toda' in alcance_norm or 
-                'toda' in alcaldias_norm or 
-                '16' in alcance_norm or 
-                '16' in alcaldias_norm or
-                'completa' in alcance_norm or
-                'todas' in alcance_norm or
-                'todas' in alcaldias_norm or
-                'ciudad' in alcance_norm or
-                'cdmx' in alcance_norm
-            )
-            
-            if is_toda_ciudad:
-                zonas_afectadas = ['Zona Norte', 'Zona Sur', 'Centro Histórico', 'Zona Oriente', 'Zona Poniente']
-            # Caso 2: Múltiples alcaldías o una alcaldía - buscar en el texto
-            else:
-                # Buscar alcaldías tanto en alcaldias_str como en alcance_territorial
-                texto_busqueda = f"{alcaldias_norm} {alcance_norm}"
-                for zona, alcaldias in self.ZONA_MAPPING.items():
-                    for alcaldia in alcaldias:
-                        # Normalizar nombre de alcaldía para matching
-                        alcaldia_norm = normalizar_texto(alcaldia)
-                        if alcaldia_norm in texto_busqueda:
-                            if zona not in zonas_afectadas:
-                                zonas_afectadas.append(zona)
-            
-            # Si NO se encontraron zonas específicas, marcar como "Por Asignar"
-            # Esto asegura transparencia en proyectos sin ubicación definida
-            if not zonas_afectadas:
-                zonas_afectadas = ['Por Asignar']
-                scope_stats['sin_asignar'] += 1
-            elif 'Por Asignar' not in zonas_afectadas:
-                # Clasificar el alcance del proyecto
-                if is_toda_ciudad:
-                    scope_stats['ciudad_completa'] += 1
-                elif len(zonas_afectadas) == 1:
-                    scope_stats['una_alcaldia'] += 1
-                else:
-                    scope_stats['multiples_alcaldias'] += 1
-            
-            # Distribuir entre zonas afectadas
-            # El presupuesto se prorrateo para que la suma total sea correcta
-            factor = 1.0 / len(zonas_afectadas)
-            for zona in zonas_afectadas:
-                zone_stats[zona]['projects'] += 1
-                zone_stats[zona]['total_budget'] += float(presupuesto) * factor
-                zone_stats[zona]['beneficiaries'] += beneficiarios * factor
-                zone_stats[zona]['progress_list'].append(avance)
+        # 1. Estadísticas por zona (presupuesto y beneficiarios prorrateados)
+        vacia = {'projects': 0, 'total_budget': 0, 'beneficiaries': 0, 'avg_progress': 0}
+        zone_stats = {zona: vacia for zona in (*ZONAS, ZONA_SIN_ASIGNAR)}
+        filas = ObraZona.objects.values('zona').annotate(
+            projects=Count('obra'),
+            total_budget=Sum(F('obra__presupuesto_efectivo') * F('peso')),
+            beneficiaries=Sum(F('obra__beneficiarios_num') * F('peso')),
+            avg_progress=Avg(Coalesce('obra__avance_fisico_pct', Value(0.0))),
+        )
+        for fila in filas:
+            zone_stats[fila['zona']] = fila
+        
+        # 2. Alcance territorial: una obra cuenta una sola vez
+        sin_asignar = Q(zona=ZONA_SIN_ASIGNAR)
+        scope_stats = ObraZona.objects.aggregate(
+            una_alcaldia=Count('obra', filter=Q(peso=1.0) & ~sin_asignar),
+            multiples_alcaldias=Count('obra', distinct=True, filter=Q(peso__lt=1.0, ciudad_completa=False)),
+            ciudad_completa=Count('obra', distinct=True, filter=Q(ciudad_completa=True)),
+            sin_asignar=Count('obra', filter=sin_asignar),
+        )
         
         # Formatear resultados
         result = []
         for zona_name, stats in zone_stats.items():
-            progress_list = stats['progress_list']
-            avg_progress = sum(progress_list) / len(progress_list) if progress_list else 0
-            
+            total_budget = stats['total_budget'] or 0
             result.append({
-                'name': zona_name,
+                'name': self.POR_ASIGNAR if zona_name == ZONA_SIN_ASIGNAR else zona_name,
                 'projects': stats['projects'],
-                'total_budget': round(stats['total_budget'], 2),
-                'beneficiaries': round(stats['beneficiaries']),
-                'avg_progress': round(avg_progress, 2),
-                'formatted_budget': f"${stats['total_budget']:,.0f}"
+                'total_budget': round(total_budget, 2),
+                'beneficiaries': round(stats['beneficiaries'] or 0),
+                'avg_progress': round(stats['avg_progress'] or 0, 2),
+                'formatted_budget': f"${total_budget:,.0f}"
             })
         
         return Response({
@@ -1004,46 +828,70 @@ class RiskAnalysisView(APIView):
     
     GET /api/v2/dashboard/risk-analysis/
     """
+
+    # Columnas que lee el recorrido único (values(), sin instanciar modelos)
+    CAMPOS = (
+        'id', 'programa', 'responsable_operativo', 'area_responsable',
+        'viabilidad_global', 'prioridad_label', 'puntuacion_final_ponderada',
+        'viabilidad_tecnica_semaforo', 'viabilidad_presupuestal_semaforo',
+        'viabilidad_juridica_semaforo', 'viabilidad_temporal_semaforo',
+        'viabilidad_administrativa_semaforo', 'riesgos_lista',
+        'avance_fisico_pct', 'avance_financiero_pct', 'presupuesto_efectivo',
+        'acciones_correctivas',
+    )
     
     def get(self, request):
         try:
+            # Un solo recorrido: proyectos de la matriz y proyectos con semáforo
+            # técnico o presupuestal en rojo (candidatos a mitigación)
+            en_matriz = Q(viabilidad_global__in=['baja', 'media'], puntuacion_final_ponderada__gte=3.0)
+            filas = Obra.objects.filter(
+                en_matriz | Q(viabilidad_tecnica_semaforo='ROJO') | Q(viabilidad_presupuestal_semaforo='ROJO')
+            ).order_by('id').values(*self.CAMPOS)
+
             # 1. MATRIZ DE RIESGOS
             # Filtrar proyectos con: (viabilidad baja O media) Y (prioridad >= 3)
-            # Usa cálculos centralizados del backend (utils.py)
-            from .utils import calcular_viabilidad_global, obtener_etiqueta_prioridad
-            
+            # Usa las columnas derivadas (utils.campos_derivados) como predicado
             matrix_projects = []
-            for obra in Obra.objects.all():
-                score = float(obra.puntuacion_final_ponderada or 0)
-                viabilidad_global = calcular_viabilidad_global(obra)
-                prioridad_label = obtener_etiqueta_prioridad(score)
-                
-                # Incluir si: (viabilidad baja O media) Y prioridad >= 3
-                if (viabilidad_global in ['baja', 'media']) and score >= 3.0:
+            mitigation_projects = []
+            for obra in filas:
+                puntuacion = obra['puntuacion_final_ponderada']
+                if obra['viabilidad_global'] in ('baja', 'media') and puntuacion is not None and puntuacion >= 3.0:
                     # Usar responsable_operativo (nombre persona) o area_responsable (departamento)
                     # Si se usa area_responsable, capitalizarla para que no esté todo en mayúsculas
-                    from .utils import capitalizar_texto
-                    responsable = obra.responsable_operativo if obra.responsable_operativo else capitalizar_texto(obra.area_responsable or '')
-                    
+                    responsable = obra['responsable_operativo'] or capitalizar_texto(obra['area_responsable'] or '')
+
                     matrix_projects.append({
-                        'id': obra.id,
-                        'nombre': obra.programa,
+                        'id': obra['id'],
+                        'nombre': obra['programa'],
                         'responsable': responsable,
-                        'direccion': obra.area_responsable,
-                        'viabilidad': viabilidad_global,
-                        'prioridad_label': prioridad_label,
-                        'score': score,
+                        'direccion': obra['area_responsable'],
+                        'viabilidad': obra['viabilidad_global'],
+                        'prioridad_label': obra['prioridad_label'],
+                        'score': float(puntuacion),
                         'semaphores': {
-                            'tecnica': (obra.viabilidad_tecnica_semaforo or 'GRIS').upper(),
-                            'presupuestal': (obra.viabilidad_presupuestal_semaforo or 'GRIS').upper(),
-                            'juridica': (obra.viabilidad_juridica_semaforo or 'GRIS').upper(),
-                            'temporal': (obra.viabilidad_temporal_semaforo or 'GRIS').upper(),
-                            'administrativa': (obra.viabilidad_administrativa_semaforo or 'GRIS').upper()
+                            'tecnica': (obra['viabilidad_tecnica_semaforo'] or 'GRIS').upper(),
+                            'presupuestal': (obra['viabilidad_presupuestal_semaforo'] or 'GRIS').upper(),
+                            'juridica': (obra['viabilidad_juridica_semaforo'] or 'GRIS').upper(),
+                            'temporal': (obra['viabilidad_temporal_semaforo'] or 'GRIS').upper(),
+                            'administrativa': (obra['viabilidad_administrativa_semaforo'] or 'GRIS').upper()
                         },
-                        'riesgos': self._parse_riesgos(obra.problemas_identificados),
-                        'avance': float(obra.avance_fisico_pct or 0),
-                        'avance_financiero': float(obra.avance_financiero_pct or 0),
-                        'presupuesto': float(obra.presupuesto_modificado if obra.presupuesto_modificado and obra.presupuesto_modificado > 0 else (obra.anteproyecto_total or 0))
+                        # Separados al importar (utils.parsear_riesgos)
+                        'riesgos': obra['riesgos_lista'],
+                        'avance': float(obra['avance_fisico_pct'] or 0),
+                        'avance_financiero': float(obra['avance_financiero_pct'] or 0),
+                        'presupuesto': float(obra['presupuesto_efectivo'])
+                    })
+
+                # 3. PROYECTOS CON MITIGACIÓN (matriz o semáforo en rojo)
+                acciones = obra['acciones_correctivas'] or ''
+                if acciones.strip():
+                    mitigation_projects.append({
+                        'id': obra['id'],
+                        'nombre': obra['programa'],
+                        'acciones': acciones,
+                        'responsable': obra['area_responsable'],
+                        'avance': float(obra['avance_fisico_pct'] or 0)
                     })
             
             # Ordenar por viabilidad (baja primero)
@@ -1062,30 +910,21 @@ class RiskAnalysisView(APIView):
                         'direccion': project['direccion']
                     })
             
-            # 3. PROYECTOS CON MITIGACIÓN
-            matrix_ids = [p['id'] for p in matrix_projects]
-            mitigation_projects = []
-            
-            for obra in Obra.objects.filter(
-                Q(id__in=matrix_ids) | Q(viabilidad_tecnica_semaforo='ROJO') | Q(viabilidad_presupuestal_semaforo='ROJO')
-            ):
-                acciones = obra.acciones_correctivas or ''
-                if acciones.strip():
-                    mitigation_projects.append({
-                        'id': obra.id,
-                        'nombre': obra.programa,
-                        'acciones': acciones,
-                        'responsable': obra.area_responsable,
-                        'avance': float(obra.avance_fisico_pct or 0)
-                    })
-            
             # 4. CATEGORÍAS CON CONTADORES
+            # Un solo aggregate con un conteo condicional por categoría
+            conteos = Obra.objects.aggregate(
+                critica=Count('id', filter=Q(puntuacion_final_ponderada__gte=4.5)),
+                muy_alta=Count('id', filter=Q(puntuacion_final_ponderada__gte=3.5, puntuacion_final_ponderada__lt=4.5)),
+                alta=Count('id', filter=Q(puntuacion_final_ponderada__gte=2.5, puntuacion_final_ponderada__lt=3.5)),
+                media=Count('id', filter=Q(puntuacion_final_ponderada__gte=1.5, puntuacion_final_ponderada__lt=2.5)),
+                baja=Count('id', filter=Q(puntuacion_final_ponderada__lt=1.5)),
+            )
             categories = [
-                {'name': 'Crítica', 'count': Obra.objects.filter(puntuacion_final_ponderada__gte=4.5).count()},
-                {'name': 'Muy Alta', 'count': Obra.objects.filter(puntuacion_final_ponderada__gte=3.5, puntuacion_final_ponderada__lt=4.5).count()},
-                {'name': 'Alta', 'count': Obra.objects.filter(puntuacion_final_ponderada__gte=2.5, puntuacion_final_ponderada__lt=3.5).count()},
-                {'name': 'Media', 'count': Obra.objects.filter(puntuacion_final_ponderada__gte=1.5, puntuacion_final_ponderada__lt=2.5).count()},
-                {'name': 'Baja', 'count': Obra.objects.filter(puntuacion_final_ponderada__lt=1.5).count()},
+                {'name': 'Crítica', 'count': conteos['critica']},
+                {'name': 'Muy Alta', 'count': conteos['muy_alta']},
+                {'name': 'Alta', 'count': conteos['alta']},
+                {'name': 'Media', 'count': conteos['media']},
+                {'name': 'Baja', 'count': conteos['baja']},
             ]
             
             return Response({
@@ -1113,41 +952,77 @@ class RiskAnalysisView(APIView):
                 'categories': [],
                 'summary': {'total_matrix': 0, 'total_risks': 0, 'total_mitigations': 0}
             }, status=500)
-    
-    def _get_viabilidad_text(self, obra):
-        """Determina nivel de viabilidad basado en semáforos"""
-        semaphores = [
-            obra.viabilidad_tecnica_semaforo or 'VERDE',
-            obra.viabilidad_presupuestal_semaforo or 'VERDE',
-            obra.viabilidad_juridica_semaforo or 'VERDE'
-        ]
-        
-        if 'ROJO' in semaphores:
-            return 'baja'
-        elif semaphores.count('AMARILLO') >= 2:
-            return 'media'
-        else:
-            return 'alta'
-    
-    def _parse_riesgos(self, riesgos_str):
-        """Parsea string de riesgos a lista"""
-        if not riesgos_str:
-            return []
-        
-        # Separar por múltiples delimitadores: comas, punto y coma, saltos de línea, pipes
-        import re
-        riesgos = re.split(r'[,;\n\r|]+', str(riesgos_str))
-        # Limpiar espacios, eliminar guiones iniciales y filtrar vacíos
-        riesgos_limpios = []
-        for r in riesgos:
-            r = r.strip()
-            # Eliminar guiones y numeración al inicio (-, •, -, 1., etc.)
-            r = re.sub(r'^[-•\-\d\.\)\s]+', '', r).strip()
-            if r and len(r) > 3:  # Ignorar riesgos muy cortos (probablemente basura)
-                riesgos_limpios.append(r)
-        return riesgos_limpios[:10]  # Limitar a 10 riesgos máximo
 
 
+class RiskFrequencyView(APIView):
+    """
+    Frecuencia de riesgos identificados en toda la cartera.
+
+    Agrupa RiesgoIdentificado por su llave normalizada (índice
+    poa_riesgo_clave_idx) y desglosa los riesgos más frecuentes por dirección
+    y por prioridad. Todo se agrega en SQL: Python solo anida los resultados.
+
+    Parámetros:
+    - limit: número de riesgos más frecuentes (default 20, máximo 100)
+
+    GET /api/v2/dashboard/risk-frequencies/
+    """
+    LIMITE = 20
+    LIMITE_MAXIMO = 100
+
+    def get(self, request):
+        try:
+            limite = min(int(request.query_params.get('limit', self.LIMITE)), self.LIMITE_MAXIMO)
+        except ValueError:
+            limite = self.LIMITE
+        limite = max(limite, 1)
+
+        # 1. Riesgos más frecuentes (proyectos distintos que lo mencionan)
+        frecuencias = RiesgoIdentificado.objects.values('clave').annotate(
+            proyectos=Count('obra', distinct=True),
+            menciones=Count('id'),
+            descripcion=Min('descripcion'),
+        ).order_by('-proyectos', '-menciones', 'clave')[:limite]
+        risks = {
+            fila['clave']: {
+                'key': fila['clave'],
+                'risk': fila['descripcion'],
+                'projects': fila['proyectos'],
+                'mentions': fila['menciones'],
+                'by_area': [],
+                'by_priority': [],
+            }
+            for fila in frecuencias
+        }
+
+        # 2. Desglose de esos riesgos por dirección y por prioridad
+        seleccion = RiesgoIdentificado.objects.filter(clave__in=list(risks))
+        for campo, desglose, nombre in [
+            ('obra__area_responsable', 'by_area', 'area'),
+            ('obra__prioridad_label', 'by_priority', 'prioridad'),
+        ]:
+            filas = seleccion.values('clave', grupo=F(campo)).annotate(
+                proyectos=Count('obra', distinct=True)
+            ).order_by('clave', '-proyectos', 'grupo')
+            for fila in filas:
+                risks[fila['clave']][desglose].append({nombre: fila['grupo'], 'projects': fila['proyectos']})
+
+        totales = RiesgoIdentificado.objects.aggregate(
+            menciones=Count('id'),
+            distintos=Count('clave', distinct=True),
+            proyectos=Count('obra', distinct=True),
+        )
+
+        return Response({
+            'risks': list(risks.values()),
+            'summary': {
+                'total_mentions': totales['menciones'],
+                'distinct_risks': totales['distintos'],
+                'projects_with_risks': totales['proyectos'],
+            },
+            'timestamp': timezone.now().isoformat()
+        })
+
 # ==================== GENERACIÓN DE REPORTES ====================
 
 @api_view(['POST'])
@@ -1201,13 +1076,7 @@ def generar_reporte(request):
         # Calcular estadísticas
         agregados = queryset.aggregate(
             total_proyectos=Count('id'),
-            presupuesto_total=Sum(
-                Case(
-                    When(presupuesto_modificado__gt=0, then=F('presupuesto_modificado')),
-                    default=F('anteproyecto_total'),
-                    output_field=DecimalField()
-                )
-            ),
+            presupuesto_total=Sum('presupuesto_efectivo', output_field=DecimalField()),
             anteproyecto_total=Sum('anteproyecto_total'),
             total_beneficiarios=Sum('beneficiarios_num'),
             avance_promedio=Avg('avance_fisico_pct')
@@ -1223,18 +1092,14 @@ def generar_reporte(request):
             estado = item['estatus_general'] or 'Sin estado'
             por_estado[estado] = item['cantidad']
         
-        # Análisis territorial
-        por_alcaldia = {}
-        for obra in obras:
-            if obra.alcaldias:
-                alcaldias_list = str(obra.alcaldias).split(',')
-                for alc in alcaldias_list:
-                    alc_limpia = alc.strip()
-                    if alc_limpia:
-                        if alc_limpia not in por_alcaldia:
-                            por_alcaldia[alc_limpia] = {'cantidad': 0, 'presupuesto': 0}
-                        por_alcaldia[alc_limpia]['cantidad'] += 1
-                        por_alcaldia[alc_limpia]['presupuesto'] += obra.presupuesto_modificado or 0
+        # Análisis territorial: GROUP BY sobre el vínculo con el catálogo de alcaldías
+        por_alcaldia = {
+            item['alcaldia__nombre']: {'cantidad': item['cantidad'], 'presupuesto': item['presupuesto']}
+            for item in ObraAlcaldia.objects.filter(obra__in=queryset.values('pk'))
+            .values('alcaldia__nombre')
+            .annotate(cantidad=Count('obra'), presupuesto=Coalesce(Sum('obra__presupuesto_modificado'), 0.0))
+            .order_by('alcaldia')
+        }
         
         # Presupuesto ejecutado estimado
         presupuesto_ejecutado = 0
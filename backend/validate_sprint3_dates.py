@@ -1,6 +1,6 @@
 """
 Script de prueba para validar la normalización de fechas en Sprint 3.
-Prueba todos los formatos soportados por la función parse_date().
+Prueba todos los formatos soportados por parse_date() (poa/importacion/fechas.py).
 """
 
 import sys
@@ -33,102 +33,14 @@ def test_date_parsing():
         ("2026/01/15", "2026-01-15", "YYYY/MM/DD con /"),
         ("abril 2026", "2026-04-01", "Mes y año en español"),
         ("28 de noviembre de 2025", "2025-11-28", "Fecha completa en español"),
-        (45292, "2023-12-30", "Serial de Excel (int)"),
-        (45292.0, "2023-12-30", "Serial de Excel (float)"),
+        (45292, "2024-01-01", "Serial de Excel (int)"),
+        (45292.0, "2024-01-01", "Serial de Excel (float)"),
         ("", None, "String vacío"),
         (None, None, "None"),
     ]
     
-    # Importar función de parsing
-    import pandas as pd
-    from datetime import timedelta
-    
-    def parse_date(val):
-        """
-        Función de parsing copiada del comando de importación.
-        """
-        try:
-            if pd.isna(val) or val == '': 
-                return None
-            
-            # 1. Manejo de fecha serial de Excel (enteros/floats)
-            if isinstance(val, (int, float)) and not isinstance(val, bool):
-                return (datetime(1899, 12, 30) + timedelta(days=val)).date()
-            
-            # 2. Si ya es un objeto date o datetime, extraer date
-            if isinstance(val, datetime):
-                return val.date()
-            if hasattr(val, 'date'):  # pandas Timestamp
-                return val.date()
-            
-            # 3. Convertir a string para análisis de texto
-            val_str = str(val).strip()
-            
-            # 4. Meses en español (diccionario)
-            meses = {
-                'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4,
-                'mayo': 5, 'junio': 6, 'julio': 7, 'agosto': 8,
-                'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
-            }
-            
-            import re
-            
-            # 5. Formato: "abril 2026", "mayo 2026" (solo mes y año en español)
-            match_mes_anio = re.match(
-                r'(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)\s+(\d{4})', 
-                val_str, 
-                re.IGNORECASE
-            )
-            if match_mes_anio:
-                mes_nombre = match_mes_anio.group(1).lower()
-                anio = int(match_mes_anio.group(2))
-                mes = meses[mes_nombre]
-                return datetime(anio, mes, 1).date()
-            
-            # 6. Formato: "28 de noviembre de 2025" (fecha completa en español)
-            match_completo = re.match(
-                r'(\d{1,2})\s+de\s+(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)\s+de\s+(\d{4})', 
-                val_str, 
-                re.IGNORECASE
-            )
-            if match_completo:
-                dia = int(match_completo.group(1))
-                mes_nombre = match_completo.group(2).lower()
-                anio = int(match_completo.group(3))
-                mes = meses[mes_nombre]
-                return datetime(anio, mes, dia).date()
-            
-            # 7. Formato ISO ya normalizado: "2025-12-31"
-            if re.match(r'^\d{4}-\d{2}-\d{2}$', val_str):
-                return datetime.strptime(val_str, "%Y-%m-%d").date()
-            
-            # 8. Formatos DD/MM/YYYY o DD-MM-YYYY
-            for sep in ['/', '-']:
-                pattern = rf'^\d{{1,2}}\{sep}\d{{1,2}}\{sep}\d{{4}}$'
-                if re.match(pattern, val_str):
-                    try:
-                        return datetime.strptime(val_str, f"%d{sep}%m{sep}%Y").date()
-                    except ValueError:
-                        pass
-            
-            # 9. Formatos YYYY/MM/DD o YYYY-MM-DD (variantes)
-            for sep in ['/', '-']:
-                pattern = rf'^\d{{4}}\{sep}\d{{1,2}}\{sep}\d{{1,2}}$'
-                if re.match(pattern, val_str):
-                    try:
-                        return datetime.strptime(val_str, f"%Y{sep}%m{sep}%d").date()
-                    except ValueError:
-                        pass
-            
-            # 10. Fallback: intentar parsing automático de pandas
-            parsed = pd.to_datetime(val, errors='coerce')
-            if pd.notna(parsed):
-                return parsed.date()
-            
-            return None
-            
-        except Exception as e:
-            return None
+    # Motor de parsing usado por importar_excel
+    from poa.importacion.fechas import parse_date
     
     # Ejecutar pruebas
     passed = 0